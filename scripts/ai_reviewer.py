@@ -25,6 +25,8 @@ load_dotenv()
 sys.path.insert(0, str(Path(__file__).parent))
 
 from utils.security import safe_print, mask_secrets
+from utils.llm_usage import UsageLedger, MeteredClient
+from utils.rate_limit import get_limiter
 
 try:
     from anthropic import Anthropic
@@ -35,6 +37,8 @@ except ImportError:
 
 
 # Review prompts for different languages
+# Static instructions only: they form the cached prefix shared by every post,
+# and the post itself follows the cache breakpoint (see REVIEW_POST_TEMPLATES)
 REVIEW_PROMPTS = {
     "en": """You are an expert content reviewer for a tech blog. Review this blog post and provide a detailed assessment.
 
@@ -69,12 +73,7 @@ Return your review as JSON with this structure:
   "top_improvements": ["improvement 1", "improvement 2"]
 }
 
-Blog Post to Review:
----
-{content}
----
-
-Provide your review now:""",
+Blog Post to Review:""",
 
     "ko": """당신은 기술 블로그의 전문 콘텐츠 리뷰어입니다. 이 블로그 글을 검토하고 상세한 평가를 제공하세요.
 
@@ -109,12 +108,7 @@ Provide your review now:""",
   "top_improvements": ["개선점 1", "개선점 2"]
 }
 
-검토할 블로그 글:
----
-{content}
----
-
-지금 리뷰를 제공하세요:""",
+검토할 블로그 글:""",
 
     "ja": """あなたは技術ブログの専門コンテンツレビュアーです。このブログ記事をレビューし、詳細な評価を提供してください。
 
@@ -149,12 +143,14 @@ Provide your review now:""",
   "top_improvements": ["改善点1", "改善点2"]
 }
 
-レビューするブログ記事:
----
-{content}
----
+レビューするブログ記事:"""
+}
 
-今すぐレビューを提供してください:"""
+# Variable part of the review prompt (after the cache breakpoint)
+REVIEW_POST_TEMPLATES = {
+    "en": "\n---\n{content}\n---\n\nProvide your review now:",
+    "ko": "\n---\n{content}\n---\n\n지금 리뷰를 제공하세요:",
+    "ja": "\n---\n{content}\n---\n\n今すぐレビューを提供してください:"
 }
 
 
@@ -169,6 +165,8 @@ class AIReviewer:
 
         self.client = Anthropic(api_key=self.api_key)
         self.model = "claude-sonnet-4-20250514"
+        self.ledger = UsageLedger("ai_reviewer")
+        self.llm = MeteredClient(self.client, self.ledger, limiter=get_limiter('anthropic'))
 
     def review_post(self, filepath: Path) -> Dict:
         """Review a single blog post"""
@@ -182,18 +180,8 @@ class AIReviewer:
         safe_print(f"  🔍 Reviewing with AI: {filepath.name}")
         safe_print(f"  Language: {lang}")
 
-        # Get review prompt
-        prompt = REVIEW_PROMPTS[lang].format(content=content)
-
         # Call Claude API
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=2000,
-            messages=[{
-                "role": "user",
-                "content": prompt
-            }]
-        )
+        response = self.llm.create("review", **self._review_request(content, lang))
 
         # Parse response
         review_text = response.content[0].text
@@ -224,6 +212,30 @@ class AIReviewer:
 
         return review
 
+    def _review_request(self, content: str, lang: str) -> Dict:
+        """Build messages.create() parameters for a review"""
+        # Use Prompt Caching: cache the review instructions
+        return {
+            "model": self.model,
+            "max_tokens": 2000,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": REVIEW_PROMPTS[lang],
+                            "cache_control": {"type": "ephemeral"}
+                        },
+                        {
+                            "type": "text",
+                            "text": REVIEW_POST_TEMPLATES[lang].format(content=content)
+                        }
+                    ]
+                }
+            ]
+        }
+
     def _detect_language(self, filepath: Path) -> str:
         """Detect language from filepath"""
         path_str = str(filepath)
@@ -370,6 +382,8 @@ def main():
     if errors:
         safe_print(f"  🚫 Errors: {errors}")
 
+    reviewer.ledger.print_summary()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Message Batches runner for bulk draft/edit generation
+
+Submits one Anthropic Message Batch per pipeline stage (draft, then edit)
+instead of one interactive request per topic. Batch IDs are persisted on
+each topic in the queue (topic['batch_ids'][stage]) so an interrupted run
+can pick up the in-flight batches instead of resubmitting them.
+
+The runner only needs an object exposing the Message Batches API
+(client.messages.batches.create/retrieve/results), so it works with
+anthropic.Anthropic as well as a local fake. The Anthropic SDK honours
+ANTHROPIC_BASE_URL, which can point the real client at a local endpoint.
+
+Usage:
+    runner = BatchRunner(client, queue)
+    messages, errors = runner.run_stage('draft', topics, build_params)
+"""
+
+import hashlib
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Add scripts to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from utils.security import safe_print, mask_secrets
+
+
+# Stages submitted as batches, in pipeline order
+BATCH_STAGES = ['draft', 'edit']
+
+
+def batch_custom_id(stage: str, topic_id: str) -> str:
+    """
+    Build a batch custom_id for a topic
+
+    Topic IDs can contain Korean/Japanese keywords, but custom_id only allows
+    [a-zA-Z0-9_-], so the ID is hashed. The mapping is deterministic, which
+    lets a resumed run match results back to topics without extra state.
+    """
+    digest = hashlib.sha256(topic_id.encode('utf-8')).hexdigest()[:32]
+    return f"{stage}-{digest}"
+
+
+class BatchRunner:
+    def __init__(self, client, queue=None, poll_interval: float = 30,
+                 max_wait: float = 24 * 60 * 60, sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            client: Object exposing messages.batches (e.g. anthropic.Anthropic)
+            queue: TopicQueue used to persist batch IDs (None disables persistence)
+            poll_interval: Seconds between batch status checks
+            max_wait: Give up waiting for a batch after this many seconds
+            sleep: Sleep function (injectable for tests)
+        """
+        self.client = client
+        self.queue = queue
+        self.poll_interval = poll_interval
+        self.max_wait = max_wait
+        self.sleep = sleep
+
+    def submit(self, stage: str, topics: List[Dict], build_params: Callable[[Dict], Dict]) -> Optional[str]:
+        """
+        Submit one batch with a request per topic and persist its ID
+
+        Args:
+            stage: Pipeline stage name ('draft' or 'edit')
+            topics: Topics to include
+            build_params: Returns messages.create() parameters for a topic
+
+        Returns:
+            Batch ID, or None if there was nothing to submit
+        """
+        requests = []
+        for topic in topics:
+            requests.append({
+                "custom_id": batch_custom_id(stage, topic['id']),
+                "params": build_params(topic)
+            })
+
+        if not requests:
+            return None
+
+        batch = self.client.messages.batches.create(requests=requests)
+        safe_print(f"  📦 Submitted {stage} batch {batch.id} ({len(requests)} requests)")
+
+        for topic in topics:
+            batch_ids = dict(topic.get('batch_ids') or {})
+            batch_ids[stage] = batch.id
+            topic['batch_ids'] = batch_ids
+            if self.queue is not None:
+                self.queue.update_topic(topic['id'], {'batch_ids': batch_ids})
+
+        return batch.id
+
+    def wait(self, batch_id: str):
+        """Poll a batch until it has ended"""
+        waited = 0.0
+        while True:
+            batch = self.client.messages.batches.retrieve(batch_id)
+            if batch.processing_status == 'ended':
+                return batch
+
+            if waited >= self.max_wait:
+                raise TimeoutError(f"Batch {batch_id} did not finish within {self.max_wait:.0f}s")
+
+            counts = getattr(batch, 'request_counts', None)
+            if counts is not None:
+                safe_print(f"  ⏳ Batch {batch_id}: {counts.processing} processing, "
+                           f"{counts.succeeded} succeeded, {counts.errored} errored")
+            self.sleep(self.poll_interval)
+            waited += self.poll_interval
+
+    def collect(self, batch_id: str) -> Dict[str, object]:
+        """
+        Read the results of an ended batch
+
+        Returns:
+            Dict mapping custom_id to the result object
+        """
+        return {entry.custom_id: entry.result for entry in self.client.messages.batches.results(batch_id)}
+
+    def run_stage(self, stage: str, topics: List[Dict],
+                  build_params: Callable[[Dict], Dict]) -> Tuple[Dict[str, object], Dict[str, str]]:
+        """
+        Run one stage for all topics, reusing batches already in flight
+
+        Topics that already carry a batch ID for this stage (from an
+        interrupted run) are not resubmitted; all others go into one new batch.
+        If submitting that batch fails, its topics are reported in errors.
+
+        Returns:
+            (messages, errors) - messages maps topic ID to the response
+            message, errors maps topic ID to an error description
+        """
+        pending = [t for t in topics if not (t.get('batch_ids') or {}).get(stage)]
+        resumed = len(topics) - len(pending)
+        if resumed:
+            safe_print(f"  ♻️  Resuming {resumed} topic(s) from existing {stage} batch")
+
+        messages: Dict[str, object] = {}
+        errors: Dict[str, str] = {}
+        if pending:
+            try:
+                self.submit(stage, pending, build_params)
+            except Exception as e:
+                safe_print(f"  ❌ Submitting {stage} batch failed: {mask_secrets(str(e))}")
+                for topic in pending:
+                    errors[topic['id']] = f"Submitting {stage} batch failed: {mask_secrets(str(e))}"
+
+        # Group topics by the batch that holds their request
+        by_batch: Dict[str, List[Dict]] = {}
+        for topic in topics:
+            if topic['id'] not in errors:
+                by_batch.setdefault(topic['batch_ids'][stage], []).append(topic)
+
+        for batch_id, batch_topics in by_batch.items():
+            try:
+                self.wait(batch_id)
+                results = self.collect(batch_id)
+            except Exception as e:
+                for topic in batch_topics:
+                    errors[topic['id']] = f"Batch {batch_id} failed: {mask_secrets(str(e))}"
+                continue
+
+            for topic in batch_topics:
+                result = results.get(batch_custom_id(stage, topic['id']))
+                if result is None:
+                    errors[topic['id']] = f"No result in batch {batch_id}"
+                elif result.type == 'succeeded':
+                    messages[topic['id']] = result.message
+                else:
+                    detail = getattr(result, 'error', None)
+                    errors[topic['id']] = f"Batch request {result.type}" + (f": {detail}" if detail else "")
+
+        safe_print(f"  ✓ {stage.capitalize()} batch stage: {len(messages)} succeeded, {len(errors)} failed")
+        return messages, errors
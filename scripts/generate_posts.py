@@ -8,17 +8,25 @@ Generates blog posts using Claude API with two-stage process:
 
 Usage:
     python generate_posts.py --count 3
+    python generate_posts.py --count 15 --workers 4
+    python generate_posts.py --count 15 --workers 4 --async
+    python generate_posts.py --count 15 --batch
     python generate_posts.py --topic-id 001-en-tech-ai-coding
+    python generate_posts.py --topic-id 001-en-tech-ai-coding --replay
 """
 
 import os
 import sys
 import json
 import argparse
+import asyncio
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 # Load environment variables from .env file
 from dotenv import load_dotenv
@@ -27,8 +35,16 @@ load_dotenv()
 # Add scripts to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from topic_queue import reserve_topics, mark_completed, mark_failed
-from utils.security import safe_print, mask_secrets
+from topic_queue import (
+    reserve_topics, resume_batch_topics, mark_completed, mark_failed, get_queue, RESERVATION_POLICIES
+)
+from batch_runner import BatchRunner
+from utils.security import safe_print, mask_secrets, buffered_output
+from utils.validation import validate_title, validate_description
+from utils.llm_usage import UsageLedger, MeteredClient, AsyncMeteredClient
+from utils.response_cache import ResponseCache
+from utils.checkpoint import CheckpointStore, TopicCheckpoint
+from utils.rate_limit import get_limiter
 from affiliate_config import (
     detect_product_mentions,
     generate_affiliate_link,
@@ -38,7 +54,7 @@ from affiliate_config import (
 )
 
 try:
-    from anthropic import Anthropic
+    from anthropic import Anthropic, AsyncAnthropic
 except ImportError:
     safe_print("Error: anthropic package not installed")
     safe_print("Install with: pip install anthropic")
@@ -51,6 +67,11 @@ except ImportError:
     safe_print("Install with: pip install requests")
     sys.exit(1)
 
+try:
+    import httpx
+except ImportError:
+    httpx = None  # Only required by AsyncContentGenerator
+
 try:
     import certifi
 except ImportError:
@@ -60,6 +81,8 @@ except ImportError:
 
 
 # System prompts for different languages
+# Static per language so the cached prefix is shared by every topic;
+# anything topic-specific belongs in the user prompt (_get_draft_prompt)
 SYSTEM_PROMPTS = {
     "en": """You are a professional writer for Jake's Tech Insights blog.
 
@@ -101,7 +124,7 @@ Every topic must clearly answer:
 1. First paragraph: Hook with reader's pain point (1-2 sentences)
 2. Structure: Problem → 3 Core Solutions → Action Steps → Conclusion
 3. Tone: Medium/Substack style - conversational, personal, direct
-4. SEO: Keyword "{keyword}" naturally 4-6 times
+4. SEO: The topic keyword (given in the request) naturally 4-6 times
 5. Sections: 3-4 ## headings (scannable)
 6. End: Clear CTA - question or next step
 
@@ -176,7 +199,7 @@ D. Timing: "Why [topic] is being discussed again lately"
 1. 첫 문단: 독자의 pain point 공감 (1-2문장으로 강렬하게)
 2. 구조: 문제 제기 → 핵심 해결책 3가지 → 실전 팁 → 결론
 3. 톤: 토스(Toss) 스타일 - 전문적이지만 편안한 친구 같은 느낌
-4. SEO: 키워드 "{keyword}"를 자연스럽게 4-6회 포함
+4. SEO: 요청에 주어진 주제 키워드를 자연스럽게 4-6회 포함
 5. 섹션: 3-4개 ## 헤딩 (각 섹션은 읽기 쉽게)
 6. 끝: 명확한 CTA - 질문이나 다음 단계 제안
 
@@ -250,7 +273,7 @@ D. 시점: "왜 요즘 ~ 이야기가 다시 나오는 걸까"
 1. 最初の段落: 読者の悩みに共感（1-2文で強烈に）
 2. 構造: 問題提起 → 核心解決策3つ → 実践ヒント → 結論
 3. トーン: SmartNews/NewsPicks/日経COMEMO風 - 情報密度高く、読みやすく、直接的
-4. SEO: キーワード"{keyword}"を自然に4-6回含める
+4. SEO: リクエストで指定されたトピックキーワードを自然に4-6回含める
 5. セクション: 3-4個の##見出し（各セクションは読みやすく）
 6. 終わり: 明確なCTA - 質問または次のステップ
 
@@ -297,9 +320,28 @@ D. タイミング: "なぜ最近~の話が再び出ているのか"
 }
 
 
+# Prompt Caching beta header shared by the sync and async Claude clients
+PROMPT_CACHING_HEADERS = {
+    "anthropic-beta": "prompt-caching-2024-07-31"
+}
+
+# Serializes topic queue read-modify-write cycles across worker threads
+_queue_lock = threading.Lock()
+
+
 class ContentGenerator:
-    def __init__(self, api_key: Optional[str] = None, unsplash_key: Optional[str] = None):
-        """Initialize content generator with Claude API and Unsplash API"""
+    # Shared by all instances/threads: guards data/used_images*.json updates
+    _used_images_lock = threading.Lock()
+
+    def __init__(self, api_key: Optional[str] = None, unsplash_key: Optional[str] = None,
+                 cache: Optional[ResponseCache] = None, checkpoints: Optional[CheckpointStore] = None):
+        """
+        Initialize content generator with Claude API and Unsplash API
+
+        Args:
+            cache: Response cache in front of every Claude call (None disables it)
+            checkpoints: Per-topic stage checkpoints used by process_topic() (None disables them)
+        """
         self.api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
         if not self.api_key:
             safe_print("❌ ERROR: ANTHROPIC_API_KEY not found")
@@ -311,139 +353,163 @@ class ContentGenerator:
 
         # Initialize with Prompt Caching beta header
         try:
-            self.client = Anthropic(
-                api_key=self.api_key,
-                default_headers={
-                    "anthropic-beta": "prompt-caching-2024-07-31"
-                }
-            )
+            self.client = self._create_client()
             self.model = "claude-sonnet-4-20250514"
             safe_print("  ✓ Anthropic API client initialized successfully")
         except Exception as e:
             safe_print(f"❌ ERROR: Failed to initialize Anthropic client: {mask_secrets(str(e))}")
             raise
 
-        # Unsplash API (optional)
+        # Every Claude call goes through self.llm so tokens/time are recorded per stage,
+        # identical requests (e.g. a retried topic) are served from the cache, and
+        # API calls are paced and retried against the shared Anthropic rate limits
+        self.cache = cache
+        self.checkpoints = checkpoints
+        self.ledger = UsageLedger("generate_posts")
+        self.llm = self._create_metered_client()
+
+        # Unsplash API (optional); hourly quota shared by all workers
         self.unsplash_key = unsplash_key or os.environ.get("UNSPLASH_ACCESS_KEY")
+        self.unsplash_limiter = get_limiter('unsplash')
         if self.unsplash_key:
             safe_print("  🖼️  Unsplash API enabled")
         else:
             safe_print("  ⚠️  Unsplash API key not found (images will be skipped)")
             safe_print("     Set UNSPLASH_ACCESS_KEY environment variable to enable")
 
+    def _create_client(self):
+        """Create the Claude client (overridden by AsyncContentGenerator)"""
+        return Anthropic(
+            api_key=self.api_key,
+            default_headers=PROMPT_CACHING_HEADERS
+        )
+
+    def _create_metered_client(self):
+        """Wrap the Claude client for usage accounting (overridden by AsyncContentGenerator)"""
+        return MeteredClient(self.client, self.ledger, self.cache, get_limiter('anthropic'))
+
     def generate_draft(self, topic: Dict) -> str:
         """Generate initial draft using Draft Agent with Prompt Caching"""
+        safe_print(f"  📝 Generating draft for: {topic['keyword']}")
+
+        try:
+            response = self.llm.create("draft", **self._draft_request(topic))
+        except Exception as e:
+            self._report_api_error("draft generation", e, topic)
+            raise
+
+        return self._draft_result(response, topic)
+
+    def _draft_request(self, topic: Dict) -> Dict:
+        """Build messages.create() parameters for the Draft Agent"""
         keyword = topic['keyword']
         lang = topic['lang']
         category = topic['category']
         references = topic.get('references', [])  # Get references from topic
 
-        system_prompt = SYSTEM_PROMPTS[lang].format(keyword=keyword)
-
-        # User prompt with references
+        # User prompt with keyword and references (after the cache breakpoint)
         user_prompt = self._get_draft_prompt(keyword, category, lang, references)
 
-        safe_print(f"  📝 Generating draft for: {keyword}")
-
-        # Use Prompt Caching: cache the system prompt
-        try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=12000,
-                system=[
-                    {
-                        "type": "text",
-                        "text": system_prompt,
-                        "cache_control": {"type": "ephemeral"}
-                    }
-                ],
-                messages=[{
-                    "role": "user",
-                    "content": user_prompt
-                }]
-            )
-        except Exception as e:
-            error_msg = mask_secrets(str(e))
-            safe_print(f"  ❌ ERROR: API call failed during draft generation")
-            safe_print(f"     Topic: {topic.get('id', 'unknown')}")
-            safe_print(f"     Keyword: {keyword}")
-            safe_print(f"     Error: {error_msg}")
-            raise
+        # Use Prompt Caching: cache the system prompt (identical for all topics in a language)
+        return {
+            "model": self.model,
+            "max_tokens": 12000,
+            "system": [
+                {
+                    "type": "text",
+                    "text": SYSTEM_PROMPTS[lang],
+                    "cache_control": {"type": "ephemeral"}
+                }
+            ],
+            "messages": [{
+                "role": "user",
+                "content": user_prompt
+            }]
+        }
 
+    def _draft_result(self, response, topic: Dict) -> str:
+        """Validate the Draft Agent response and return the draft text"""
         if not response or not response.content:
             safe_print(f"  ❌ ERROR: Empty response from API")
             safe_print(f"     Topic: {topic.get('id', 'unknown')}")
             raise ValueError("Empty response from Claude API")
 
         draft = response.content[0].text
-
-        # Log cache performance
-        usage = response.usage
-        cache_read = getattr(usage, 'cache_read_input_tokens', 0)
-        cache_create = getattr(usage, 'cache_creation_input_tokens', 0)
-
-        # Always show cache status
-        if cache_read > 0:
-            safe_print(f"  💾 Cache HIT: {cache_read} tokens saved!")
-        elif cache_create > 0:
-            safe_print(f"  💾 Cache created: {cache_create} tokens")
-        else:
-            safe_print(f"  ℹ️  No caching (usage: input={usage.input_tokens}, output={usage.output_tokens})")
+        self._log_cache_usage(response)
 
         safe_print(f"  ✓ Draft generated ({len(draft)} chars)")
         return draft
 
     def edit_draft(self, draft: str, topic: Dict) -> str:
         """Refine draft using Editor Agent with Prompt Caching"""
-        lang = topic['lang']
-
         safe_print(f"  ✏️  Editing draft...")
 
+        request = self._edit_request(draft, topic)
+
+        try:
+            response = self.llm.create("edit", **request)
+        except Exception as e:
+            self._report_api_error("draft editing", e, topic, draft)
+            raise
+
+        return self._edit_result(response, topic)
+
+    def _edit_request(self, draft: str, topic: Dict) -> Dict:
+        """Build messages.create() parameters for the Editor Agent"""
         if not draft or len(draft.strip()) == 0:
             safe_print(f"  ⚠️  WARNING: Empty draft provided for editing")
             safe_print(f"     Topic: {topic.get('id', 'unknown')}")
             raise ValueError("Cannot edit empty draft")
 
-        editor_prompt = self._get_editor_prompt(lang)
+        editor_prompt = self._get_editor_prompt(topic['lang'])
 
         # Use Prompt Caching: cache the editor instructions
-        try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=12000,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": editor_prompt,
-                                "cache_control": {"type": "ephemeral"}
-                            },
-                            {
-                                "type": "text",
-                                "text": f"\n\n---\n\n{draft}"
-                            }
-                        ]
-                    }
-                ]
-            )
-        except Exception as e:
-            error_msg = mask_secrets(str(e))
-            safe_print(f"  ❌ ERROR: API call failed during draft editing")
-            safe_print(f"     Topic: {topic.get('id', 'unknown')}")
-            safe_print(f"     Draft length: {len(draft)} chars")
-            safe_print(f"     Error: {error_msg}")
-            raise
+        return {
+            "model": self.model,
+            "max_tokens": 12000,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": editor_prompt,
+                            "cache_control": {"type": "ephemeral"}
+                        },
+                        {
+                            "type": "text",
+                            "text": f"\n\n---\n\n{draft}"
+                        }
+                    ]
+                }
+            ]
+        }
 
+    def _edit_result(self, response, topic: Dict) -> str:
+        """Validate the Editor Agent response and return the edited text"""
         if not response or not response.content:
             safe_print(f"  ❌ ERROR: Empty response from editing API")
             safe_print(f"     Topic: {topic.get('id', 'unknown')}")
             raise ValueError("Empty response from Claude API during editing")
 
         edited = response.content[0].text
+        self._log_cache_usage(response)
+
+        safe_print(f"  ✓ Draft edited ({len(edited)} chars)")
+        return edited
+
+    def _report_api_error(self, stage: str, error: Exception, topic: Dict, draft: Optional[str] = None):
+        """Log a failed Claude call with enough context to debug it"""
+        safe_print(f"  ❌ ERROR: API call failed during {stage}")
+        safe_print(f"     Topic: {topic.get('id', 'unknown')}")
+        if draft is not None:
+            safe_print(f"     Draft length: {len(draft)} chars")
+        else:
+            safe_print(f"     Keyword: {topic.get('keyword', 'unknown')}")
+        safe_print(f"     Error: {mask_secrets(str(error))}")
 
-        # Log cache performance
+    def _log_cache_usage(self, response):
+        """Log prompt cache performance for a response"""
         usage = response.usage
         cache_read = getattr(usage, 'cache_read_input_tokens', 0)
         cache_create = getattr(usage, 'cache_creation_input_tokens', 0)
@@ -456,9 +522,6 @@ class ContentGenerator:
         else:
             safe_print(f"  ℹ️  No caching (usage: input={usage.input_tokens}, output={usage.output_tokens})")
 
-        safe_print(f"  ✓ Draft edited ({len(edited)} chars)")
-        return edited
-
     def _get_draft_prompt(self, keyword: str, category: str, lang: str, references: List[Dict] = None) -> str:
         """Get draft generation prompt based on language"""
         # Get current date in KST
@@ -483,6 +546,7 @@ class ContentGenerator:
 ⚠️ IMPORTANT: You are writing this article as of TODAY ({current_date_en}). All information must be current as of {current_year}. Do NOT use outdated information from 2024 or earlier years.
 
 Write a comprehensive blog post about: {keyword}{refs_section}
+SEO keyword: "{keyword}" (use naturally 4-6 times)
 
 Category: {category}
 
@@ -540,6 +604,7 @@ Write the complete blog post now (body only, no title or metadata):""",
 ⚠️ 중요: 이 글은 오늘({current_date}) 기준으로 작성합니다. 모든 정보는 {current_year}년 현재를 기준으로 해야 합니다. 2024년 이하의 오래된 정보를 사용하지 마세요.
 
 다음 주제로 포괄적인 블로그 글을 작성하세요: {keyword}{refs_section}
+SEO 키워드: "{keyword}" (자연스럽게 4-6회 포함)
 
 카테고리: {category}
 
@@ -595,6 +660,7 @@ Write the complete blog post now (body only, no title or metadata):""",
 ⚠️ 重要: この記事は本日({current_date})の時点で書かれています。すべての情報は{current_year}年現在を基準にする必要があります。2024年以前の古い情報を使用しないでください。
 
 次のトピックについて包括的なブログ記事を書いてください: {keyword}{refs_section}
+SEOキーワード: "{keyword}"（自然に4-6回含める）
 
 カテゴリ: {category}
 
@@ -785,25 +851,168 @@ Return improved version (body only, no title):""",
 
         return prompts[lang]
 
-    def generate_title(self, content: str, keyword: str, lang: str, references: List[Dict] = None) -> str:
-        """Generate SEO-friendly title based on actual content and references"""
-        # Get current year in KST
+    def generate_metadata(self, content: str, keyword: str, lang: str,
+                          references: List[Dict] = None) -> Tuple[str, str]:
+        """
+        Generate title and meta description in one structured call
+
+        The model returns title, description and its own title-content
+        alignment verdict as JSON; validate_title() double-checks locally.
+        Only a failed check costs a second call (strict title regeneration).
+        Falls back to generate_title()/generate_description() if the
+        response is not usable JSON.
+
+        Returns:
+            (title, description)
+        """
+        content_preview = self._content_preview(content)
+
+        response = self.llm.create(
+            "metadata", **self._metadata_request(content_preview, keyword, lang, references)
+        )
+        metadata = self._parse_metadata(response)
+        if metadata is None:
+            safe_print(f"  ⚠️  Metadata response was not valid JSON, using separate title/description calls")
+            return (self.generate_title(content, keyword, lang, references),
+                    self.generate_description(content, keyword, lang))
+
+        title = metadata['title']
+        if not self._metadata_title_passed(metadata, content):
+            regenerate_response = self.llm.create(
+                "title_regenerate", **self._title_regenerate_request(content_preview, keyword, lang)
+            )
+            title = self._clean_response_text(regenerate_response)
+            safe_print(f"  ✓ Regenerated title: {title}")
+
+        description = metadata['description']
+        if validate_description(description):
+            response = self.llm.create("description", **self._description_request(keyword, lang))
+            description = self._clean_response_text(response)
+
+        return title, description
+
+    def _metadata_request(self, content_preview: str, keyword: str, lang: str, references: List[Dict] = None) -> Dict:
+        """Build messages.create() parameters for the combined title/description/alignment call"""
         from datetime import datetime, timezone, timedelta
         kst = timezone(timedelta(hours=9))
         current_year = datetime.now(kst).year
 
-        # Extract strategic samples from content for better context
+        refs_context = ""
+        if references and len(references) > 0:
+            refs_list = "\n".join([
+                f"- {ref.get('title', 'Source')}"
+                for ref in references[:3]
+            ])
+            refs_context = f"\n\nREFERENCE TOPICS:\n{refs_list}\n"
+
+        json_format = '{"title": "...", "description": "...", "aligned": true, "issue": ""}'
+
+        prompts = {
+            "en": f"Write the metadata for this blog post about '{keyword}'.\n\nCONTENT SAMPLES (beginning, middle, end):\n{content_preview}{refs_context}\n\nTITLE (50-60 chars):\n1. Describe what the content ACTUALLY discusses (not what sounds catchy)\n2. NO exaggeration, speculation, or clickbait (e.g., \"confirmed\", \"revealed\", \"secret\")\n3. ONLY use facts and numbers explicitly stated in the content samples\n4. Include keyword '{keyword}' naturally\n5. Current year is {current_year}\n\nDESCRIPTION: compelling meta description (150-160 chars) that matches the content.\n\nALIGNMENT: set \"aligned\" to false ONLY if your title has a critical mismatch with the content (promised data not in content, different topic, \"confirmed\" for speculation), and explain in \"issue\" (max 15 words).\n\nReturn ONLY JSON: {json_format}",
+            "ko": f"'{keyword}'에 대한 이 블로그 글의 메타데이터를 작성하세요.\n\n본문 샘플 (시작, 중간, 끝):\n{content_preview}{refs_context}\n\n제목 (50-60자):\n1. 본문이 실제로 다루는 내용을 설명 (매력적으로 들리는 것이 아님)\n2. 과장, 추측, 클릭베이트 금지 (예: \"확정\", \"폭로\", \"충격\")\n3. 본문 샘플에 명시적으로 언급된 사실과 숫자만 사용\n4. '{keyword}' 키워드를 자연스럽게 포함\n5. 현재 연도는 {current_year}년\n\n설명: 본문과 일치하는 매력적인 메타 설명 (150-160자).\n\n정합성: 제목이 본문과 치명적으로 불일치할 때만 (본문에 없는 데이터 약속, 다른 주제, 추측인데 \"확정\") \"aligned\"를 false로 하고 \"issue\"에 15단어 이내로 설명.\n\nJSON만 반환: {json_format}",
+            "ja": f"'{keyword}'に関するこのブログ記事のメタデータを作成してください。\n\n本文サンプル（冒頭、中盤、終盤）:\n{content_preview}{refs_context}\n\nタイトル（50-60文字）:\n1. 本文が実際に議論する内容を説明（魅力的に聞こえるだけではダメ）\n2. 誇張、推測、クリックベイト禁止（例：「確定」「暴露」「衝撃」）\n3. 本文サンプルに明示的に述べられた事実と数字のみ使用\n4. '{keyword}'キーワードを自然に含める\n5. 現在の年は{current_year}年\n\n説明: 本文と一致する魅力的なメタ説明（150-160文字）。\n\n整合性: タイトルが本文と致命的に不一致の場合のみ（本文にないデータの約束、異なるトピック、推測なのに「確定」）\"aligned\"をfalseにし、\"issue\"に15語以内で説明。\n\nJSONのみを返す: {json_format}"
+        }
+
+        return {
+            "model": self.model,
+            "max_tokens": 400,
+            "messages": [{
+                "role": "user",
+                "content": prompts[lang]
+            }]
+        }
+
+    @staticmethod
+    def _parse_metadata(response) -> Optional[Dict]:
+        """Extract the metadata JSON object from a response, or None if unusable"""
+        try:
+            text = response.content[0].text
+        except (AttributeError, IndexError, TypeError):
+            return None
+
+        start = text.find('{')
+        end = text.rfind('}')
+        if start == -1 or end <= start:
+            return None
+
+        try:
+            metadata = json.loads(text[start:end + 1])
+        except json.JSONDecodeError:
+            return None
+
+        if not isinstance(metadata, dict):
+            return None
+        if not isinstance(metadata.get('title'), str) or not isinstance(metadata.get('description'), str):
+            return None
+
+        metadata['title'] = metadata['title'].strip().strip('"').strip("'")
+        metadata['description'] = metadata['description'].strip().strip('"').strip("'")
+        return metadata
+
+    def _metadata_title_passed(self, metadata: Dict, content: str) -> bool:
+        """Combine the model's alignment verdict with the local title check, logging mismatches"""
+        issues = validate_title(metadata['title'], content)
+        if metadata.get('aligned', True) is False:
+            issues.insert(0, metadata.get('issue') or "model reported title-content mismatch")
+
+        if not issues:
+            return True
+
+        safe_print(f"  ⚠️  Title-content mismatch detected: {'; '.join(issues)}")
+        safe_print(f"     Original title: {metadata['title']}")
+        safe_print(f"  🔄 Regenerating title with strict content alignment...")
+        return False
+
+    def generate_title(self, content: str, keyword: str, lang: str, references: List[Dict] = None) -> str:
+        """Generate SEO-friendly title based on actual content and references"""
+        content_preview = self._content_preview(content)
+
+        response = self.llm.create(
+            "title", **self._title_request(content_preview, keyword, lang, references)
+        )
+        generated_title = self._clean_response_text(response)
+
+        # Validate title-content alignment (STRICT check for critical mismatches only)
+        validation_response = self.llm.create(
+            "title_validation", **self._title_validation_request(generated_title, content_preview, lang)
+        )
+
+        # If validation fails, regenerate title with strict instructions
+        if not self._title_validation_passed(validation_response, generated_title):
+            regenerate_response = self.llm.create(
+                "title_regenerate", **self._title_regenerate_request(content_preview, keyword, lang)
+            )
+            generated_title = self._clean_response_text(regenerate_response)
+            safe_print(f"  ✓ Regenerated title: {generated_title}")
+
+        return generated_title
+
+    @staticmethod
+    def _content_preview(content: str) -> str:
+        """Extract strategic samples from content for better context"""
         # Take beginning (intro), middle (main content), and end (conclusion)
         content_length = len(content)
         if content_length <= 1200:
-            content_preview = content
-        else:
-            # Get first 500, middle 400, last 300 chars
-            beginning = content[:500]
-            middle_start = content_length // 2 - 200
-            middle = content[middle_start:middle_start + 400]
-            ending = content[-300:]
-            content_preview = f"{beginning}\n\n[...middle section...]\n{middle}\n\n[...conclusion...]\n{ending}"
+            return content
+
+        # Get first 500, middle 400, last 300 chars
+        beginning = content[:500]
+        middle_start = content_length // 2 - 200
+        middle = content[middle_start:middle_start + 400]
+        ending = content[-300:]
+        return f"{beginning}\n\n[...middle section...]\n{middle}\n\n[...conclusion...]\n{ending}"
+
+    @staticmethod
+    def _clean_response_text(response) -> str:
+        """Return response text without surrounding whitespace and quotes"""
+        return response.content[0].text.strip().strip('"').strip("'")
+
+    def _title_request(self, content_preview: str, keyword: str, lang: str, references: List[Dict] = None) -> Dict:
+        """Build messages.create() parameters for title generation"""
+        # Get current year in KST
+        from datetime import datetime, timezone, timedelta
+        kst = timezone(timedelta(hours=9))
+        current_year = datetime.now(kst).year
 
         # Format references if available
         refs_context = ""
@@ -820,80 +1029,82 @@ Return improved version (body only, no title):""",
             "ja": f"'{keyword}'に関する事実に基づいたSEOフレンドリーなタイトルを生成してください（50-60文字）。\n\n本文サンプル（冒頭、中盤、終盤）:\n{content_preview}{refs_context}\n\n重要ルール - 違反は失敗:\n1. タイトルは本文が実際に議論する内容を説明する必要がある（魅力的に聞こえるだけではダメ）\n2. 誇張、推測、クリックベイト禁止（例：「確定」「暴露」「衝撃」）\n3. 本文が「視聴方法」についてなら、タイトルも「視聴方法」であるべき（「ランキング」ではない）\n4. 本文が問題を議論していれば、タイトルもそれを反映すべき（解決策を約束しない）\n5. 本文サンプルに明示的に述べられた事実のみ使用\n6. 本文に明確に書かれていない限り、具体的な数字/データを約束しない\n7. '{keyword}'キーワードを自然に含める\n8. 現在の年は{current_year}年\n9. タイトルのみを返す"
         }
 
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=100,
-            messages=[{
+        return {
+            "model": self.model,
+            "max_tokens": 100,
+            "messages": [{
                 "role": "user",
                 "content": prompts[lang]
             }]
-        )
-
-        generated_title = response.content[0].text.strip().strip('"').strip("'")
+        }
 
-        # Validate title-content alignment (STRICT check for critical mismatches only)
+    def _title_validation_request(self, generated_title: str, content_preview: str, lang: str) -> Dict:
+        """Build messages.create() parameters for the title-content alignment check"""
         validation_prompts = {
             "en": f"Does this title accurately match what the content ACTUALLY discusses?\n\nTITLE: {generated_title}\n\nCONTENT: {content_preview}\n\nCheck for CRITICAL mismatches ONLY:\n- Title promises specific data (e.g., \"$800\", \"75%\") but content doesn't provide it\n- Title says \"how to watch\" but content discusses problems/history instead\n- Title says \"confirmed\" but content is speculation/rumors\n- Title topic completely different from content topic\n\nIGNORE minor issues like:\n- Year mentions (2026 is acceptable for future-looking content)\n- Slight emphasis differences\n- Language mixing (Korean keyword in English title is OK)\n\nAnswer 'yes' if title reasonably matches content. Answer 'no' ONLY for critical mismatches. If no, explain in max 15 words.",
             "ko": f"이 제목이 본문이 실제로 논의하는 내용과 정확히 일치합니까?\n\n제목: {generated_title}\n\n본문: {content_preview}\n\n치명적 불일치만 확인:\n- 제목이 구체적 데이터(예: \"75%\", \"$800\")를 약속하지만 본문에 없음\n- 제목은 \"시청 방법\"인데 본문은 문제점/역사를 논의\n- 제목은 \"확정\"인데 본문은 추측/소문\n- 제목 주제와 본문 주제가 완전히 다름\n\n무시할 사소한 문제:\n- 연도 언급 (미래 지향적 콘텐츠에 2026 사용 가능)\n- 약간의 강조 차이\n- 언어 혼용 (영어 제목에 한국어 키워드 사용 가능)\n\n제목이 본문과 합리적으로 일치하면 '예'. 치명적 불일치만 '아니오'. 아니오라면 15단어 이내 설명.",
             "ja": f"このタイトルは本文が実際に議論する内容と正確に一致していますか？\n\nタイトル: {generated_title}\n\n本文: {content_preview}\n\n致命的な不一致のみ確認:\n- タイトルが具体的データ（例：「75%」「$800」）を約束するが本文にない\n- タイトルは「視聴方法」だが本文は問題点/歴史を議論\n- タイトルは「確定」だが本文は推測/噂\n- タイトルトピックと本文トピックが完全に異なる\n\n無視すべき軽微な問題:\n- 年の言及（未来志向コンテンツに2026使用可）\n- わずかな強調の違い\n- 言語混在（英語タイトルに韓国語キーワード使用可）\n\nタイトルが本文と合理的に一致なら「はい」。致命的不一致のみ「いいえ」。いいえなら15語以内で説明。"
         }
 
-        validation_response = self.client.messages.create(
-            model=self.model,
-            max_tokens=50,
-            messages=[{
+        return {
+            "model": self.model,
+            "max_tokens": 50,
+            "messages": [{
                 "role": "user",
                 "content": validation_prompts[lang]
             }]
-        )
+        }
 
+    def _title_validation_passed(self, validation_response, generated_title: str) -> bool:
+        """Interpret the yes/no alignment answer, logging mismatches"""
         validation_result = validation_response.content[0].text.strip().lower()
 
-        # If validation fails, regenerate title with strict instructions
-        if not validation_result.startswith('yes') and not validation_result.startswith('예') and not validation_result.startswith('はい'):
-            safe_print(f"  ⚠️  Title-content mismatch detected: {validation_result}")
-            safe_print(f"     Original title: {generated_title}")
-            safe_print(f"  🔄 Regenerating title with strict content alignment...")
-
-            # Regenerate with stricter prompt
-            regenerate_prompts = {
-                "en": f"Generate a title that EXACTLY matches what this content discusses. Do NOT promise specifics that aren't in the content. Do NOT use words like 'confirmed', 'breaking', or future dates unless explicitly stated.\n\nContent preview:\n{content_preview}\n\nKeyword to include: {keyword}\n\nTitle (60-70 chars):",
-                "ko": f"본문이 실제로 다루는 내용과 정확히 일치하는 제목을 생성하세요. 본문에 없는 구체적 내용을 약속하지 마세요. '확정', '속보', 미래 날짜는 본문에 명시되지 않으면 사용하지 마세요.\n\n본문 미리보기:\n{content_preview}\n\n포함할 키워드: {keyword}\n\n제목 (40-50자):",
-                "ja": f"本文が実際に議論する内容と正確に一致するタイトルを生成してください。本文にない具体的な内容を約束しないでください。「確定」「速報」または未来の日付は本文に明示されていない限り使用しないでください。\n\n本文プレビュー:\n{content_preview}\n\n含めるキーワード: {keyword}\n\nタイトル（30-40文字）:"
-            }
-
-            regenerate_response = self.client.messages.create(
-                model=self.model,
-                max_tokens=100,
-                messages=[{
-                    "role": "user",
-                    "content": regenerate_prompts[lang]
-                }]
-            )
+        if validation_result.startswith('yes') or validation_result.startswith('예') or validation_result.startswith('はい'):
+            return True
 
-            generated_title = regenerate_response.content[0].text.strip().strip('"').strip("'")
-            safe_print(f"  ✓ Regenerated title: {generated_title}")
+        safe_print(f"  ⚠️  Title-content mismatch detected: {validation_result}")
+        safe_print(f"     Original title: {generated_title}")
+        safe_print(f"  🔄 Regenerating title with strict content alignment...")
+        return False
 
-        return generated_title
+    def _title_regenerate_request(self, content_preview: str, keyword: str, lang: str) -> Dict:
+        """Build messages.create() parameters for strict title regeneration"""
+        regenerate_prompts = {
+            "en": f"Generate a title that EXACTLY matches what this content discusses. Do NOT promise specifics that aren't in the content. Do NOT use words like 'confirmed', 'breaking', or future dates unless explicitly stated.\n\nContent preview:\n{content_preview}\n\nKeyword to include: {keyword}\n\nTitle (60-70 chars):",
+            "ko": f"본문이 실제로 다루는 내용과 정확히 일치하는 제목을 생성하세요. 본문에 없는 구체적 내용을 약속하지 마세요. '확정', '속보', 미래 날짜는 본문에 명시되지 않으면 사용하지 마세요.\n\n본문 미리보기:\n{content_preview}\n\n포함할 키워드: {keyword}\n\n제목 (40-50자):",
+            "ja": f"本文が実際に議論する内容と正確に一致するタイトルを生成してください。本文にない具体的な内容を約束しないでください。「確定」「速報」または未来の日付は本文に明示されていない限り使用しないでください。\n\n本文プレビュー:\n{content_preview}\n\n含めるキーワード: {keyword}\n\nタイトル（30-40文字）:"
+        }
+
+        return {
+            "model": self.model,
+            "max_tokens": 100,
+            "messages": [{
+                "role": "user",
+                "content": regenerate_prompts[lang]
+            }]
+        }
 
     def generate_description(self, content: str, keyword: str, lang: str) -> str:
         """Generate meta description"""
+        response = self.llm.create("description", **self._description_request(keyword, lang))
+        return self._clean_response_text(response)
+
+    def _description_request(self, keyword: str, lang: str) -> Dict:
+        """Build messages.create() parameters for meta description generation"""
         prompts = {
             "en": f"Generate a compelling meta description (150-160 chars) for a blog post about '{keyword}'. Return ONLY the description.",
             "ko": f"'{keyword}'에 대한 블로그 글의 매력적인 메타 설명을 생성하세요 (150-160자). 설명만 반환하세요.",
             "ja": f"'{keyword}'に関するブログ記事の魅力的なメタ説明を生成してください（150-160文字）。説明のみを返してください。"
         }
 
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=100,
-            messages=[{
+        return {
+            "model": self.model,
+            "max_tokens": 100,
+            "messages": [{
                 "role": "user",
                 "content": prompts[lang]
             }]
-        )
-
-        return response.content[0].text.strip().strip('"').strip("'")
+        }
 
     def translate_to_english(self, text: str) -> str:
         """Translate non-English keywords to English for Unsplash search"""
@@ -950,143 +1161,219 @@ Return improved version (body only, no title):""",
             return None
 
         try:
-            # Clean keyword for better Unsplash search
-            # Remove years (2020-2030) to avoid year-specific images
-            import re
-            clean_keyword = re.sub(r'20[2-3][0-9]년?', '', keyword)  # Match years + optional 년 (Korean year)
-            # Remove common prefixes/suffixes that reduce search quality
-            clean_keyword = re.sub(r'【.*?】', '', clean_keyword)  # Remove 【brackets】
-            clean_keyword = re.sub(r'\[.*?\]', '', clean_keyword)  # Remove [brackets]
-            clean_keyword = clean_keyword.strip()
-
-            # Translation dictionary for meaningful keywords
-            keyword_translations = {
-                # Korean - AI/Jobs/Employment
-                'AI': 'artificial intelligence',
-                '인공지능': 'artificial intelligence',
-                '대체': 'replacement automation',
-                '일자리': 'job employment work',
-                '실업': 'unemployment jobless',
-                '직업': 'occupation career profession',
-                '취업': 'employment hiring recruitment',
-                '자동화': 'automation robot',
-                '기술': 'technology tech',
-                '디지털': 'digital technology',
-                '로봇': 'robot automation',
-                '미래': 'future',
-                '변화': 'change transformation',
-                '위험': 'risk danger',
-                # Korean - Finance/Business
-                '나라사랑카드': 'patriot card credit card',
-                '카드': 'card credit',
-                '연령': 'age limit',
-                '제한': 'restriction limit',
-                '전세': 'housing lease deposit',
-                '보증금': 'deposit guarantee',
-                '배달': 'delivery food',
-                '수수료': 'fee commission',
-                '자영업': 'small business owner',
-                '폐업': 'business closure bankruptcy',
-                '지원금': 'subsidy support fund',
-                '정부': 'government policy',
-                '신청': 'application registration',
-                '혜택': 'benefit advantage',
-                # Korean - Entertainment/Society
-                '사과문': 'apology statement',
-                '팬': 'fan supporter',
-                '등돌림': 'backlash criticism',
-                '스마트폰': 'smartphone mobile',
-                '건강': 'health wellness',
-                # Japanese - AI/Jobs/Employment
-                '人工知能': 'artificial intelligence',
-                '失業': 'unemployment jobless',
-                'リスク': 'risk danger threat',
-                '職業': 'occupation job',
-                '代替': 'replacement substitute',
-                '雇用': 'employment hiring',
-                '自動化': 'automation robot',
-                'デジタル': 'digital technology',
-                'ロボット': 'robot automation',
-                '未来': 'future',
-                '変化': 'change transformation',
-                # Japanese - Finance/Business
-                '奨学金': 'scholarship student loan',
-                '返済': 'repayment debt',
-                '免除': 'exemption forgiveness',
-                '投資': 'investment financial',
-                '詐欺': 'fraud scam',
-                'アカデミー賞': 'academy award',
-                '受賞': 'award winner',
-                '住宅ローン': 'home mortgage loan',
-                '審査': 'screening examination',
-                '承認': 'approval authorization',
-            }
-
-            # Extract meaningful keywords from title
-            title_words = clean_keyword.split()
-            translated_keywords = []
-
-            # Try to find and translate key phrases
-            for ko_word, en_translation in keyword_translations.items():
-                if ko_word in clean_keyword:
-                    translated_keywords.append(en_translation)
-
-            # If no translation found, extract meaningful words (skip common noise and non-ASCII)
-            if not translated_keywords:
-                noise_words = ['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for']
-                for word in title_words[:3]:  # Take first 3 words
-                    # Filter out non-ASCII words to prevent non-English queries
-                    try:
-                        word.encode('ascii')
-                        is_ascii = True
-                    except UnicodeEncodeError:
-                        is_ascii = False
-
-                    if is_ascii and len(word) > 2 and word.lower() not in noise_words:
-                        translated_keywords.append(word)
-
-            # Add category context
-            category_context = {
-                'tech': 'technology digital',
-                'business': 'business professional',
-                'finance': 'finance money',
-                'society': 'society community',
-                'entertainment': 'entertainment culture',
-                'lifestyle': 'lifestyle daily',
-                'sports': 'sports athletic',
-                'education': 'education learning'
-            }
-
-            # Build flexible, contextual query
-            if translated_keywords:
-                base_keywords = ' '.join(translated_keywords[:2])
-            else:
-                # Fallback to pure category context if no English keywords found
-                base_keywords = category_context.get(category, 'technology')
-
-            context = category_context.get(category, category)
-            query = f"{base_keywords} {context}".strip()
-
-            # Unsplash API endpoint
-            url = "https://api.unsplash.com/search/photos"
-            headers = {
-                "Authorization": f"Client-ID {self.unsplash_key}"
-            }
-            params = {
-                "query": query,
-                "per_page": 30,  # Increased from 5 to 30 for larger image pool
-                "orientation": "landscape"
-            }
+            query, generic_query = self._build_image_query(keyword, category)
 
             safe_print(f"  🔍 Searching Unsplash for: {query}")
+            results = self._search_unsplash(query)
+            if not results:
+                safe_print(f"  ⚠️  No images found for '{query}'")
+            photo = self._claim_unused_photo(results)
 
-            # Use certifi for SSL verification (Windows compatibility)
-            verify_ssl = certifi.where() if certifi else True
+            # If no results or all images are used, try with generic category query
+            if photo is None:
+                safe_print(f"  ⚠️  All images for '{query}' already used, trying generic category search...")
+                photo = self._claim_unused_photo(self._search_unsplash(generic_query))
+
+                # If still no unused image found, return None (use placeholder)
+                if photo is None:
+                    safe_print(f"  ❌ No unused images available for category '{category}'")
+                    return None
+                safe_print(f"  ✓ Found unused image with generic search: {generic_query}")
+
+            image_info = self._image_info(photo)
+            safe_print(f"  ✓ Found image by {image_info['photographer']}")
+            return image_info
+
+        except requests.exceptions.Timeout as e:
+            safe_print(f"  ⚠️  Unsplash API timeout: Request took too long")
+            safe_print(f"     Keyword: {keyword}")
+            safe_print(f"     Error: {mask_secrets(str(e))}")
+            return None
+        except requests.exceptions.HTTPError as e:
+            safe_print(f"  ⚠️  Unsplash API HTTP error: {e.response.status_code if e.response else 'unknown'}")
+            safe_print(f"     Keyword: {keyword}")
+            safe_print(f"     Error: {mask_secrets(str(e))}")
+            return None
+        except requests.exceptions.RequestException as e:
+            safe_print(f"  ⚠️  Unsplash API network error")
+            safe_print(f"     Keyword: {keyword}")
+            safe_print(f"     Error: {mask_secrets(str(e))}")
+            return None
+        except json.JSONDecodeError as e:
+            safe_print(f"  ⚠️  Unsplash API response parsing failed")
+            safe_print(f"     Keyword: {keyword}")
+            safe_print(f"     Error: Invalid JSON response")
+            return None
+        except Exception as e:
+            safe_print(f"  ⚠️  Image fetch failed with unexpected error")
+            safe_print(f"     Keyword: {keyword}")
+            safe_print(f"     Error: {mask_secrets(str(e))}")
+            return None
+
+    def _build_image_query(self, keyword: str, category: str) -> Tuple[str, str]:
+        """
+        Build the Unsplash search query for a keyword
+
+        Returns:
+            (query, generic_query) - the generic category query is the fallback
+            when every result for the main query has already been used
+        """
+        # Clean keyword for better Unsplash search
+        # Remove years (2020-2030) to avoid year-specific images
+        clean_keyword = re.sub(r'20[2-3][0-9]년?', '', keyword)  # Match years + optional 년 (Korean year)
+        # Remove common prefixes/suffixes that reduce search quality
+        clean_keyword = re.sub(r'【.*?】', '', clean_keyword)  # Remove 【brackets】
+        clean_keyword = re.sub(r'\[.*?\]', '', clean_keyword)  # Remove [brackets]
+        clean_keyword = clean_keyword.strip()
+
+        # Translation dictionary for meaningful keywords
+        keyword_translations = {
+            # Korean - AI/Jobs/Employment
+            'AI': 'artificial intelligence',
+            '인공지능': 'artificial intelligence',
+            '대체': 'replacement automation',
+            '일자리': 'job employment work',
+            '실업': 'unemployment jobless',
+            '직업': 'occupation career profession',
+            '취업': 'employment hiring recruitment',
+            '자동화': 'automation robot',
+            '기술': 'technology tech',
+            '디지털': 'digital technology',
+            '로봇': 'robot automation',
+            '미래': 'future',
+            '변화': 'change transformation',
+            '위험': 'risk danger',
+            # Korean - Finance/Business
+            '나라사랑카드': 'patriot card credit card',
+            '카드': 'card credit',
+            '연령': 'age limit',
+            '제한': 'restriction limit',
+            '전세': 'housing lease deposit',
+            '보증금': 'deposit guarantee',
+            '배달': 'delivery food',
+            '수수료': 'fee commission',
+            '자영업': 'small business owner',
+            '폐업': 'business closure bankruptcy',
+            '지원금': 'subsidy support fund',
+            '정부': 'government policy',
+            '신청': 'application registration',
+            '혜택': 'benefit advantage',
+            # Korean - Entertainment/Society
+            '사과문': 'apology statement',
+            '팬': 'fan supporter',
+            '등돌림': 'backlash criticism',
+            '스마트폰': 'smartphone mobile',
+            '건강': 'health wellness',
+            # Japanese - AI/Jobs/Employment
+            '人工知能': 'artificial intelligence',
+            '失業': 'unemployment jobless',
+            'リスク': 'risk danger threat',
+            '職業': 'occupation job',
+            '代替': 'replacement substitute',
+            '雇用': 'employment hiring',
+            '自動化': 'automation robot',
+            'デジタル': 'digital technology',
+            'ロボット': 'robot automation',
+            '未来': 'future',
+            '変化': 'change transformation',
+            # Japanese - Finance/Business
+            '奨学金': 'scholarship student loan',
+            '返済': 'repayment debt',
+            '免除': 'exemption forgiveness',
+            '投資': 'investment financial',
+            '詐欺': 'fraud scam',
+            'アカデミー賞': 'academy award',
+            '受賞': 'award winner',
+            '住宅ローン': 'home mortgage loan',
+            '審査': 'screening examination',
+            '承認': 'approval authorization',
+        }
+
+        # Extract meaningful keywords from title
+        title_words = clean_keyword.split()
+        translated_keywords = []
+
+        # Try to find and translate key phrases
+        for ko_word, en_translation in keyword_translations.items():
+            if ko_word in clean_keyword:
+                translated_keywords.append(en_translation)
+
+        # If no translation found, extract meaningful words (skip common noise and non-ASCII)
+        if not translated_keywords:
+            noise_words = ['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for']
+            for word in title_words[:3]:  # Take first 3 words
+                # Filter out non-ASCII words to prevent non-English queries
+                try:
+                    word.encode('ascii')
+                    is_ascii = True
+                except UnicodeEncodeError:
+                    is_ascii = False
+
+                if is_ascii and len(word) > 2 and word.lower() not in noise_words:
+                    translated_keywords.append(word)
+
+        # Add category context
+        category_context = {
+            'tech': 'technology digital',
+            'business': 'business professional',
+            'finance': 'finance money',
+            'society': 'society community',
+            'entertainment': 'entertainment culture',
+            'lifestyle': 'lifestyle daily',
+            'sports': 'sports athletic',
+            'education': 'education learning'
+        }
+
+        # Build flexible, contextual query
+        if translated_keywords:
+            base_keywords = ' '.join(translated_keywords[:2])
+        else:
+            # Fallback to pure category context if no English keywords found
+            base_keywords = category_context.get(category, 'technology')
+
+        context = category_context.get(category, category)
+        query = f"{base_keywords} {context}".strip()
+
+        return query, category_context.get(category, 'technology')
+
+    def _unsplash_search_params(self, query: str) -> Tuple[str, Dict, Dict]:
+        """Return (url, headers, params) for an Unsplash photo search"""
+        # Unsplash API endpoint
+        url = "https://api.unsplash.com/search/photos"
+        headers = {
+            "Authorization": f"Client-ID {self.unsplash_key}"
+        }
+        params = {
+            "query": query,
+            "per_page": 30,  # Increased from 5 to 30 for larger image pool
+            "orientation": "landscape"
+        }
+        return url, headers, params
+
+    def _search_unsplash(self, query: str) -> List[Dict]:
+        """Run an Unsplash photo search and return the raw results"""
+        url, headers, params = self._unsplash_search_params(query)
+
+        # Use certifi for SSL verification (Windows compatibility)
+        verify_ssl = certifi.where() if certifi else True
+
+        def search():
             response = requests.get(url, headers=headers, params=params, timeout=10, verify=verify_ssl)
             response.raise_for_status()
+            return response
 
-            data = response.json()
+        response = self.unsplash_limiter.call(search)
+        return response.json().get('results', [])
 
+    def _claim_unused_photo(self, results: List[Dict]) -> Optional[Dict]:
+        """
+        Pick the first search result not used in the last 30 days and record it
+
+        Returns:
+            The claimed Unsplash photo, or None if every result was already used
+        """
+        # Serialize used-image bookkeeping so concurrent workers never pick the same photo
+        with self._used_images_lock:
             # Load used images tracking file
             used_images_file = Path(__file__).parent.parent / "data" / "used_images.json"
             used_images_meta_file = Path(__file__).parent.parent / "data" / "used_images_metadata.json"
@@ -1125,41 +1412,16 @@ Return improved version (body only, no title):""",
 
             # Find first unused image from results
             photo = None
-            if data.get('results'):
-                for result in data['results']:
-                    image_id = result['id']
-                    if image_id not in used_images:
-                        photo = result
-                        used_images.add(image_id)
-                        used_images_meta[image_id] = current_time
-                        break
-            else:
-                safe_print(f"  ⚠️  No images found for '{query}'")
+            for result in results:
+                image_id = result['id']
+                if image_id not in used_images:
+                    photo = result
+                    used_images.add(image_id)
+                    used_images_meta[image_id] = current_time
+                    break
 
-            # If no results or all images are used, try with generic category query
             if photo is None:
-                safe_print(f"  ⚠️  All images for '{query}' already used, trying generic category search...")
-                generic_query = category_context.get(category, 'technology')
-                params['query'] = generic_query
-
-                response = requests.get(url, headers=headers, params=params, timeout=10, verify=verify_ssl)
-                response.raise_for_status()
-                data = response.json()
-
-                if data.get('results'):
-                    for result in data['results']:
-                        image_id = result['id']
-                        if image_id not in used_images:
-                            photo = result
-                            used_images.add(image_id)
-                            used_images_meta[image_id] = current_time
-                            safe_print(f"  ✓ Found unused image with generic search: {generic_query}")
-                            break
-
-                # If still no unused image found, return None (use placeholder)
-                if photo is None:
-                    safe_print(f"  ❌ No unused images available for category '{category}'")
-                    return None
+                return None
 
             # Save used images (legacy file for backward compatibility)
             used_images_file.parent.mkdir(parents=True, exist_ok=True)
@@ -1170,68 +1432,34 @@ Return improved version (body only, no title):""",
             with open(used_images_meta_file, 'w') as f:
                 json.dump(used_images_meta, f, indent=2)
 
-            image_info = {
-                'url': photo['urls']['regular'],
-                'download_url': photo['links']['download_location'],
-                'photographer': photo['user']['name'],
-                'photographer_url': photo['user']['links']['html'],
-                'unsplash_url': photo['links']['html'],
-                'image_id': photo['id']
-            }
-
-            safe_print(f"  ✓ Found image by {image_info['photographer']}")
-            return image_info
-
-        except requests.exceptions.Timeout as e:
-            safe_print(f"  ⚠️  Unsplash API timeout: Request took too long")
-            safe_print(f"     Keyword: {keyword}")
-            safe_print(f"     Error: {mask_secrets(str(e))}")
-            return None
-        except requests.exceptions.HTTPError as e:
-            safe_print(f"  ⚠️  Unsplash API HTTP error: {e.response.status_code if e.response else 'unknown'}")
-            safe_print(f"     Keyword: {keyword}")
-            safe_print(f"     Error: {mask_secrets(str(e))}")
-            return None
-        except requests.exceptions.RequestException as e:
-            safe_print(f"  ⚠️  Unsplash API network error")
-            safe_print(f"     Keyword: {keyword}")
-            safe_print(f"     Error: {mask_secrets(str(e))}")
-            return None
-        except json.JSONDecodeError as e:
-            safe_print(f"  ⚠️  Unsplash API response parsing failed")
-            safe_print(f"     Keyword: {keyword}")
-            safe_print(f"     Error: Invalid JSON response")
-            return None
-        except Exception as e:
-            safe_print(f"  ⚠️  Image fetch failed with unexpected error")
-            safe_print(f"     Keyword: {keyword}")
-            safe_print(f"     Error: {mask_secrets(str(e))}")
-            return None
+        return photo
+
+    @staticmethod
+    def _image_info(photo: Dict) -> Dict:
+        """Extract the fields we keep from an Unsplash photo"""
+        return {
+            'url': photo['urls']['regular'],
+            'download_url': photo['links']['download_location'],
+            'photographer': photo['user']['name'],
+            'photographer_url': photo['user']['links']['html'],
+            'unsplash_url': photo['links']['html'],
+            'image_id': photo['id']
+        }
 
     def download_image(self, image_info: Dict, keyword: str) -> Optional[str]:
         """Download optimized image to static/images/ directory"""
         if not image_info:
             return None
 
+        filepath = None
+        optimized_url = ''
         try:
-            # Create images directory
-            images_dir = Path("static/images")
-            images_dir.mkdir(parents=True, exist_ok=True)
-
-            # Generate filename
-            slug = keyword.lower()
-            slug = ''.join(c if c.isalnum() or c.isspace() else '' for c in slug)
-            slug = slug.replace(' ', '-')[:30]
-            # Use KST for image filename
-            from datetime import timezone, timedelta
-            kst = timezone(timedelta(hours=9))
-            date_str = datetime.now(kst).strftime("%Y%m%d")
-            filename = f"{date_str}-{slug}.jpg"
-            filepath = images_dir / filename
+            filename, filepath = self._image_target(keyword)
 
             # Trigger Unsplash download tracking (required by API terms)
             if image_info.get('download_url'):
                 verify_ssl = certifi.where() if certifi else True
+                self.unsplash_limiter.acquire()
                 requests.get(
                     image_info['download_url'],
                     headers={"Authorization": f"Client-ID {self.unsplash_key}"},
@@ -1239,14 +1467,7 @@ Return improved version (body only, no title):""",
                     verify=verify_ssl
                 )
 
-            # Download optimized image (1200px width, quality 85)
-            # Use Unsplash's regular URL which already includes optimization
-            download_url = image_info.get('url', '')
-            # Add additional optimization parameters
-            if '?' in download_url:
-                optimized_url = f"{download_url}&w=1200&q=85&fm=jpg"
-            else:
-                optimized_url = f"{download_url}?w=1200&q=85&fm=jpg"
+            optimized_url = self._optimized_image_url(image_info)
 
             safe_print(f"  📥 Downloading optimized image (1200px, q85)...")
             # Use certifi for SSL verification (Windows compatibility)
@@ -1254,15 +1475,7 @@ Return improved version (body only, no title):""",
             response = requests.get(optimized_url, timeout=15, verify=verify_ssl)
             response.raise_for_status()
 
-            # Save image
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
-
-            size_kb = len(response.content) / 1024
-            safe_print(f"  ✓ Image saved: {filepath} ({size_kb:.1f} KB)")
-
-            # Return relative path for Hugo
-            return f"/images/{filename}"
+            return self._write_image(filepath, filename, response.content)
 
         except requests.exceptions.Timeout as e:
             safe_print(f"  ⚠️  Image download timeout")
@@ -1284,6 +1497,46 @@ Return improved version (body only, no title):""",
             safe_print(f"     Error: {mask_secrets(str(e))}")
             return None
 
+    @staticmethod
+    def _image_target(keyword: str) -> Tuple[str, Path]:
+        """Return (filename, filepath) for a keyword's image under static/images/"""
+        # Create images directory
+        images_dir = Path("static/images")
+        images_dir.mkdir(parents=True, exist_ok=True)
+
+        # Generate filename
+        slug = keyword.lower()
+        slug = ''.join(c if c.isalnum() or c.isspace() else '' for c in slug)
+        slug = slug.replace(' ', '-')[:30]
+        # Use KST for image filename
+        from datetime import timezone, timedelta
+        kst = timezone(timedelta(hours=9))
+        date_str = datetime.now(kst).strftime("%Y%m%d")
+        filename = f"{date_str}-{slug}.jpg"
+        return filename, images_dir / filename
+
+    @staticmethod
+    def _optimized_image_url(image_info: Dict) -> str:
+        """Build the optimized (1200px width, quality 85) download URL"""
+        # Use Unsplash's regular URL which already includes optimization
+        download_url = image_info.get('url', '')
+        # Add additional optimization parameters
+        if '?' in download_url:
+            return f"{download_url}&w=1200&q=85&fm=jpg"
+        return f"{download_url}?w=1200&q=85&fm=jpg"
+
+    @staticmethod
+    def _write_image(filepath: Path, filename: str, content: bytes) -> str:
+        """Save downloaded image bytes and return the Hugo-relative path"""
+        with open(filepath, 'wb') as f:
+            f.write(content)
+
+        size_kb = len(content) / 1024
+        safe_print(f"  ✓ Image saved: {filepath} ({size_kb:.1f} KB)")
+
+        # Return relative path for Hugo
+        return f"/images/{filename}"
+
     def save_post(self, topic: Dict, title: str, description: str, content: str, image_path: Optional[str] = None, image_credit: Optional[Dict] = None) -> Path:
         """Save post to Hugo content directory"""
         lang = topic['lang']
@@ -1472,12 +1725,743 @@ image: "{image_path}"
         return filepath
 
 
+class AsyncContentGenerator(ContentGenerator):
+    """
+    Coroutine version of ContentGenerator
+
+    Reuses all prompt building and response handling from ContentGenerator, but
+    every stage is a coroutine: Claude calls go through one AsyncAnthropic
+    client and Unsplash calls through one pooled httpx.AsyncClient, so stages
+    of different topics can overlap on a single event loop.
+
+    Usage:
+        async with AsyncContentGenerator() as generator:
+            draft = await generator.generate_draft(topic)
+    """
+
+    def __init__(self, api_key: Optional[str] = None, unsplash_key: Optional[str] = None,
+                 max_connections: int = 10, cache: Optional[ResponseCache] = None,
+                 checkpoints: Optional[CheckpointStore] = None):
+        if httpx is None:
+            safe_print("❌ ERROR: httpx package not installed (required for async mode)")
+            safe_print("   Install with: pip install httpx")
+            raise ImportError("httpx is required for AsyncContentGenerator")
+
+        super().__init__(api_key, unsplash_key, cache, checkpoints)
+
+        # One pooled session for all Unsplash search/tracking/download calls
+        verify_ssl = certifi.where() if certifi else True
+        self.http = httpx.AsyncClient(
+            timeout=15,
+            verify=verify_ssl,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections)
+        )
+
+    def _create_client(self):
+        """Create the pooled async Claude client"""
+        return AsyncAnthropic(
+            api_key=self.api_key,
+            default_headers=PROMPT_CACHING_HEADERS
+        )
+
+    def _create_metered_client(self):
+        """Wrap the async Claude client for usage accounting"""
+        return AsyncMeteredClient(self.client, self.ledger, self.cache, get_limiter('anthropic'))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the pooled HTTP connections"""
+        await self.http.aclose()
+        await self.client.close()
+
+    async def generate_draft(self, topic: Dict) -> str:
+        """Generate initial draft using Draft Agent with Prompt Caching"""
+        safe_print(f"  📝 Generating draft for: {topic['keyword']}")
+
+        try:
+            response = await self.llm.create("draft", **self._draft_request(topic))
+        except Exception as e:
+            self._report_api_error("draft generation", e, topic)
+            raise
+
+        return self._draft_result(response, topic)
+
+    async def edit_draft(self, draft: str, topic: Dict) -> str:
+        """Refine draft using Editor Agent with Prompt Caching"""
+        safe_print(f"  ✏️  Editing draft...")
+
+        request = self._edit_request(draft, topic)
+
+        try:
+            response = await self.llm.create("edit", **request)
+        except Exception as e:
+            self._report_api_error("draft editing", e, topic, draft)
+            raise
+
+        return self._edit_result(response, topic)
+
+    async def generate_metadata(self, content: str, keyword: str, lang: str,
+                                references: List[Dict] = None) -> Tuple[str, str]:
+        """Generate title and meta description in one structured call"""
+        content_preview = self._content_preview(content)
+
+        response = await self.llm.create(
+            "metadata", **self._metadata_request(content_preview, keyword, lang, references)
+        )
+        metadata = self._parse_metadata(response)
+        if metadata is None:
+            safe_print(f"  ⚠️  Metadata response was not valid JSON, using separate title/description calls")
+            return (await self.generate_title(content, keyword, lang, references),
+                    await self.generate_description(content, keyword, lang))
+
+        title = metadata['title']
+        if not self._metadata_title_passed(metadata, content):
+            regenerate_response = await self.llm.create(
+                "title_regenerate", **self._title_regenerate_request(content_preview, keyword, lang)
+            )
+            title = self._clean_response_text(regenerate_response)
+            safe_print(f"  ✓ Regenerated title: {title}")
+
+        description = metadata['description']
+        if validate_description(description):
+            response = await self.llm.create("description", **self._description_request(keyword, lang))
+            description = self._clean_response_text(response)
+
+        return title, description
+
+    async def generate_title(self, content: str, keyword: str, lang: str, references: List[Dict] = None) -> str:
+        """Generate SEO-friendly title based on actual content and references"""
+        content_preview = self._content_preview(content)
+
+        response = await self.llm.create(
+            "title", **self._title_request(content_preview, keyword, lang, references)
+        )
+        generated_title = self._clean_response_text(response)
+
+        # Validate title-content alignment (STRICT check for critical mismatches only)
+        validation_response = await self.llm.create(
+            "title_validation", **self._title_validation_request(generated_title, content_preview, lang)
+        )
+
+        # If validation fails, regenerate title with strict instructions
+        if not self._title_validation_passed(validation_response, generated_title):
+            regenerate_response = await self.llm.create(
+                "title_regenerate", **self._title_regenerate_request(content_preview, keyword, lang)
+            )
+            generated_title = self._clean_response_text(regenerate_response)
+            safe_print(f"  ✓ Regenerated title: {generated_title}")
+
+        return generated_title
+
+    async def generate_description(self, content: str, keyword: str, lang: str) -> str:
+        """Generate meta description"""
+        response = await self.llm.create("description", **self._description_request(keyword, lang))
+        return self._clean_response_text(response)
+
+    async def _search_unsplash(self, query: str) -> List[Dict]:
+        """Run an Unsplash photo search over the pooled session"""
+        url, headers, params = self._unsplash_search_params(query)
+
+        async def search():
+            response = await self.http.get(url, headers=headers, params=params, timeout=10)
+            response.raise_for_status()
+            return response
+
+        response = await self.unsplash_limiter.call_async(search)
+        return response.json().get('results', [])
+
+    async def fetch_featured_image(self, keyword: str, category: str) -> Optional[Dict]:
+        """Fetch featured image from Unsplash API"""
+        if not self.unsplash_key:
+            return None
+
+        try:
+            query, generic_query = self._build_image_query(keyword, category)
+
+            safe_print(f"  🔍 Searching Unsplash for: {query}")
+            results = await self._search_unsplash(query)
+            if not results:
+                safe_print(f"  ⚠️  No images found for '{query}'")
+            # used_images.json bookkeeping is blocking file I/O, so it runs off the event loop
+            photo = await asyncio.to_thread(self._claim_unused_photo, results)
+
+            # If no results or all images are used, try with generic category query
+            if photo is None:
+                safe_print(f"  ⚠️  All images for '{query}' already used, trying generic category search...")
+                photo = await asyncio.to_thread(self._claim_unused_photo, await self._search_unsplash(generic_query))
+
+                # If still no unused image found, return None (use placeholder)
+                if photo is None:
+                    safe_print(f"  ❌ No unused images available for category '{category}'")
+                    return None
+                safe_print(f"  ✓ Found unused image with generic search: {generic_query}")
+
+            image_info = self._image_info(photo)
+            safe_print(f"  ✓ Found image by {image_info['photographer']}")
+            return image_info
+
+        except httpx.TimeoutException as e:
+            safe_print(f"  ⚠️  Unsplash API timeout: Request took too long")
+            safe_print(f"     Keyword: {keyword}")
+            safe_print(f"     Error: {mask_secrets(str(e))}")
+            return None
+        except httpx.HTTPStatusError as e:
+            safe_print(f"  ⚠️  Unsplash API HTTP error: {e.response.status_code}")
+            safe_print(f"     Keyword: {keyword}")
+            safe_print(f"     Error: {mask_secrets(str(e))}")
+            return None
+        except httpx.RequestError as e:
+            safe_print(f"  ⚠️  Unsplash API network error")
+            safe_print(f"     Keyword: {keyword}")
+            safe_print(f"     Error: {mask_secrets(str(e))}")
+            return None
+        except json.JSONDecodeError as e:
+            safe_print(f"  ⚠️  Unsplash API response parsing failed")
+            safe_print(f"     Keyword: {keyword}")
+            safe_print(f"     Error: Invalid JSON response")
+            return None
+        except Exception as e:
+            safe_print(f"  ⚠️  Image fetch failed with unexpected error")
+            safe_print(f"     Keyword: {keyword}")
+            safe_print(f"     Error: {mask_secrets(str(e))}")
+            return None
+
+    async def download_image(self, image_info: Dict, keyword: str) -> Optional[str]:
+        """Download optimized image to static/images/ directory"""
+        if not image_info:
+            return None
+
+        filepath = None
+        try:
+            filename, filepath = self._image_target(keyword)
+
+            # Trigger Unsplash download tracking (required by API terms)
+            if image_info.get('download_url'):
+                await self.unsplash_limiter.acquire_async()
+                await self.http.get(
+                    image_info['download_url'],
+                    headers={"Authorization": f"Client-ID {self.unsplash_key}"},
+                    timeout=5
+                )
+
+            safe_print(f"  📥 Downloading optimized image (1200px, q85)...")
+            response = await self.http.get(self._optimized_image_url(image_info), timeout=15)
+            response.raise_for_status()
+
+            return await asyncio.to_thread(self._write_image, filepath, filename, response.content)
+
+        except httpx.TimeoutException:
+            safe_print(f"  ⚠️  Image download timeout")
+            safe_print(f"     Keyword: {keyword}")
+            return None
+        except httpx.HTTPStatusError as e:
+            safe_print(f"  ⚠️  Image download HTTP error: {e.response.status_code}")
+            safe_print(f"     Keyword: {keyword}")
+            return None
+        except IOError as e:
+            safe_print(f"  ⚠️  File system error during image save")
+            safe_print(f"     Path: {filepath}")
+            safe_print(f"     Error: {str(e)}")
+            return None
+        except Exception as e:
+            safe_print(f"  ⚠️  Image download failed with unexpected error")
+            safe_print(f"     Keyword: {keyword}")
+            safe_print(f"     Error: {mask_secrets(str(e))}")
+            return None
+
+
+def _load_checkpoint(checkpoint: Optional[TopicCheckpoint], stage: str):
+    """Load a stage artifact, or None if checkpoints are disabled or the stage is missing"""
+    return checkpoint.load(stage) if checkpoint is not None else None
+
+
+def _save_checkpoint(checkpoint: Optional[TopicCheckpoint], stage: str, value):
+    """Save a stage artifact if checkpoints are enabled"""
+    if checkpoint is not None:
+        checkpoint.save(stage, value)
+
+
+def _checkpointed_image(checkpoint: Optional[TopicCheckpoint]) -> Optional[Tuple[Optional[str], Optional[Dict], List[str]]]:
+    """Return a checkpointed image result if its file is still on disk"""
+    image = _load_checkpoint(checkpoint, 'image')
+    if not image or not image.get('image_path'):
+        return None
+    if not (Path("static") / image['image_path'].lstrip('/')).exists():
+        return None
+    return image['image_path'], image.get('image_credit'), [f"  ♻️  Using checkpointed image: {image['image_path']}"]
+
+
+def _fetch_image(generator: ContentGenerator, topic: Dict,
+                 checkpoint: Optional[TopicCheckpoint] = None) -> Tuple[Optional[str], Optional[Dict], List[str]]:
+    """
+    Fetch and download the featured image (step 4), capturing its log output
+
+    Runs alongside the LLM stages, so its lines are held back and printed
+    by _join_image() to keep the topic's log in step order.
+
+    Returns:
+        (image_path, image_credit, log_lines)
+    """
+    resumed = _checkpointed_image(checkpoint)
+    if resumed:
+        return resumed
+
+    image_path = None
+    image_credit = None
+    with buffered_output(emit=False) as lines:
+        try:
+            image_info = generator.fetch_featured_image(topic['keyword'], topic['category'])
+            if image_info:
+                image_path = generator.download_image(image_info, topic['keyword'])
+                if image_path:
+                    image_credit = image_info
+        except Exception as e:
+            safe_print(f"  ⚠️  WARNING: Image fetch failed, will use placeholder")
+            safe_print(f"     Error: {mask_secrets(str(e))}")
+
+    if image_path:
+        _save_checkpoint(checkpoint, 'image', {'image_path': image_path, 'image_credit': image_credit})
+    return image_path, image_credit, lines
+
+
+async def _fetch_image_async(generator: AsyncContentGenerator, topic: Dict,
+                             checkpoint: Optional[TopicCheckpoint] = None) -> Tuple[Optional[str], Optional[Dict], List[str]]:
+    """Coroutine version of _fetch_image()"""
+    resumed = await asyncio.to_thread(_checkpointed_image, checkpoint)
+    if resumed:
+        return resumed
+
+    image_path = None
+    image_credit = None
+    with buffered_output(emit=False) as lines:
+        try:
+            image_info = await generator.fetch_featured_image(topic['keyword'], topic['category'])
+            if image_info:
+                image_path = await generator.download_image(image_info, topic['keyword'])
+                if image_path:
+                    image_credit = image_info
+        except Exception as e:
+            safe_print(f"  ⚠️  WARNING: Image fetch failed, will use placeholder")
+            safe_print(f"     Error: {mask_secrets(str(e))}")
+
+    if image_path:
+        await asyncio.to_thread(_save_checkpoint, checkpoint, 'image',
+                                {'image_path': image_path, 'image_credit': image_credit})
+    return image_path, image_credit, lines
+
+
+def _join_image(result: Tuple[Optional[str], Optional[Dict], List[str]]) -> Tuple[Optional[str], Optional[Dict]]:
+    """Print the background image step's log and return (image_path, image_credit)"""
+    image_path, image_credit, lines = result
+    safe_print(f"  → Step 4/5: Fetching image...")
+    for line in lines:
+        safe_print(line)
+    return image_path, image_credit
+
+
+def _discard_image(image_path: Optional[str]):
+    """Remove an image downloaded for a topic that failed before its post was saved"""
+    if not image_path:
+        return
+    try:
+        (Path("static") / image_path.lstrip('/')).unlink()
+    except OSError:
+        pass
+
+
+def _topic_checkpoint(generator: ContentGenerator, topic: Dict) -> Optional[TopicCheckpoint]:
+    """Open the topic's checkpoint and log which stages an earlier attempt completed"""
+    if generator.checkpoints is None:
+        return None
+    checkpoint = generator.checkpoints.for_topic(topic['id'])
+    completed = checkpoint.completed()
+    if completed:
+        safe_print(f"  ♻️  Resuming from checkpoint: {', '.join(completed)}")
+    return checkpoint
+
+
+def _keep_or_discard(checkpoint: Optional[TopicCheckpoint], image_path: Optional[str]):
+    """After a failure, keep checkpointed work for the retry (or drop the image without checkpoints)"""
+    if checkpoint is None:
+        _discard_image(image_path)
+        return
+    completed = checkpoint.completed()
+    if completed:
+        safe_print(f"  💾 Checkpoint kept for retry: {', '.join(completed)}\n")
+
+
+def _log_topic_header(topic: Dict, position: int, total: int):
+    """Print the per-topic header line block"""
+    safe_print(f"[{position}/{total}] {topic['id']}")
+    safe_print(f"  Keyword: {topic['keyword']}")
+    safe_print(f"  Category: {topic['category']}")
+    safe_print(f"  Language: {topic['lang']}")
+
+
+def _save_and_complete(generator: ContentGenerator, topic: Dict, title: str, description: str,
+                       final_content: str, image_path: Optional[str], image_credit: Optional[Dict],
+                       update_queue: bool) -> str:
+    """Save the post (step 5) and mark the topic completed in the queue"""
+    safe_print(f"  → Step 5/5: Saving post...")
+    try:
+        filepath = generator.save_post(topic, title, description, final_content, image_path, image_credit)
+    except IOError as e:
+        safe_print(f"  ❌ ERROR: Failed to save post to filesystem")
+        safe_print(f"     Error: {str(e)}")
+        raise
+    except Exception as e:
+        safe_print(f"  ❌ ERROR: Unexpected error during save")
+        safe_print(f"     Error: {mask_secrets(str(e))}")
+        raise
+
+    # Mark as completed
+    if update_queue:
+        try:
+            with _queue_lock:
+                mark_completed(topic['id'], lease_id=topic.get('lease_id'))
+        except Exception as e:
+            safe_print(f"  ⚠️  WARNING: Failed to mark topic as completed in queue")
+            safe_print(f"     Topic ID: {topic['id']}")
+            safe_print(f"     Error: {str(e)}")
+            # Don't fail the whole process if queue update fails
+
+    safe_print(f"  ✅ Completed!\n")
+    return str(filepath)
+
+
+def _handle_topic_failure(topic: Dict, error: Exception, update_queue: bool):
+    """Log a failed topic and send it back to the queue for retry"""
+    if isinstance(error, KeyError):
+        safe_print(f"  ❌ FAILED: Missing required field in topic data")
+        safe_print(f"     Topic ID: {topic.get('id', 'unknown')}")
+        safe_print(f"     Missing field: {str(error)}\n")
+        message = f"Missing field: {str(error)}"
+    elif isinstance(error, ValueError):
+        safe_print(f"  ❌ FAILED: Invalid data or API response")
+        safe_print(f"     Topic ID: {topic.get('id', 'unknown')}")
+        safe_print(f"     Error: {mask_secrets(str(error))}\n")
+        message = mask_secrets(str(error))
+    else:
+        safe_print(f"  ❌ FAILED: Unexpected error")
+        safe_print(f"     Topic ID: {topic.get('id', 'unknown')}")
+        safe_print(f"     Error type: {type(error).__name__}")
+        safe_print(f"     Error: {mask_secrets(str(error))}\n")
+        message = mask_secrets(str(error))
+
+    if update_queue:
+        with _queue_lock:
+            mark_failed(topic['id'], message, lease_id=topic.get('lease_id'))
+
+
+def process_topic(generator: ContentGenerator, topic: Dict, position: int, total: int,
+                  update_queue: bool = True, group_output: bool = False,
+                  final_content: Optional[str] = None) -> Optional[str]:
+    """
+    Run the full pipeline (draft → edit → metadata → image → save) for one topic
+
+    Args:
+        generator: Shared ContentGenerator instance
+        topic: Reserved topic from the queue
+        position: 1-based position of the topic in this run (for log output)
+        total: Number of topics in this run
+        update_queue: Mark the topic completed/failed in the queue
+        group_output: Buffer log output and print it as one block (for --workers > 1)
+        final_content: Edited content produced elsewhere (--batch); skips steps 1-2
+
+    Stages completed by an earlier attempt (see utils/checkpoint.py) are
+    loaded from the topic's checkpoint instead of being regenerated.
+
+    Returns:
+        Path of the saved post, or None if the topic failed
+    """
+    with buffered_output() if group_output else nullcontext():
+        _log_topic_header(topic, position, total)
+        checkpoint = _topic_checkpoint(generator, topic)
+
+        # The image step depends only on keyword/category, so start it now and
+        # let it run alongside the LLM stages; it is joined just before saving
+        safe_print(f"  → Starting image lookup in background...")
+        image_executor = ThreadPoolExecutor(max_workers=1)
+        image_future = image_executor.submit(_fetch_image, generator, topic, checkpoint)
+
+        try:
+            # Generate content
+            if final_content is not None:
+                safe_print(f"  → Steps 1-2/5: Using draft and edit from batch")
+                _save_checkpoint(checkpoint, 'edited', final_content)
+            else:
+                final_content = _load_checkpoint(checkpoint, 'edited')
+                if final_content is not None:
+                    safe_print(f"  → Steps 1-2/5: Using checkpointed edit ({len(final_content)} chars)")
+
+            if final_content is None:
+                draft = _load_checkpoint(checkpoint, 'draft')
+                if draft is None:
+                    safe_print(f"  → Step 1/5: Generating draft...")
+                    draft = generator.generate_draft(topic)
+                    _save_checkpoint(checkpoint, 'draft', draft)
+                else:
+                    safe_print(f"  → Step 1/5: Using checkpointed draft ({len(draft)} chars)")
+
+                safe_print(f"  → Step 2/5: Editing draft...")
+                final_content = generator.edit_draft(draft, topic)
+                _save_checkpoint(checkpoint, 'edited', final_content)
+
+            # Generate metadata
+            metadata = _load_checkpoint(checkpoint, 'metadata')
+            if metadata:
+                safe_print(f"  → Step 3/5: Using checkpointed metadata")
+                title, description = metadata['title'], metadata['description']
+            else:
+                safe_print(f"  → Step 3/5: Generating metadata...")
+                try:
+                    title, description = generator.generate_metadata(
+                        final_content, topic['keyword'], topic['lang'], topic.get('references')
+                    )
+                    _save_checkpoint(checkpoint, 'metadata', {'title': title, 'description': description})
+                except Exception as e:
+                    safe_print(f"  ⚠️  WARNING: Metadata generation failed, using defaults")
+                    safe_print(f"     Error: {mask_secrets(str(e))}")
+                    title = topic['keyword']
+                    description = f"Article about {topic['keyword']}"
+
+            # Join featured image
+            image_path, image_credit = _join_image(image_future.result())
+
+            filepath = _save_and_complete(generator, topic, title, description, final_content,
+                                          image_path, image_credit, update_queue)
+            if checkpoint is not None:
+                checkpoint.clear()
+            return filepath
+
+        except Exception as e:
+            _handle_topic_failure(topic, e, update_queue)
+            _keep_or_discard(checkpoint, image_future.result()[0])
+        finally:
+            image_executor.shutdown(wait=False)
+
+        return None
+
+
+async def process_topic_async(generator: AsyncContentGenerator, topic: Dict, position: int, total: int,
+                              update_queue: bool = True, group_output: bool = False) -> Optional[str]:
+    """
+    Coroutine version of process_topic() driven by an AsyncContentGenerator
+
+    Checkpoint reads and writes, the post save and queue updates are blocking
+    file I/O (fsync), so they run in worker threads instead of stalling the
+    other topics on the loop.
+    """
+    with buffered_output() if group_output else nullcontext():
+        _log_topic_header(topic, position, total)
+        checkpoint = await asyncio.to_thread(_topic_checkpoint, generator, topic)
+
+        # Image lookup runs as its own task alongside the LLM stages
+        safe_print(f"  → Starting image lookup in background...")
+        image_task = asyncio.create_task(_fetch_image_async(generator, topic, checkpoint))
+
+        try:
+            # Generate content
+            final_content = await asyncio.to_thread(_load_checkpoint, checkpoint, 'edited')
+            if final_content is not None:
+                safe_print(f"  → Steps 1-2/5: Using checkpointed edit ({len(final_content)} chars)")
+            else:
+                draft = await asyncio.to_thread(_load_checkpoint, checkpoint, 'draft')
+                if draft is None:
+                    safe_print(f"  → Step 1/5: Generating draft...")
+                    draft = await generator.generate_draft(topic)
+                    await asyncio.to_thread(_save_checkpoint, checkpoint, 'draft', draft)
+                else:
+                    safe_print(f"  → Step 1/5: Using checkpointed draft ({len(draft)} chars)")
+
+                safe_print(f"  → Step 2/5: Editing draft...")
+                final_content = await generator.edit_draft(draft, topic)
+                await asyncio.to_thread(_save_checkpoint, checkpoint, 'edited', final_content)
+
+            # Generate metadata
+            metadata = await asyncio.to_thread(_load_checkpoint, checkpoint, 'metadata')
+            if metadata:
+                safe_print(f"  → Step 3/5: Using checkpointed metadata")
+                title, description = metadata['title'], metadata['description']
+            else:
+                safe_print(f"  → Step 3/5: Generating metadata...")
+                try:
+                    title, description = await generator.generate_metadata(
+                        final_content, topic['keyword'], topic['lang'], topic.get('references')
+                    )
+                    await asyncio.to_thread(_save_checkpoint, checkpoint, 'metadata',
+                                            {'title': title, 'description': description})
+                except Exception as e:
+                    safe_print(f"  ⚠️  WARNING: Metadata generation failed, using defaults")
+                    safe_print(f"     Error: {mask_secrets(str(e))}")
+                    title = topic['keyword']
+                    description = f"Article about {topic['keyword']}"
+
+            # Join featured image
+            image_path, image_credit = _join_image(await image_task)
+
+            filepath = await asyncio.to_thread(_save_and_complete, generator, topic, title, description,
+                                               final_content, image_path, image_credit, update_queue)
+            if checkpoint is not None:
+                await asyncio.to_thread(checkpoint.clear)
+            return filepath
+
+        except Exception as e:
+            await asyncio.to_thread(_handle_topic_failure, topic, e, update_queue)
+            # Wait for the image (it catches its own errors): cancelling would not stop a
+            # download already writing its file, which would then never be discarded
+            await asyncio.to_thread(_keep_or_discard, checkpoint, (await image_task)[0])
+
+        return None
+
+
+async def run_topics_async(generator: AsyncContentGenerator, topics: List[Dict], workers: int,
+                           update_queue: bool) -> List[Optional[str]]:
+    """
+    Process topics on one event loop with at most `workers` in flight
+
+    While one topic waits on Claude, others can be fetching images or
+    drafting, so the pooled clients stay busy. Results keep topic order.
+    """
+    semaphore = asyncio.Semaphore(workers)
+
+    async def run(position: int, topic: Dict) -> Optional[str]:
+        async with semaphore:
+            return await process_topic_async(generator, topic, position, len(topics),
+                                             update_queue, group_output=workers > 1)
+
+    async with generator:
+        return await asyncio.gather(*(run(i, topic) for i, topic in enumerate(topics, 1)))
+
+
+def run_topics(generator: ContentGenerator, topics: List[Dict], workers: int, update_queue: bool,
+               final_contents: Optional[Dict[str, str]] = None) -> List[Optional[str]]:
+    """
+    Process topics sequentially or on a thread pool, keeping topic order
+
+    Args:
+        final_contents: Edited content per topic ID (--batch), passed to process_topic()
+    """
+    final_contents = final_contents or {}
+
+    if workers == 1:
+        return [
+            process_topic(generator, topic, i, len(topics), update_queue,
+                          final_content=final_contents.get(topic['id']))
+            for i, topic in enumerate(topics, 1)
+        ]
+
+    safe_print(f"  ⚡ Processing with {workers} concurrent workers\n")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(process_topic, generator, topic, i, len(topics), update_queue, True,
+                            final_contents.get(topic['id']))
+            for i, topic in enumerate(topics, 1)
+        ]
+        # Collect in submission order so generated_files.json stays deterministic
+        return [future.result() for future in futures]
+
+
+def run_topics_batch(generator: ContentGenerator, topics: List[Dict], workers: int,
+                     update_queue: bool) -> List[Optional[str]]:
+    """
+    Generate drafts and edits through the Message Batches API
+
+    All drafts go out as one batch, then all edits as a second batch; the
+    remaining steps (metadata, image, save) run per topic as usual. Batch IDs
+    are stored on the topics in the queue so an interrupted run resumes them.
+    Drafts are checkpointed, and topics with a checkpointed draft or edit
+    skip the batches for those stages.
+    """
+    runner = BatchRunner(generator.client, get_queue() if update_queue else None)
+    failures: Dict[str, str] = {}
+
+    checkpoints = {}
+    if generator.checkpoints is not None:
+        checkpoints = {topic['id']: generator.checkpoints.for_topic(topic['id']) for topic in topics}
+    edited = {t['id'] for t in topics if _load_checkpoint(checkpoints.get(t['id']), 'edited') is not None}
+    drafts = {}
+    for topic in topics:
+        if topic['id'] not in edited:
+            draft = _load_checkpoint(checkpoints.get(topic['id']), 'draft')
+            if draft is not None:
+                drafts[topic['id']] = draft
+    if edited or drafts:
+        safe_print(f"  ♻️  Using checkpoints: {len(edited)} edit(s), {len(drafts)} draft(s)")
+
+    draft_topics = [t for t in topics if t['id'] not in edited and t['id'] not in drafts]
+    safe_print(f"  📦 Step 1/5: Generating {len(draft_topics)} drafts as one batch...")
+    messages, errors = runner.run_stage('draft', draft_topics, generator._draft_request)
+    failures.update(errors)
+
+    for topic in draft_topics:
+        if topic['id'] in messages:
+            generator.ledger.record('draft', generator.model, messages[topic['id']].usage, batch=True)
+            try:
+                drafts[topic['id']] = generator._draft_result(messages[topic['id']], topic)
+            except Exception as e:
+                failures[topic['id']] = mask_secrets(str(e))
+                continue
+            _save_checkpoint(checkpoints.get(topic['id']), 'draft', drafts[topic['id']])
+
+    edit_topics = [t for t in topics if t['id'] in drafts]
+    safe_print(f"\n  📦 Step 2/5: Editing {len(edit_topics)} drafts as one batch...")
+    messages, errors = runner.run_stage(
+        'edit', edit_topics, lambda topic: generator._edit_request(drafts[topic['id']], topic)
+    )
+    failures.update(errors)
+
+    final_contents = {}
+    for topic in edit_topics:
+        if topic['id'] in messages:
+            generator.ledger.record('edit', generator.model, messages[topic['id']].usage, batch=True)
+            try:
+                final_contents[topic['id']] = generator._edit_result(messages[topic['id']], topic)
+            except Exception as e:
+                failures[topic['id']] = mask_secrets(str(e))
+    safe_print("")
+
+    for topic in topics:
+        if topic['id'] in failures:
+            _handle_topic_failure(topic, ValueError(failures[topic['id']]), update_queue)
+
+    ready = [t for t in topics if t['id'] in final_contents or t['id'] in edited]
+    if not ready:
+        return []
+
+    workers = max(1, min(workers, len(ready)))
+    return run_topics(generator, ready, workers, update_queue, final_contents)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Generate blog posts")
     parser.add_argument("--count", type=int, default=3, help="Number of posts to generate")
-    parser.add_argument("--topic-id", type=str, help="Specific topic ID to generate")
+    parser.add_argument("--topic-id", type=str, help="Specific topic ID(s) to generate (comma-separated)")
+    parser.add_argument("--policy", choices=RESERVATION_POLICIES, default="priority",
+                        help="How --count topics are picked: highest priority first, or a fair share "
+                             "across languages and categories (default: priority)")
+    parser.add_argument("--workers", type=int, default=1, help="Number of topics to process concurrently (default: 1)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--async", dest="use_async", action="store_true",
+                      help="Run topics on one event loop with AsyncContentGenerator (use with --workers)")
+    mode.add_argument("--batch", action="store_true",
+                      help="Submit drafts and edits through the Message Batches API (resumes interrupted runs)")
+    parser.add_argument("--no-cache", action="store_true", help="Always call Claude, bypassing the response cache")
+    parser.add_argument("--no-checkpoints", action="store_true",
+                        help="Don't checkpoint or resume per-topic stages (draft, edit, metadata, image)")
+    parser.add_argument("--replay", action="store_true",
+                        help="Serve Claude responses only from the cache (offline rerun, requires --topic-id)")
     args = parser.parse_args()
 
+    if args.replay and (args.no_cache or args.batch or not args.topic_id):
+        parser.error("--replay requires --topic-id and cannot be combined with --no-cache or --batch")
+
     # Pre-flight checks
     safe_print(f"\n{'='*60}")
     safe_print(f"  🔍 Pre-flight Environment Checks")
@@ -1486,7 +2470,10 @@ def main():
     anthropic_key = os.environ.get("ANTHROPIC_API_KEY")
     unsplash_key = os.environ.get("UNSPLASH_ACCESS_KEY")
 
-    if anthropic_key:
+    if args.replay:
+        safe_print("  ⏪ Replay mode: Claude responses from cache only, Unsplash disabled")
+        anthropic_key = anthropic_key or "replay-offline"
+    elif anthropic_key:
         safe_print("  ✓ ANTHROPIC_API_KEY: Configured")
     else:
         safe_print("  ❌ ANTHROPIC_API_KEY: NOT FOUND")
@@ -1500,27 +2487,51 @@ def main():
     safe_print("")
 
     # Initialize generator
+    cache = None if args.no_cache else ResponseCache(replay=args.replay)
+
+    # Replay reruns every stage from the response cache, so it skips checkpoints
+    checkpoints = None
+    if not (args.no_checkpoints or args.replay):
+        checkpoints = CheckpointStore()
+        pruned = checkpoints.prune()
+        if pruned:
+            safe_print(f"  🧹 Removed {pruned} stale topic checkpoint(s)")
+
     try:
-        generator = ContentGenerator()
+        if args.use_async:
+            generator = AsyncContentGenerator(anthropic_key, cache=cache, checkpoints=checkpoints)
+        else:
+            generator = ContentGenerator(anthropic_key, cache=cache, checkpoints=checkpoints)
+    except ImportError:
+        sys.exit(1)
     except ValueError as e:
         safe_print(f"Error: {str(e)}")
         safe_print("\nSet ANTHROPIC_API_KEY environment variable:")
         safe_print("  export ANTHROPIC_API_KEY='your-api-key'")
         sys.exit(1)
 
+    if args.replay:
+        # Offline rerun: no image lookups either
+        generator.unsplash_key = None
+
     # Get topics
     if args.topic_id:
         # Load specific topic (for testing)
-        from topic_queue import get_queue
         queue = get_queue()
-        data = queue._load_queue()
-        topics = [t for t in data['topics'] if t['id'] == args.topic_id]
+        topic_ids = [topic_id.strip() for topic_id in args.topic_id.split(',') if topic_id.strip()]
+        topics = [t for t in (queue.get_topic(topic_id) for topic_id in topic_ids) if t]
         if not topics:
             safe_print(f"Error: Topic {args.topic_id} not found")
             sys.exit(1)
     else:
+        # Resume topics whose batches were in flight when a previous run
+        # stopped (lease expired, so no live run still owns them)
+        topics = resume_batch_topics() if args.batch else []
+        if topics:
+            safe_print(f"  ♻️  Resuming {len(topics)} topic(s) from an interrupted batch run")
+
         # Reserve topics from queue
-        topics = reserve_topics(count=args.count)
+        topics += reserve_topics(count=args.count - len(topics), policy=args.policy)
 
     if not topics:
         safe_print("No topics available in queue")
@@ -1530,92 +2541,23 @@ def main():
     safe_print(f"  Generating {len(topics)} posts")
     safe_print(f"{'='*60}\n")
 
-    generated_files = []
-
-    for i, topic in enumerate(topics, 1):
-        safe_print(f"[{i}/{len(topics)}] {topic['id']}")
-        safe_print(f"  Keyword: {topic['keyword']}")
-        safe_print(f"  Category: {topic['category']}")
-        safe_print(f"  Language: {topic['lang']}")
-
-        try:
-            # Generate content
-            safe_print(f"  → Step 1/5: Generating draft...")
-            draft = generator.generate_draft(topic)
-
-            safe_print(f"  → Step 2/5: Editing draft...")
-            final_content = generator.edit_draft(draft, topic)
-
-            # Generate metadata
-            safe_print(f"  → Step 3/5: Generating metadata...")
-            try:
-                title = generator.generate_title(final_content, topic['keyword'], topic['lang'], topic.get('references'))
-                description = generator.generate_description(final_content, topic['keyword'], topic['lang'])
-            except Exception as e:
-                safe_print(f"  ⚠️  WARNING: Metadata generation failed, using defaults")
-                safe_print(f"     Error: {mask_secrets(str(e))}")
-                title = topic['keyword']
-                description = f"Article about {topic['keyword']}"
-
-            # Fetch featured image
-            safe_print(f"  → Step 4/5: Fetching image...")
-            image_path = None
-            image_credit = None
-            try:
-                image_info = generator.fetch_featured_image(topic['keyword'], topic['category'])
-                if image_info:
-                    image_path = generator.download_image(image_info, topic['keyword'])
-                    if image_path:
-                        image_credit = image_info
-            except Exception as e:
-                safe_print(f"  ⚠️  WARNING: Image fetch failed, will use placeholder")
-                safe_print(f"     Error: {mask_secrets(str(e))}")
-
-            # Save post with image
-            safe_print(f"  → Step 5/5: Saving post...")
-            try:
-                filepath = generator.save_post(topic, title, description, final_content, image_path, image_credit)
-            except IOError as e:
-                safe_print(f"  ❌ ERROR: Failed to save post to filesystem")
-                safe_print(f"     Error: {str(e)}")
-                raise
-            except Exception as e:
-                safe_print(f"  ❌ ERROR: Unexpected error during save")
-                safe_print(f"     Error: {mask_secrets(str(e))}")
-                raise
+    workers = max(1, min(args.workers, len(topics)))
+    update_queue = not args.topic_id
+
+    # Leases are renewed while topics are in flight. Each completed/failed
+    # transition is written as its topic finishes (one journal append), so a
+    # killed run never loses the bookkeeping for posts already saved
+    queue = get_queue() if update_queue else None
+    with queue.heartbeat(topics) if queue else nullcontext():
+        if args.use_async:
+            safe_print(f"  ⚡ Async mode with up to {workers} topics in flight\n")
+            results = asyncio.run(run_topics_async(generator, topics, workers, update_queue))
+        elif args.batch:
+            results = run_topics_batch(generator, topics, workers, update_queue)
+        else:
+            results = run_topics(generator, topics, workers, update_queue)
 
-            # Mark as completed
-            if not args.topic_id:
-                try:
-                    mark_completed(topic['id'])
-                except Exception as e:
-                    safe_print(f"  ⚠️  WARNING: Failed to mark topic as completed in queue")
-                    safe_print(f"     Topic ID: {topic['id']}")
-                    safe_print(f"     Error: {str(e)}")
-                    # Don't fail the whole process if queue update fails
-
-            generated_files.append(str(filepath))
-            safe_print(f"  ✅ Completed!\n")
-
-        except KeyError as e:
-            safe_print(f"  ❌ FAILED: Missing required field in topic data")
-            safe_print(f"     Topic ID: {topic.get('id', 'unknown')}")
-            safe_print(f"     Missing field: {str(e)}\n")
-            if not args.topic_id:
-                mark_failed(topic['id'], f"Missing field: {str(e)}")
-        except ValueError as e:
-            safe_print(f"  ❌ FAILED: Invalid data or API response")
-            safe_print(f"     Topic ID: {topic.get('id', 'unknown')}")
-            safe_print(f"     Error: {mask_secrets(str(e))}\n")
-            if not args.topic_id:
-                mark_failed(topic['id'], mask_secrets(str(e)))
-        except Exception as e:
-            safe_print(f"  ❌ FAILED: Unexpected error")
-            safe_print(f"     Topic ID: {topic.get('id', 'unknown')}")
-            safe_print(f"     Error type: {type(e).__name__}")
-            safe_print(f"     Error: {mask_secrets(str(e))}\n")
-            if not args.topic_id:
-                mark_failed(topic['id'], mask_secrets(str(e)))
+    generated_files = [filepath for filepath in results if filepath]
 
     # Save generated files list for quality gate
     output_file = Path("generated_files.json")
@@ -1668,6 +2610,8 @@ def main():
     safe_print(f"  File list saved to: {output_file}")
     safe_print(f"{'='*60}\n")
 
+    generator.ledger.print_summary()
+
 
 if __name__ == "__main__":
     main()
@@ -13,7 +13,6 @@ Usage:
 import json
 import os
 import sys
-import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List
@@ -32,6 +31,9 @@ except ImportError:
 # Add utils to path
 sys.path.insert(0, str(Path(__file__).parent))
 from utils.security import safe_print, mask_secrets
+from utils.llm_usage import UsageLedger, MeteredClient
+from utils.rate_limit import get_limiter
+from topic_queue import get_queue, topic_expires_at
 
 try:
     from anthropic import Anthropic
@@ -41,27 +43,17 @@ except ImportError:
     sys.exit(1)
 
 
-CURATION_PROMPT_WITH_TRENDS = """역할:
+# Static curation rules: the cached prefix of every curation request
+CURATION_PROMPT = """역할:
 너는 광고 수익 최적화를 위한 키워드 큐레이터다.
 아래 실시간 트렌드 검색 결과를 바탕으로 **고CPC, 감정 반응형** 키워드를 제안하라.
 
-실시간 트렌드 데이터 (언어별로 구분됨):
-
-🇺🇸 English (US) Trends:
-{trends_en}
-
-🇰🇷 Korean (KR) Trends:
-{trends_ko}
-
-🇯🇵 Japanese (JP) Trends:
-{trends_ja}
-
 **🔴 중요 규칙: 언어-키워드 매칭 (CRITICAL - 위반 시 즉시 거부)**
 1. English (US) 트렌드의 Query → language: "en"으로만 사용
 2. Korean (KR) 트렌드의 Query → language: "ko"로만 사용
 3. Japanese (JP) 트렌드의 Query → language: "ja"로만 사용
 4. **절대로 일본어 키워드를 한국어 게시물에 사용하거나, 한국어 키워드를 일본어 게시물에 사용하지 말 것**
-5. 위 트렌드 데이터의 Query를 그대로 keyword로 사용하라. 절대 재해석하거나 재작성하지 말 것.
+5. 아래 트렌드 데이터의 Query를 그대로 keyword로 사용하라. 절대 재해석하거나 재작성하지 말 것.
 
 **🚨 언어 문자 검증 규칙 (반드시 준수):**
 - **영어(en) 키워드**: 한글(가-힣), 히라가나(ぁ-ん), 가타카나(ァ-ヶ), 한자(一-龯) 포함 금지
@@ -89,8 +81,8 @@ CURATION_PROMPT_WITH_TRENDS = """역할:
 반드시 JSON 형식으로만 응답하라.
 
 [
-  {{
-    "keyword": "위 트렌드 데이터의 Query를 그대로 복사 (재해석 금지)",
+  {
+    "keyword": "아래 트렌드 데이터의 Query를 그대로 복사 (재해석 금지)",
     "raw_search_title": "사용자가 구글에 검색할 때 정확히 입력하는 검색어 (keyword와 동일하게)",
     "editorial_title": "기사 제목 형식의 독자 친화적 제목",
     "core_fear_question": "사용자의 핵심 두려움을 담은 질문 한 문장",
@@ -106,7 +98,7 @@ CURATION_PROMPT_WITH_TRENDS = """역할:
     "risk_level": "safe",
     "name_policy": "no_real_names",
     "intent_signal": "STATE_CHANGE"
-  }}
+  }
 ]
 
 중요:
@@ -121,7 +113,7 @@ CURATION_PROMPT_WITH_TRENDS = """역할:
 - intent_signal은 "STATE_CHANGE", "PROMISE_BROKEN", "SILENCE", "DEADLINE_LOST", "COMPARISON" 중 하나
 - 지금 시점(2026년 1월)에서 현실적인 키워드만 제안
 - 예시는 절대 사용하지 말고, 실제 검색 가능성이 높은 키워드만 제안
-- **중요**: 위 실시간 트렌드 데이터의 Query를 keyword 필드에 그대로 복사할 것
+- **중요**: 아래 실시간 트렌드 데이터의 Query를 keyword 필드에 그대로 복사할 것
 - **keyword 필드는 절대 재작성하지 말고 Query를 정확히 그대로 사용**
 - **중요**: 5개 카테고리(tech, business, society, entertainment, sports)를 반드시 고르게 분배할 것
 
@@ -171,6 +163,24 @@ CURATION_PROMPT_WITH_TRENDS = """역할:
 - 같은 signal을 가진 키워드는 언어당 최대 2개까지만
 - 5개 signal을 언어별로 균등하게 분배
 
+⚠️ **카테고리 변경 사항 (2026-01-25):**
+- 기존 8개 → 새로운 5개 카테고리로 통합
+- "education" → "tech"로 통합
+- "finance" → "business"로 통합
+- "lifestyle" → "society"로 통합"""
+
+# Per-run trend data and counts (after the cache breakpoint)
+CURATION_TRENDS_TEMPLATE = """실시간 트렌드 데이터 (언어별로 구분됨):
+
+🇺🇸 English (US) Trends:
+{trends_en}
+
+🇰🇷 Korean (KR) Trends:
+{trends_ko}
+
+🇯🇵 Japanese (JP) Trends:
+{trends_ja}
+
 **🚨 언어별 키워드 생성 규칙 (절대 준수):**
 반드시 정확히 {count}개의 키워드를 생성하라:
 - 영어(en): 정확히 {per_lang}개 (1개라도 부족하거나 초과하면 안 됨)
@@ -185,13 +195,7 @@ CURATION_PROMPT_WITH_TRENDS = """역할:
 - 만약 한 언어의 트렌드가 부족하면, 다른 언어 트렌드를 절대 사용하지 말고 해당 언어로 새로운 키워드를 생성하라
 
 각 언어 내에서 5개 카테고리(tech, business, society, entertainment, sports)를 최대한 균등하게 분배하되,
-반드시 각 언어별로 정확히 {per_lang}개씩 생성하는 것이 최우선이다.
-
-⚠️ **카테고리 변경 사항 (2026-01-25):**
-- 기존 8개 → 새로운 5개 카테고리로 통합
-- "education" → "tech"로 통합
-- "finance" → "business"로 통합
-- "lifestyle" → "society"로 통합"""
+반드시 각 언어별로 정확히 {per_lang}개씩 생성하는 것이 최우선이다."""
 
 
 class KeywordCurator:
@@ -206,6 +210,7 @@ class KeywordCurator:
 
         # Brave Search API (replacing Google Custom Search)
         self.brave_api_key = os.environ.get("BRAVE_API_KEY")
+        self.brave_limiter = get_limiter('brave')
 
         # Keep Google API keys for backward compatibility (deprecated)
         self.google_api_key = google_api_key or os.environ.get("GOOGLE_API_KEY")
@@ -221,14 +226,17 @@ class KeywordCurator:
         try:
             self.client = Anthropic(api_key=self.api_key)
             self.model = "claude-sonnet-4-20250514"
+            self.ledger = UsageLedger("keyword_curator")
+            self.llm = MeteredClient(self.client, self.ledger, limiter=get_limiter('anthropic'))
             safe_print("  ✓ Anthropic API client initialized successfully")
         except Exception as e:
             safe_print(f"❌ ERROR: Failed to initialize Anthropic client")
             safe_print(f"   Error: {mask_secrets(str(e))}")
             raise
 
-        # Load existing queue
-        self.queue_path = Path("data/topics_queue.json")
+        # Load existing queue (writes go through TopicQueue's locked transactions)
+        self.queue = get_queue()
+        self.queue_path = self.queue.queue_file
         try:
             self.queue_data = self._load_queue()
             safe_print(f"  ✓ Loaded topic queue: {len(self.queue_data.get('topics', []))} topics")
@@ -239,29 +247,14 @@ class KeywordCurator:
 
     def _load_queue(self) -> Dict:
         """Load existing topic queue"""
-        if not self.queue_path.exists():
-            return {"topics": []}
-
-        with open(self.queue_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return self.queue._load_queue()
 
-    def _save_queue(self):
-        """Save updated topic queue"""
-        try:
-            # Ensure parent directory exists
-            self.queue_path.parent.mkdir(parents=True, exist_ok=True)
-
-            with open(self.queue_path, 'w', encoding='utf-8') as f:
-                json.dump(self.queue_data, f, indent=2, ensure_ascii=False)
-        except IOError as e:
-            safe_print(f"❌ ERROR: Failed to save queue to filesystem")
-            safe_print(f"   Path: {self.queue_path}")
-            safe_print(f"   Error: {str(e)}")
-            raise
-        except Exception as e:
-            safe_print(f"❌ ERROR: Unexpected error saving queue")
-            safe_print(f"   Error: {str(e)}")
-            raise
+    @staticmethod
+    def _brave_get(url: str, **kwargs):
+        """One Brave Search request; raises on HTTP errors so the limiter can retry 429/5xx"""
+        response = requests.get(url, timeout=10, **kwargs)
+        response.raise_for_status()
+        return response
 
     def detect_intent_signals(self, query: str) -> list:
         """Detect intent signals from query for deduplication"""
@@ -425,12 +418,11 @@ class KeywordCurator:
                     "freshness": "pw"  # Past week (최신 뉴스)
                 }
 
-                # Add delay to avoid rate limiting
-                time.sleep(0.5)
-
+                # Paced to the Brave plan's rate limit; 429/5xx are retried
                 verify_ssl = certifi.where() if certifi else True
-                response = requests.get(url, headers=headers, params=params, verify=verify_ssl)
-                response.raise_for_status()
+                response = self.brave_limiter.call(
+                    self._brave_get, url, headers=headers, params=params, verify=verify_ssl
+                )
 
                 data = response.json()
 
@@ -559,6 +551,30 @@ class KeywordCurator:
 
         return references
 
+    def _curation_request(self, trends: str) -> Dict:
+        """Build messages.create() parameters for keyword curation"""
+        # Use Prompt Caching: cache the curation rules, send trends/counts after them
+        return {
+            "model": self.model,
+            "max_tokens": 16000,  # Increased for 30+ keywords
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": CURATION_PROMPT,
+                            "cache_control": {"type": "ephemeral"}
+                        },
+                        {
+                            "type": "text",
+                            "text": f"\n\n{trends}"
+                        }
+                    ]
+                }
+            ]
+        }
+
     def generate_candidates(self, count: int = 15) -> List[Dict]:
         """Generate keyword candidates using Claude API with trending data"""
         safe_print(f"\n{'='*60}")
@@ -573,7 +589,7 @@ class KeywordCurator:
         per_lang = count // 3  # Distribute evenly across 3 languages
 
         # Generate prompt with trending data (grouped by language)
-        prompt = CURATION_PROMPT_WITH_TRENDS.format(
+        trends = CURATION_TRENDS_TEMPLATE.format(
             trends_en=trends_by_lang.get('en', 'No English trends available'),
             trends_ko=trends_by_lang.get('ko', 'No Korean trends available'),
             trends_ja=trends_by_lang.get('ja', 'No Japanese trends available'),
@@ -582,14 +598,7 @@ class KeywordCurator:
         )
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=16000,  # Increased for 30+ keywords
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }]
-            )
+            response = self.llm.create("curation", **self._curation_request(trends))
         except Exception as e:
             safe_print(f"❌ ERROR: Claude API call failed")
             safe_print(f"   Error: {mask_secrets(str(e))}")
@@ -855,12 +864,45 @@ class KeywordCurator:
         safe_print(f"  💾 큐에 {len(selected)}개 키워드 추가 중...")
         safe_print(f"{'='*60}\n")
 
-        # Get existing keywords for duplicate check (case-insensitive)
-        existing_keywords = {t['keyword'].lower() for t in self.queue_data['topics']}
+        # Re-read and write the queue in one locked transaction, so topics
+        # reserved/completed by a concurrent generate_posts run are not overwritten
+        try:
+            with self.queue.storage.transaction():
+                added_count, rejected_count = self._append_topics(selected, self.queue.storage.select())
+        except IOError as e:
+            safe_print(f"❌ ERROR: Failed to save queue to filesystem")
+            safe_print(f"   Path: {self.queue_path}")
+            safe_print(f"   Error: {str(e)}")
+            raise
+        except Exception as e:
+            safe_print(f"❌ ERROR: Unexpected error saving queue")
+            safe_print(f"   Error: {str(e)}")
+            raise
 
-        # Get next ID
-        existing_ids = [int(t['id'].split('-')[0]) for t in self.queue_data['topics'] if t['id'].split('-')[0].isdigit()]
-        next_id = max(existing_ids) + 1 if existing_ids else 1
+        self.queue_data = self._load_queue()
+
+        safe_print(f"\n✅ {added_count}개 키워드가 큐에 추가되었습니다!")
+        if rejected_count > 0:
+            safe_print(f"🔴 {rejected_count}개 키워드가 언어 불일치로 거부되었습니다!")
+        safe_print(f"📊 Total topics in queue: {len(self.queue_data['topics'])}")
+
+        # Show statistics
+        self._show_queue_stats()
+
+    def _append_topics(self, selected: List[Dict], topics: List[Dict]):
+        """
+        Validate candidates against the current topics and store the accepted ones
+
+        Returns:
+            (added_count, rejected_count)
+        """
+        # Get existing keywords for duplicate check (case-insensitive),
+        # including completed topics that were archived out of the queue
+        existing_keywords = {t['keyword'].lower() for t in topics}
+        existing_keywords.update(keyword for keyword, _ in self.queue.storage.archived_keys())
+
+        # Get next ID (above archived topics too, so IDs are never reused)
+        next_id = self.queue.storage.next_number()
 
         added_count = 0
         rejected_count = 0
@@ -907,8 +949,9 @@ class KeywordCurator:
             # Add expiry_days for trend keywords
             if topic['keyword_type'] == 'trend':
                 topic['expiry_days'] = 3  # 3 days expiry for trending keywords
+                topic['expires_at'] = topic_expires_at(topic)
 
-            self.queue_data['topics'].append(topic)
+            self.queue.storage.put(topic)
 
             type_label = "🔥 Trend" if topic['keyword_type'] == 'trend' else "🌲 Evergreen"
             safe_print(f"  ✓ Added: {type_label} | {candidate['keyword']}")
@@ -916,23 +959,14 @@ class KeywordCurator:
             added_count += 1
             next_id += 1
 
-        # Save queue
-        self._save_queue()
-
-        safe_print(f"\n✅ {added_count}개 키워드가 큐에 추가되었습니다!")
-        if rejected_count > 0:
-            safe_print(f"🔴 {rejected_count}개 키워드가 언어 불일치로 거부되었습니다!")
-        safe_print(f"📊 Total topics in queue: {len(self.queue_data['topics'])}")
-
-        # Show statistics
-        self._show_queue_stats()
+        return added_count, rejected_count
 
     def _show_queue_stats(self):
         """Show queue statistics"""
         topics = self.queue_data['topics']
 
         # Count by status (safe for any status value)
-        by_status = {"pending": 0, "in_progress": 0, "completed": 0, "failed": 0}
+        by_status = {"pending": 0, "in_progress": 0, "completed": 0, "failed": 0, "expired": 0}
         for t in topics:
             status = t.get('status', 'pending')
             by_status[status] = by_status.get(status, 0) + 1
@@ -993,6 +1027,8 @@ def main():
     if selected:
         curator.add_to_queue(selected)
 
+    curator.ledger.print_summary()
+
     safe_print("\n✨ Done!\n")
 
 
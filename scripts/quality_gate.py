@@ -8,23 +8,51 @@ Returns PASS/FAIL with detailed report.
 Usage:
     python quality_gate.py
     python quality_gate.py --strict
+    python quality_gate.py --jobs 4      # check files in 4 processes
+    python quality_gate.py --all         # audit every published post
+    python quality_gate.py --since 2026-01-01 --resume
 """
 
+import argparse
 import json
+import os
 import re
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 # Add scripts to path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from utils.security import safe_print, mask_secrets
+from utils.corpus_index import CorpusIndex, post_name, post_order, post_slug
+from utils.similarity import title_similarity, similarities
+from topic_queue import get_queue
+
+# Files handed to the process pool at a time, per worker (keeps long streams bounded in memory)
+POOL_BATCH_PER_JOB = 16
+
+# Full-corpus audit (--all / --since)
+AUDIT_LANGUAGES = ('en', 'ko', 'ja')
+DEFAULT_AUDIT_REPORT = "quality_audit.jsonl"
+AUDIT_CURSOR_INTERVAL = 25  # Posts between cursor saves; a crash re-checks at most this many
+_POST_DATE = re.compile(r'(\d{4}-\d{2}-\d{2})-')
+
+# Prefix of the near-duplicate failure; such topics count a retry instead of a free requeue,
+# since regenerating the same trend would only match the earlier post again
+NEAR_DUPLICATE_FAILURE = "Near-duplicate content detected"
 
 
 class QualityGate:
-    def __init__(self, strict_mode: bool = False):
+    def __init__(self, strict_mode: bool = False, content_dir: str = "content",
+                 corpus: Optional[CorpusIndex] = None):
         self.strict_mode = strict_mode
+        self.content_dir = Path(content_dir)
+        self._corpus = corpus
 
         # AI phrases to detect
         self.ai_phrases = {
@@ -127,6 +155,7 @@ class QualityGate:
         self._check_frontmatter(frontmatter, checks)
         self._check_date_consistency(frontmatter, filepath, checks)
         self._check_duplicate_topic(frontmatter, filepath, checks)
+        self._check_near_duplicate(frontmatter, body, filepath, checks)
         self._check_title_content_consistency(frontmatter, body, checks)
         self._check_clickbait(frontmatter, body, checks)
 
@@ -284,8 +313,8 @@ class QualityGate:
 
     def _check_date_consistency(self, frontmatter: Dict, filepath: Path, checks: Dict):
         """Check year consistency between filename, frontmatter, and title"""
-        # Extract year from filename (format: YYYY-MM-DD-*.md)
-        filename = filepath.name
+        # Extract year from filename (format: YYYY-MM-DD-*.md, or YYYY-MM-DD-*/index.md for page bundles)
+        filename = post_name(filepath)
         filename_year_match = re.match(r'(\d{4})-\d{2}-\d{2}', filename)
 
         if not filename_year_match:
@@ -384,23 +413,25 @@ class QualityGate:
                 "No featured image (recommended for better engagement)"
             )
 
+    @property
+    def corpus(self) -> CorpusIndex:
+        """Index of published posts, refreshed once per gate (re-reads only changed files)"""
+        if self._corpus is None:
+            self._corpus = CorpusIndex(str(self.content_dir))
+            reread = self._corpus.refresh()
+            safe_print(f"📚 Corpus index: {len(self._corpus)} posts ({reread} re-read)")
+        return self._corpus
+
     def _check_duplicate_topic(self, frontmatter: Dict, filepath: Path, checks: Dict):
         """Check for duplicate topics in recent posts (CRITICAL)"""
-        # Extract keyword from current file
-        filename = filepath.stem
-        # Remove YYYY-MM-DD- prefix to get keyword
-        parts = filename.split('-')
-        if len(parts) >= 4:
-            keyword = '-'.join(parts[3:])
-        else:
-            keyword = filename
+        # Keyword is the filename without its YYYY-MM-DD- prefix
+        keyword = post_slug(filepath)
 
         # Get language from filepath
         lang = checks['language']
 
         # Find all posts in the same language from the last 7 days
-        content_dir = Path(f"content/{lang}")
-        if not content_dir.exists():
+        if not (self.content_dir / lang).exists():
             return
 
         # Get current file date and title
@@ -420,48 +451,31 @@ class QualityGate:
         # Check for duplicates
         keyword_duplicates = []
         title_duplicates = []
+        recent_titles = []
 
-        for md_file in content_dir.rglob('*.md'):
-            if md_file == filepath:
+        # Only posts with the same keyword can be duplicates; the index has their frontmatter
+        for post in self.corpus.find(lang, keyword):
+            md_file = self.content_dir / post['path']
+            if md_file == filepath or md_file.resolve() == filepath.resolve():
                 continue
 
-            # Extract keyword from other file
-            other_filename = md_file.stem
-            other_parts = other_filename.split('-')
-            if len(other_parts) >= 4:
-                other_keyword = '-'.join(other_parts[3:])
-            else:
-                other_keyword = other_filename
-
-            # Check if keywords match
-            if other_keyword == keyword:
-                # Check date to see if it's within 7 days
-                try:
-                    with open(md_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
-
-                    # Extract frontmatter date
-                    if content.startswith('---'):
-                        fm_match = re.search(r'date:\s*(.+)', content)
-                        title_match = re.search(r'title:\s*["\']?(.+?)["\']?\s*$', content, re.MULTILINE)
-
-                        if fm_match:
-                            other_date = fm_match.group(1).strip().strip('"').strip("'")
-                            other_dt = datetime.fromisoformat(other_date.replace('Z', '+00:00'))
-
-                            if other_dt >= cutoff_date:
-                                keyword_duplicates.append(str(md_file))
-
-                                # Check title similarity
-                                if title_match:
-                                    other_title = title_match.group(1).strip().lower()
-                                    similarity = self._calculate_title_similarity(current_title, other_title)
-
-                                    # If titles are >70% similar, it's likely a duplicate
-                                    if similarity > 0.7:
-                                        title_duplicates.append((str(md_file), similarity))
-                except Exception:
+            # Check date to see if it's within 7 days
+            try:
+                other_dt = datetime.fromisoformat(post['date'].replace('Z', '+00:00'))
+                if other_dt < cutoff_date:
                     continue
+            except (ValueError, TypeError):
+                continue  # Unparseable date, or naive vs aware
+            keyword_duplicates.append(str(md_file))
+            if post['title']:
+                recent_titles.append((str(md_file), post['title']))
+
+        # Check title similarity: >70% similar titles are likely duplicates
+        # (pairs that cannot reach 70% are pruned without computing them)
+        scores = similarities(current_title, [title for _, title in recent_titles], min_similarity=0.7)
+        for (md_file, _), similarity in zip(recent_titles, scores):
+            if similarity > 0.7:
+                title_duplicates.append((md_file, similarity))
 
         if keyword_duplicates:
             checks['critical_failures'].append(
@@ -474,43 +488,39 @@ class QualityGate:
                 f"Similar title detected: {dup_details}"
             )
 
-    def _calculate_title_similarity(self, title1: str, title2: str) -> float:
-        """Calculate similarity between two titles using Levenshtein distance"""
-        # Normalize titles
-        t1 = title1.lower().strip()
-        t2 = title2.lower().strip()
-
-        if t1 == t2:
-            return 1.0
-
-        # Levenshtein distance
-        len1, len2 = len(t1), len(t2)
-        if len1 == 0 or len2 == 0:
-            return 0.0
-
-        # Create distance matrix
-        distances = [[0] * (len2 + 1) for _ in range(len1 + 1)]
-
-        for i in range(len1 + 1):
-            distances[i][0] = i
-        for j in range(len2 + 1):
-            distances[0][j] = j
-
-        for i in range(1, len1 + 1):
-            for j in range(1, len2 + 1):
-                cost = 0 if t1[i-1] == t2[j-1] else 1
-                distances[i][j] = min(
-                    distances[i-1][j] + 1,      # deletion
-                    distances[i][j-1] + 1,      # insertion
-                    distances[i-1][j-1] + cost  # substitution
-                )
+    def _check_near_duplicate(self, frontmatter: Dict, body: str, filepath: Path, checks: Dict):
+        """Check for posts with near-identical title and body under any slug (CRITICAL)"""
+        lang = checks['language']
+        if not (self.content_dir / lang).exists():
+            return
+
+        # MinHash/LSH over the whole corpus: catches the same trend posted
+        # under a differently worded keyword, at any date. Only earlier posts
+        # count, so of a near-duplicate pair the newer one fails and the
+        # original survives
+        try:
+            rel_path = filepath.resolve().relative_to(self.content_dir.resolve()).as_posix()
+        except ValueError:
+            rel_path = filepath.as_posix()
+        before = post_order(frontmatter.get('date', ''), rel_path)
+
+        duplicates = []
+        for post, similarity in self.corpus.near_duplicates(lang, frontmatter.get('title', ''), body,
+                                                            before=before):
+            md_file = self.content_dir / post['path']
+            if md_file == filepath or md_file.resolve() == filepath.resolve():
+                continue
+            duplicates.append((md_file, similarity))
 
-        max_len = max(len1, len2)
-        distance = distances[len1][len2]
+        if duplicates:
+            dup_details = ', '.join([f"{d.name} (~{sim*100:.0f}% overlap)" for d, sim in duplicates])
+            checks['critical_failures'].append(
+                f"{NEAR_DUPLICATE_FAILURE}: {dup_details}"
+            )
 
-        # Convert to similarity (0-1)
-        similarity = 1 - (distance / max_len)
-        return similarity
+    def _calculate_title_similarity(self, title1: str, title2: str) -> float:
+        """Calculate similarity between two titles using Levenshtein distance"""
+        return title_similarity(title1, title2)
 
     def _check_title_content_consistency(self, frontmatter: Dict, body: str, checks: Dict):
         """Check if title matches content (CRITICAL)"""
@@ -618,65 +628,275 @@ class QualityGate:
         checks['info']['title'] = frontmatter.get('title', 'N/A')
 
 
-def return_failed_topics_to_queue(failed_files: List[str]):
-    """Return failed topics back to available status in the queue"""
-    queue_path = Path("data/topics_queue.json")
+def return_failed_topics_to_queue(failed_files: List[str], failures: Optional[Dict[str, List[str]]] = None):
+    """
+    Return failed topics back to available status in the queue
+
+    Args:
+        failed_files: Post files that failed the gate
+        failures: Critical failures per file; near-duplicates are recorded with
+                  mark_failed (counting toward the dead-letter limit) instead of
+                  a plain requeue
+    """
+    failures = failures or {}
+    try:
+        queue = get_queue()
+        candidates = [t for t in queue.get_topics() if t.get('status') in ['in_progress', 'completed']]
+
+        # All resets are written in one transaction
+        with queue.batch() as batch:
+            # Extract topic IDs from failed files
+            for filepath in failed_files:
+                path = Path(filepath)
+                filename = path.stem
+
+                # Extract keyword from filename (YYYY-MM-DD-keyword)
+                parts = filename.split('-')
+                if len(parts) >= 4:
+                    keyword = '-'.join(parts[3:])
+
+                    # Get language from filepath
+                    if '/en/' in str(filepath):
+                        lang = 'en'
+                    elif '/ko/' in str(filepath):
+                        lang = 'ko'
+                    elif '/ja/' in str(filepath):
+                        lang = 'ja'
+                    else:
+                        continue
+
+                    # Find and reset the topic
+                    for topic in candidates:
+                        if topic.get('keyword') == keyword and topic.get('lang') == lang:
+                            near_duplicate = [failure for failure in failures.get(filepath, [])
+                                              if failure.startswith(NEAR_DUPLICATE_FAILURE)]
+                            if near_duplicate:
+                                batch.fail(topic['id'], near_duplicate[0])
+                            else:
+                                batch.requeue(topic['id'])
+                            candidates.remove(topic)
+                            break
+
+    except Exception as e:
+        safe_print(f"     ⚠️ Error returning topics to queue: {str(e)}")
+
+
+# Per-process gate for check_files() workers, set by _init_worker
+_worker_gate: Optional[QualityGate] = None
+
+
+def _init_worker(strict_mode: bool, content_dir: str, index_path: str):
+    """Give a pool worker its gate, reading the corpus index the parent just refreshed"""
+    global _worker_gate
+    corpus = CorpusIndex(content_dir, path=index_path)
+    if not corpus.load():
+        corpus.refresh()  # Parent could not save the index
+    _worker_gate = QualityGate(strict_mode, content_dir, corpus=corpus)
+
+
+def _check_in_worker(filepath: str) -> Dict:
+    return _worker_gate.check_file(Path(filepath))
 
-    if not queue_path.exists():
+
+def check_files(gate: QualityGate, paths: Iterable[Path], jobs: int = 1) -> Iterator[Dict]:
+    """
+    check_file() for each path, yielding results in input order
+
+    With jobs > 1 the files are checked in a process pool. The corpus index
+    is refreshed once here and loaded read-only by each worker, so results
+    match a sequential run exactly. Paths are consumed in batches, so a
+    generator of any length can be passed.
+    """
+    if jobs <= 1:
+        for path in paths:
+            yield gate.check_file(path)
         return
 
+    corpus = gate.corpus
+    paths = iter(paths)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(gate.strict_mode, str(gate.content_dir), str(corpus.path))) as executor:
+        while True:
+            batch = [str(path) for path in islice(paths, jobs * POOL_BATCH_PER_JOB)]
+            if not batch:
+                break
+            yield from executor.map(_check_in_worker, batch, chunksize=max(1, len(batch) // (jobs * 4)))
+
+
+def iter_posts(content_dir: str = "content", since: Optional[str] = None,
+               after: Optional[str] = None) -> Iterator[Path]:
+    """
+    Every post under content_dir/{en,ko,ja}, streamed in sorted path order
+
+    A post is a dated Markdown file (YYYY-MM-DD-slug.md) or page bundle
+    (YYYY-MM-DD-slug/index.md, whose other files are skipped); pages such
+    as about.md are not posts. Only the directories being walked are held
+    in memory.
+
+    Args:
+        since: Only posts dated on or after this YYYY-MM-DD
+        after: Resume point: skip posts up to and including this path (relative to content_dir)
+    """
+    content_dir = Path(content_dir)
+    cursor = tuple(after.split('/')) if after else ()
+
+    # (parts relative to content_dir, is_post); popped in sorted order
+    stack = [((lang,), False) for lang in sorted(AUDIT_LANGUAGES, reverse=True)]
+    while stack:
+        parts, is_post = stack.pop()
+        if is_post:
+            if parts > cursor:
+                yield content_dir.joinpath(*parts)
+            continue
+        if parts < cursor[:len(parts)]:
+            continue  # Whole directory precedes the cursor
+
+        directory = content_dir.joinpath(*parts)
+        try:
+            with os.scandir(directory) as it:
+                names = sorted((entry.name, entry.is_dir(follow_symlinks=False))
+                               for entry in it if not entry.name.startswith('.'))
+        except OSError:
+            continue
+
+        children = []
+        for name, is_dir in names:
+            match = _POST_DATE.match(name)
+            if is_dir and match and (directory / name / 'index.md').is_file():
+                if not since or match.group(1) >= since:
+                    children.append((parts + (name, 'index.md'), True))
+            elif is_dir:
+                children.append((parts + (name,), False))
+            elif match and name.endswith('.md'):
+                if not since or match.group(1) >= since:
+                    children.append((parts + (name,), True))
+        stack.extend(reversed(children))
+
+
+def _audit_cursor_path(report_path: Path) -> Path:
+    return report_path.with_name(report_path.name + '.cursor')
+
+
+def _save_audit_cursor(cursor_path: Path, state: Dict):
+    """Write the cursor atomically; a lost cursor only means starting the audit over"""
     try:
-        with open(queue_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        tmp_path = cursor_path.with_name(f".{cursor_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, cursor_path)
+    except OSError as e:
+        safe_print(f"  ⚠️  Could not save audit cursor: {mask_secrets(str(e))}")
+
+
+def audit_posts(gate: QualityGate, since: Optional[str] = None, report_path: str = DEFAULT_AUDIT_REPORT,
+                resume: bool = False, jobs: int = 1) -> Dict:
+    """
+    Check every published post (or those since a date) and stream the results to a JSONL report
+
+    Each report line is one check_file() result; nothing is deleted or
+    returned to the queue. Progress is saved to <report>.cursor every
+    AUDIT_CURSOR_INTERVAL posts: the last post written, the counts so far
+    and the report size at that point. With resume, the report is cut back
+    to that size and the audit continues after that post. The cursor is
+    removed once the audit completes.
+
+    Returns:
+        Counts: checked, failed, failures, warnings
+    """
+    report_path = Path(report_path)
+    cursor_path = _audit_cursor_path(report_path)
+    options = {"content_dir": str(gate.content_dir), "since": since}
+    state = dict(options, last=None, offset=0, checked=0, failed=0, failures=0, warnings=0)
+
+    if resume:
+        try:
+            with open(cursor_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            saved = {}
+        if not saved:
+            safe_print("⚠️  No audit cursor found, starting from the first post")
+        elif any(saved.get(key) != value for key, value in options.items()):
+            safe_print(f"⚠️  Audit cursor is for {saved.get('content_dir')} since {saved.get('since')}, starting over")
+        elif not report_path.exists() or report_path.stat().st_size < saved.get('offset', 0):
+            safe_print(f"⚠️  {report_path} is missing or shorter than the cursor, starting over")
+        else:
+            state.update(saved)
+            safe_print(f"↪️  Resuming after {state['last']} ({state['checked']} posts already checked)")
 
-        queue = data.get('topics', [])
+    total = state['checked'] + sum(1 for _ in iter_posts(gate.content_dir, since, state['last']))
 
-        # Extract topic IDs from failed files
-        for filepath in failed_files:
-            path = Path(filepath)
-            filename = path.stem
-
-            # Extract keyword from filename (YYYY-MM-DD-keyword)
-            parts = filename.split('-')
-            if len(parts) >= 4:
-                keyword = '-'.join(parts[3:])
-
-                # Get language from filepath
-                if '/en/' in str(filepath):
-                    lang = 'en'
-                elif '/ko/' in str(filepath):
-                    lang = 'ko'
-                elif '/ja/' in str(filepath):
-                    lang = 'ja'
-                else:
-                    continue
+    safe_print(f"\n{'='*60}")
+    safe_print(f"  Quality Gate - Auditing {total} posts" + (f" since {since}" if since else ""))
+    safe_print(f"{'='*60}\n")
 
-                # Find and reset the topic
-                for topic in queue:
-                    if (topic.get('keyword') == keyword and
-                        topic.get('lang') == lang and
-                        topic.get('status') in ['in_progress', 'completed']):
+    with open(report_path, 'r+b' if state['offset'] else 'wb') as report:
+        report.seek(state['offset'])
+        report.truncate()
+        posts = iter_posts(gate.content_dir, since, state['last'])
+        for result in check_files(gate, posts, jobs):
+            report.write((json.dumps(result, ensure_ascii=False) + '\n').encode('utf-8'))
+
+            state['checked'] += 1
+            state['failures'] += len(result['critical_failures'])
+            state['warnings'] += len(result['warnings'])
+            state['last'] = Path(result['file']).relative_to(gate.content_dir).as_posix()
+            if result['critical_failures']:
+                state['failed'] += 1
+                safe_print(f"[{state['checked']}/{total}] ❌ {state['last']}")
+                for failure in result['critical_failures']:
+                    safe_print(f"     - {failure}")
+            else:
+                safe_print(f"[{state['checked']}/{total}] ✅ {state['last']}")
 
-                        topic['status'] = 'pending'  # Changed from 'available' to 'pending'
-                        topic['reserved_at'] = None
-                        if 'completed_at' in topic:
-                            del topic['completed_at']
-                        break
+            if state['checked'] % AUDIT_CURSOR_INTERVAL == 0:
+                report.flush()
+                state['offset'] = report.tell()
+                _save_audit_cursor(cursor_path, state)
 
-        # Save updated queue
-        with open(queue_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+    try:
+        cursor_path.unlink()
+    except FileNotFoundError:
+        pass
 
-    except Exception as e:
-        safe_print(f"     ⚠️ Error returning topics to queue: {str(e)}")
+    return {key: state[key] for key in ('checked', 'failed', 'failures', 'warnings')}
 
 
-def main():
-    import argparse
+def _audit_date(value: str) -> str:
+    """argparse type for --since: a YYYY-MM-DD date"""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got '{value}'")
 
+
+def main():
     parser = argparse.ArgumentParser(description="Quality Gate for generated content")
     parser.add_argument('--strict', action='store_true', help="Strict mode (warnings become failures)")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Check files in N processes (0 = one per CPU; default: 1)")
+    audit = parser.add_argument_group("audit published posts instead of generated_files.json")
+    audit.add_argument('--all', action='store_true', help="Check every post under content/{en,ko,ja}")
+    audit.add_argument('--since', type=_audit_date, metavar='YYYY-MM-DD',
+                       help="Check posts dated on or after this day")
+    audit.add_argument('--report', default=DEFAULT_AUDIT_REPORT,
+                       help=f"JSONL report, one result per line (default: {DEFAULT_AUDIT_REPORT})")
+    audit.add_argument('--resume', action='store_true', help="Continue an interrupted audit from its cursor")
     args = parser.parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    if args.all or args.since:
+        summary = audit_posts(QualityGate(strict_mode=args.strict), since=args.since,
+                              report_path=args.report, resume=args.resume, jobs=jobs)
+        safe_print(f"\n{'='*60}")
+        safe_print(f"  Audit Summary")
+        safe_print(f"{'='*60}")
+        safe_print(f"Posts checked: {summary['checked']}")
+        safe_print(f"Failed: {summary['failed']}")
+        safe_print(f"Critical failures: {summary['failures']}")
+        safe_print(f"Warnings: {summary['warnings']}")
+        safe_print(f"\n✓ Report saved to: {args.report}")
+        sys.exit(1 if summary['failed'] else 0)
 
     # Load generated files list
     generated_files_path = Path("generated_files.json")
@@ -715,25 +935,28 @@ def main():
     all_results = []
     passed_files = []
     failed_files = []
+    failures = {}
     total_failures = 0
     total_warnings = 0
 
+    existing_files = []
     for filepath in generated_files:
-        path = Path(filepath)
-
-        if not path.exists():
+        if Path(filepath).exists():
+            existing_files.append(filepath)
+        else:
             safe_print(f"⚠️  File not found: {filepath}")
-            continue
 
+    results = check_files(qg, [Path(filepath) for filepath in existing_files], min(jobs, len(existing_files)))
+    for filepath, result in zip(existing_files, results):
+        path = Path(filepath)
         safe_print(f"Checking: {path.name}")
-
-        result = qg.check_file(path)
         all_results.append(result)
 
         # Print results
         if result['critical_failures']:
             total_failures += len(result['critical_failures'])
             failed_files.append(filepath)
+            failures[filepath] = result['critical_failures']
             safe_print(f"  ❌ FAILURES:")
             for failure in result['critical_failures']:
                 safe_print(f"     - {failure}")
@@ -788,7 +1011,7 @@ def main():
 
         # Return failed topics to queue
         safe_print(f"\n  🔄 Returning {len(failed_files)} topics to queue...")
-        return_failed_topics_to_queue(failed_files)
+        return_failed_topics_to_queue(failed_files, failures)
         safe_print(f"     ✓ Topics returned to available status\n")
 
     # Summary
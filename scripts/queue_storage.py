@@ -0,0 +1,1066 @@
+#!/usr/bin/env python3
+"""
+Storage backends for the topic queue
+
+TopicQueue keeps the state machine; storage only knows how to read and write
+topics. Both backends expose the same small interface, used inside a
+transaction so each state transition is one read-modify-write:
+
+- JSONQueueStorage: the git-committed data/topics_queue.json snapshot plus
+  an append-only data/topics_queue.journal.jsonl of state changes;
+  transactions hold an exclusive lock on a sidecar .lock file, append one
+  event per changed topic, and periodically compact the journal into the
+  snapshot (written atomically: temp file + rename); the parsed queue is
+  cached with a heap of pending topics and a completed-(keyword, lang) index
+- SQLiteQueueStorage: one row per topic, indexed on (status, priority,
+  created_at) and (keyword, lang); transactions are BEGIN IMMEDIATE, so a
+  transition only touches the rows it changes
+
+archive() moves finished topics out of the live queue: into monthly JSONL
+partitions under data/topics_queue.archive/ (JSON) or an archive table
+(SQLite). Only a (keyword, lang) dedup index of archived completed topics
+and the highest topic number stay in use, so the live queue stays small.
+
+open_storage() picks the backend from the file suffix (.db/.sqlite -> SQLite).
+export()/replace() convert between backends, which is how the JSON file is
+produced from a SQLite queue.
+
+Usage:
+    storage = open_storage("data/topics_queue.db")
+    with storage.transaction():
+        topic = storage.get(topic_id)
+        topic['status'] = 'completed'
+        storage.put(topic)
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None  # POSIX
+
+SQLITE_SUFFIXES = {'.db', '.sqlite', '.sqlite3'}
+
+# Journal events after which the JSON snapshot is rewritten
+DEFAULT_COMPACT_EVENTS = 500
+
+# Journal events that take a topic out of the queue (their "topic" is just {"id": ...})
+REMOVAL_EVENTS = {'deleted', 'archived'}
+
+
+@contextmanager
+def file_lock(lock_path: Path, timeout: float = 60) -> Iterator[None]:
+    """
+    Hold an exclusive inter-process lock on lock_path
+
+    Uses flock on POSIX and msvcrt.locking on Windows. The lock is tied to
+    the open file, so it is released even if the holder crashes.
+
+    Raises:
+        TimeoutError: If the lock is not acquired within timeout seconds
+    """
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f"Could not lock {lock_path} within {timeout:.0f}s")
+                    time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def topic_lang(topic: Dict) -> str:
+    """Language of a topic (older topics only have 'language')"""
+    return topic.get('lang', topic.get('language', 'en'))
+
+
+def keyword_key(topic: Dict) -> Tuple[str, str]:
+    """Duplicate-detection key: (lowercased keyword, lang)"""
+    return topic['keyword'].lower(), topic_lang(topic)
+
+
+def priority_order(topic: Dict) -> Tuple[int, str]:
+    """Sort key for reservation: priority high to low, then oldest first"""
+    return -topic.get('priority', 5), topic.get('created_at', '')
+
+
+def topic_number(topic_id: str) -> int:
+    """Sequence number an ID starts with ("042-en-tech-..." -> 42, 0 if none)"""
+    prefix = topic_id.split('-', 1)[0]
+    return int(prefix) if prefix.isdigit() else 0
+
+
+def archive_month(topic: Dict) -> str:
+    """Archive partition of a topic: the month (YYYY-MM) it finished in"""
+    finished_at = topic.get('completed_at') or topic.get('expired_at') or topic.get('archived_at') or ''
+    return finished_at[:7] if len(finished_at) >= 7 else datetime.now(timezone.utc).strftime('%Y-%m')
+
+
+def _write_atomic(path: Path, content: bytes):
+    """Write a file atomically: readers see either the old or the new file, never a partial one"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _copy(value):
+    """Deep copy of JSON data (faster than copy.deepcopy for plain dicts/lists)"""
+    return json.loads(json.dumps(value))
+
+
+class QueueStorage:
+    """Interface shared by the queue backends"""
+
+    def transaction(self):
+        """Context manager grouping reads and writes into one atomic unit (reentrant)"""
+        raise NotImplementedError
+
+    def get(self, topic_id: str) -> Optional[Dict]:
+        """Get a topic by ID"""
+        raise NotImplementedError
+
+    def put(self, topic: Dict, event: Optional[str] = None):
+        """
+        Insert or replace a topic (keeps its position if it exists)
+
+        Args:
+            topic: Topic record
+            event: Transition name (reserved, completed, failed, ...) for backends that keep a journal
+        """
+        raise NotImplementedError
+
+    def select(self, status: Optional[str] = None) -> List[Dict]:
+        """Topics in queue order, optionally filtered by status"""
+        raise NotImplementedError
+
+    def pending(self, priority_min: int = 1, limit: Optional[int] = None) -> List[Dict]:
+        """Pending topics in reservation order (priority desc, created_at asc)"""
+        raise NotImplementedError
+
+    def iter_pending(self, priority_min: int = 1) -> Iterator[Dict]:
+        """
+        Lazily iterate pending topics in reservation order
+
+        Use inside transaction() and close() the iterator when stopping early
+        (e.g. with contextlib.closing), so the caller only pays for the topics
+        it looks at.
+        """
+        raise NotImplementedError
+
+    def find_completed(self, topic: Dict) -> Optional[str]:
+        """ID of a completed topic with the same keyword and language, if any"""
+        raise NotImplementedError
+
+    def expiring(self, before: str, limit: int) -> List[Dict]:
+        """Up to `limit` pending topics whose expires_at (UTC ISO) is before `before`, soonest first"""
+        raise NotImplementedError
+
+    def delete(self, topic_ids: Iterable[str]):
+        """Remove topics from the queue"""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        """Number of topics"""
+        raise NotImplementedError
+
+    def archive(self, topic_ids: Iterable[str]) -> int:
+        """
+        Move topics out of the live queue into the archive
+
+        Archived completed topics still count as duplicates in
+        find_completed(), and their numbers are never reused by next_number().
+
+        Returns:
+            Number of topics archived
+        """
+        raise NotImplementedError
+
+    def archived_keys(self) -> Set[Tuple[str, str]]:
+        """(lowercased keyword, lang) of every archived completed topic"""
+        raise NotImplementedError
+
+    def archived_count(self) -> int:
+        """Number of archived topics"""
+        raise NotImplementedError
+
+    def next_number(self) -> int:
+        """Sequence number for the next topic ID (above every live and archived one)"""
+        raise NotImplementedError
+
+    def export(self) -> Dict:
+        """The whole queue as a JSON document ({"topics": [...], ...})"""
+        raise NotImplementedError
+
+    def replace(self, data: Dict):
+        """Replace the whole queue with a JSON document"""
+        raise NotImplementedError
+
+    def compact(self) -> int:
+        """
+        Fold any change journal into the main file
+
+        Returns:
+            Number of journal events folded (0 for backends without a journal)
+        """
+        return 0
+
+    def events(self, topic_id: Optional[str] = None) -> List[Dict]:
+        """Journaled transitions, oldest first (empty for backends without a journal)"""
+        return []
+
+
+class TopicArchive:
+    """
+    Finished topics moved out of a JSON queue
+
+    Topics are appended to monthly partitions (topics-YYYY-MM.jsonl, by the
+    month they completed or expired), which queue operations never read.
+    index.json holds what the queue still needs: archived completed topics
+    by (keyword, lang) for the duplicate check, the highest topic number,
+    and per-partition counts. The index is cached until the file changes.
+
+    Journal events folded by a compaction are kept here too, in monthly
+    history-YYYY-MM.jsonl files (by event time), so the transition history
+    of every topic outlives the journal.
+
+    Writers must be serialized by the caller (the queue's file lock).
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.index_path = self.directory / 'index.json'
+        self._index: Optional[Dict] = None
+        self._index_key: Optional[Tuple[int, int, int]] = None
+
+    def _load(self) -> Dict:
+        try:
+            stat = self.index_path.stat()
+        except FileNotFoundError:
+            return {"max_number": 0, "partitions": {}, "keywords": {}}
+        key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if key != self._index_key:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self._index = json.load(f)
+            self._index_key = key
+        return self._index
+
+    def find(self, topic: Dict) -> Optional[str]:
+        """ID of an archived completed topic with the same keyword and language, if any"""
+        keyword, lang = keyword_key(topic)
+        return self._load()['keywords'].get(keyword, {}).get(lang)
+
+    def keys(self) -> Set[Tuple[str, str]]:
+        return {(keyword, lang) for keyword, langs in self._load()['keywords'].items() for lang in langs}
+
+    def count(self) -> int:
+        return sum(self._load()['partitions'].values())
+
+    def max_number(self) -> int:
+        return self._load()['max_number']
+
+    def add(self, topics: List[Dict]):
+        """Append topics to their partitions, then update the index"""
+        index = _copy(self._load())
+        partitions: Dict[str, List[str]] = {}
+        for topic in topics:
+            partitions.setdefault(archive_month(topic), []).append(json.dumps(topic, ensure_ascii=False) + "\n")
+            index['max_number'] = max(index['max_number'], topic_number(topic['id']))
+            if topic.get('status') == 'completed':
+                keyword, lang = keyword_key(topic)
+                index['keywords'].setdefault(keyword, {}).setdefault(lang, topic['id'])
+
+        # Partitions first: a crash before the index update leaves topics
+        # archived but still live, and archiving them again is harmless
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for month, lines in partitions.items():
+            with open(self.directory / f"topics-{month}.jsonl", 'ab') as f:
+                f.write("".join(lines).encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+            index['partitions'][month] = index['partitions'].get(month, 0) + len(lines)
+
+        _write_atomic(self.index_path, json.dumps(index, indent=2, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+        self._index = self._index_key = None
+
+    def add_history(self, lines: List[bytes]):
+        """Append journal event lines to their monthly history files"""
+        partitions: Dict[str, List[bytes]] = {}
+        for line in lines:
+            partitions.setdefault(json.loads(line)['at'][:7], []).append(line)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for month, month_lines in partitions.items():
+            with open(self.directory / f"history-{month}.jsonl", 'ab') as f:
+                f.write(b"".join(month_lines))
+                f.flush()
+                os.fsync(f.fileno())
+
+    def history(self, topic_id: Optional[str] = None) -> List[Dict]:
+        """Events kept by earlier compactions, oldest first"""
+        needle = json.dumps(topic_id, ensure_ascii=False).encode('utf-8') if topic_id else None
+        events = []
+        for path in sorted(self.directory.glob('history-*.jsonl')):
+            with open(path, 'rb') as f:
+                for line in f:
+                    if needle is not None and needle not in line:
+                        continue
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue  # Torn write from a crashed compaction
+                    if topic_id is None or event['topic']['id'] == topic_id:
+                        events.append(event)
+        return events
+
+
+class JSONQueueStorage(QueueStorage):
+    """
+    Queue stored as a JSON snapshot plus an append-only journal
+
+    A transaction appends one JSONL event per changed topic to
+    <name>.journal.jsonl instead of rewriting the snapshot, so a state change
+    costs O(changed topics). The snapshot is rewritten (and the journal
+    emptied) every compact_every events, on compact(), and on replace();
+    compaction moves the folded events to the archive's history files.
+
+    The journal's first line records the SHA-256 of the snapshot it applies
+    to; if the snapshot was rewritten by something else (git pull, a manual
+    edit), the journal no longer matches and is dropped with a warning.
+
+    The parsed queue is cached between transactions: while the snapshot is
+    unchanged on disk, a transaction only reads journal lines appended since
+    the last one (e.g. by other processes).
+
+    archive() moves topics to a TopicArchive in <name>.archive/.
+    """
+
+    def __init__(self, path: Path, compact_every: int = DEFAULT_COMPACT_EVENTS):
+        """
+        Args:
+            path: Snapshot file
+            compact_every: Journal events after which the snapshot is rewritten
+        """
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + '.lock')
+        self.journal_path = self.path.with_name(self.path.stem + '.journal.jsonl')
+        self.archive_store = TopicArchive(self.path.with_name(self.path.stem + '.archive'))
+        self.compact_every = compact_every
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._doc: Optional[Dict] = None
+        self._index: Dict[str, int] = {}
+        self._pending_events: List[str] = []
+
+        # Indexes over _doc, maintained by _apply(): status -> topic IDs,
+        # completed (keyword, lang) -> topic IDs, and heaps of pending topics
+        # in reservation order and by expires_at, both with lazy deletion (an
+        # entry is live only while _heap_live/_expiry_live points at it)
+        self._by_status: Dict[str, Set[str]] = {}
+        self._completed: Dict[Tuple[str, str], List[str]] = {}
+        self._expiry_heap: List[Tuple[str, str]] = []
+        self._expiry_live: Dict[str, str] = {}
+        self._heap: List[Tuple] = []
+        self._heap_live: Dict[str, Tuple] = {}
+
+        # What the cached _doc reflects
+        self._snapshot_key: Optional[Tuple[int, int, int]] = None
+        self._snapshot_hash = ''
+        self._journal_offset = 0
+        self._journal_events = 0
+        self._journal_valid = False
+
+        if not self.path.exists():
+            with self._lock, file_lock(self.lock_path):
+                if not self.path.exists():
+                    self._write({"topics": []})
+
+    def _write(self, data: Dict) -> str:
+        """
+        Write the snapshot atomically: readers see either the old or the new file, never a partial one
+
+        Returns:
+            SHA-256 of the written file
+        """
+        content = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+        _write_atomic(self.path, content)
+        return hashlib.sha256(content).hexdigest()
+
+    def _stat_key(self) -> Tuple[int, int, int]:
+        stat = self.path.stat()
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _reset_journal(self, snapshot_hash: str):
+        """Start an empty journal for the snapshot with this hash"""
+        header = (json.dumps({"snapshot": snapshot_hash}) + "\n").encode('utf-8')
+        with open(self.journal_path, 'wb') as f:
+            f.write(header)
+            f.flush()
+            os.fsync(f.fileno())
+        self._snapshot_key = self._stat_key()
+        self._snapshot_hash = snapshot_hash
+        self._journal_offset = len(header)
+        self._journal_events = 0
+        self._journal_valid = True
+
+    def _load_snapshot(self):
+        with open(self.path, 'rb') as f:
+            content = f.read()
+        self._doc = json.loads(content)
+        self._build_indexes()
+        self._snapshot_key = self._stat_key()
+        self._snapshot_hash = hashlib.sha256(content).hexdigest()
+        self._journal_offset = 0
+        self._journal_events = 0
+        self._journal_valid = False
+
+    @staticmethod
+    def _heap_entry(topic: Dict, position: int) -> Tuple:
+        # Ties keep queue order, like a stable sort on priority_order
+        return (*priority_order(topic), position, topic['id'])
+
+    def _build_indexes(self):
+        self._index = {}
+        self._by_status = {}
+        self._completed = {}
+        self._heap_live = {}
+        self._expiry_live = {}
+        for position, topic in enumerate(self._doc['topics']):
+            self._index[topic['id']] = position
+            self._index_topic(None, topic, position)
+        self._heap = list(self._heap_live.values())
+        heapq.heapify(self._heap)
+        self._expiry_heap = [(expires_at, topic_id) for topic_id, expires_at in self._expiry_live.items()]
+        heapq.heapify(self._expiry_heap)
+
+    def _index_topic(self, old: Optional[Dict], topic: Dict, position: int):
+        """Update the status, completed and pending indexes for a topic change"""
+        if old is not None:
+            self._by_status.get(old.get('status'), set()).discard(old['id'])
+        self._by_status.setdefault(topic.get('status'), set()).add(topic['id'])
+
+        if old is not None and old.get('status') == 'completed':
+            ids = self._completed.get(keyword_key(old), [])
+            if old['id'] in ids:
+                ids.remove(old['id'])
+                if not ids:
+                    del self._completed[keyword_key(old)]
+        if topic.get('status') == 'completed':
+            self._completed.setdefault(keyword_key(topic), []).append(topic['id'])
+
+        if topic.get('status') == 'pending':
+            entry = self._heap_entry(topic, position)
+            if self._heap_live.get(topic['id']) != entry:
+                self._heap_live[topic['id']] = entry
+                heapq.heappush(self._heap, entry)
+        else:
+            self._heap_live.pop(topic['id'], None)
+
+        expires_at = topic.get('expires_at') if topic.get('status') == 'pending' else None
+        if expires_at:
+            if self._expiry_live.get(topic['id']) != expires_at:
+                self._expiry_live[topic['id']] = expires_at
+                heapq.heappush(self._expiry_heap, (expires_at, topic['id']))
+        else:
+            self._expiry_live.pop(topic['id'], None)
+
+        # Drop superseded entries once they outnumber live ones
+        if len(self._heap) > 2 * len(self._heap_live) + 1024:
+            self._heap = list(self._heap_live.values())
+            heapq.heapify(self._heap)
+        if len(self._expiry_heap) > 2 * len(self._expiry_live) + 1024:
+            self._expiry_heap = [(expires_at, topic_id) for topic_id, expires_at in self._expiry_live.items()]
+            heapq.heapify(self._expiry_heap)
+
+    def _drop(self, topic_ids: Set[str]):
+        """Remove topics and reindex (positions shift, so this is O(n))"""
+        self._doc['topics'] = [t for t in self._doc['topics'] if t['id'] not in topic_ids]
+        self._build_indexes()
+
+    def _apply(self, topic: Dict):
+        position = self._index.get(topic['id'])
+        if position is None:
+            position = self._index[topic['id']] = len(self._doc['topics'])
+            self._doc['topics'].append(topic)
+            old = None
+        else:
+            old = self._doc['topics'][position]
+            self._doc['topics'][position] = topic
+        self._index_topic(old, topic, position)
+
+    def _replay(self):
+        """Apply journal lines written since the last read"""
+        try:
+            with open(self.journal_path, 'rb') as f:
+                f.seek(self._journal_offset)
+                tail = f.read()
+        except FileNotFoundError:
+            return
+
+        deleted = set()
+        for line in tail.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break  # Torn write from a crashed process; overwritten on the next append
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+
+            if self._journal_offset == 0:
+                self._journal_valid = entry.get('snapshot') == self._snapshot_hash
+                if not self._journal_valid:
+                    stale = tail.count(b"\n") - 1
+                    if stale > 0:
+                        print(f"⚠️  {self.path} changed outside the queue; "
+                              f"ignoring {stale} journal events recorded against the old snapshot")
+                    return
+            elif entry['event'] in REMOVAL_EVENTS:
+                # Removals reindex the whole queue; apply a run of them at once
+                deleted.add(entry['topic']['id'])
+                self._journal_events += 1
+            else:
+                if deleted:
+                    self._drop(deleted)
+                    deleted = set()
+                self._apply(entry['topic'])
+                self._journal_events += 1
+            self._journal_offset += len(line)
+
+        if deleted:
+            self._drop(deleted)
+
+    def _refresh(self):
+        """Bring the cached queue up to date with the files (caller holds the file lock)"""
+        if self._doc is None or self._stat_key() != self._snapshot_key:
+            self._load_snapshot()
+        else:
+            try:
+                journal_size = self.journal_path.stat().st_size
+            except FileNotFoundError:
+                journal_size = 0
+            if journal_size < self._journal_offset:
+                # Journal was reset without the snapshot changing; start over
+                self._load_snapshot()
+        self._replay()
+
+    def _append_events(self):
+        """Durably append this transaction's events to the journal"""
+        if not self._journal_valid:
+            self._reset_journal(self._snapshot_hash)
+
+        content = "".join(self._pending_events).encode('utf-8')
+        with open(self.journal_path, 'r+b') as f:
+            # Drop any torn tail left by a crashed writer
+            f.truncate(self._journal_offset)
+            f.seek(self._journal_offset)
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_offset += len(content)
+        self._journal_events += len(self._pending_events)
+
+        if self.compact_every and self._journal_events >= self.compact_every:
+            self._compact()
+
+    def _compact(self):
+        """Fold the journal into a new snapshot, keeping its events as history"""
+        # History first: a crash before the snapshot is written replays the
+        # journal, and the next compaction keeps its events again (duplicated,
+        # never lost)
+        if self._journal_valid and self._journal_events:
+            with open(self.journal_path, 'rb') as f:
+                lines = f.read(self._journal_offset).splitlines(keepends=True)[1:]
+            self.archive_store.add_history(lines)
+
+        # Snapshot next: a crash before the journal reset leaves a journal
+        # whose header no longer matches, so it is ignored rather than replayed
+        self._reset_journal(self._write(self._doc))
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        with self._lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                return
+
+            # Threads serialize on the RLock, processes on the lock file
+            with file_lock(self.lock_path):
+                self._refresh()
+                self._pending_events = []
+                self._depth = 1
+                try:
+                    yield
+                    if self._pending_events:
+                        self._append_events()
+                except BaseException:
+                    # The cache holds uncommitted changes; reload on next use
+                    self._doc = None
+                    raise
+                finally:
+                    self._depth = 0
+                    self._pending_events = []
+
+    # Topics handed out are copies: the cache outlives the transaction, so
+    # callers must not be able to change it without put()
+
+    def get(self, topic_id: str) -> Optional[Dict]:
+        with self.transaction():
+            position = self._index.get(topic_id)
+            return _copy(self._doc['topics'][position]) if position is not None else None
+
+    def put(self, topic: Dict, event: Optional[str] = None):
+        with self.transaction():
+            if topic['id'] not in self._index:
+                event = event or 'added'
+            line = json.dumps({
+                "event": event or 'updated',
+                "at": datetime.now(timezone.utc).isoformat(),
+                "topic": topic
+            }, ensure_ascii=False)
+            self._pending_events.append(line + "\n")
+            self._apply(json.loads(line)['topic'])
+
+    def select(self, status: Optional[str] = None) -> List[Dict]:
+        with self.transaction():
+            if status is None:
+                return _copy(self._doc['topics'])
+            positions = sorted(self._index[topic_id] for topic_id in self._by_status.get(status, ()))
+            return _copy([self._doc['topics'][position] for position in positions])
+
+    def pending(self, priority_min: int = 1, limit: Optional[int] = None) -> List[Dict]:
+        with self.transaction():
+            with closing(self.iter_pending(priority_min)) as topics:
+                return list(islice(topics, limit))
+
+    def iter_pending(self, priority_min: int = 1) -> Iterator[Dict]:
+        if not self._depth:
+            raise RuntimeError("iter_pending() must run inside a transaction")
+
+        popped = []
+        try:
+            while self._heap and -self._heap[0][0] >= priority_min:
+                entry = heapq.heappop(self._heap)
+                topic_id, position = entry[-1], entry[-2]
+                if self._heap_live.get(topic_id) != entry:
+                    continue  # Superseded by a later change
+                del self._heap_live[topic_id]
+                popped.append(entry)
+                yield _copy(self._doc['topics'][position])
+        finally:
+            # Topics the caller passed over (duplicates, invalid) stay in the index
+            if self._doc is not None:
+                for entry in popped:
+                    topic_id, position = entry[-1], entry[-2]
+                    if topic_id not in self._heap_live and self._doc['topics'][position].get('status') == 'pending':
+                        self._heap_live[topic_id] = entry
+                        heapq.heappush(self._heap, entry)
+
+    def find_completed(self, topic: Dict) -> Optional[str]:
+        with self.transaction():
+            ids = self._completed.get(keyword_key(topic))
+            # First in queue order, as a scan would find it
+            return min(ids, key=self._index.__getitem__) if ids else self.archive_store.find(topic)
+
+    def expiring(self, before: str, limit: int) -> List[Dict]:
+        with self.transaction():
+            found = []
+            popped = []
+            while self._expiry_heap and self._expiry_heap[0][0] < before and len(found) < limit:
+                entry = heapq.heappop(self._expiry_heap)
+                if self._expiry_live.get(entry[1]) != entry[0]:
+                    continue  # Superseded by a later change
+                popped.append(entry)
+                found.append(self._doc['topics'][self._index[entry[1]]])
+            # Entries stay until the topics leave pending (then they go stale)
+            for entry in popped:
+                heapq.heappush(self._expiry_heap, entry)
+            return _copy(found)
+
+    def _remove(self, topic_ids: Set[str], event: str):
+        """Journal and drop topics (caller holds the transaction)"""
+        now = datetime.now(timezone.utc).isoformat()
+        for topic_id in topic_ids:
+            self._pending_events.append(json.dumps(
+                {"event": event, "at": now, "topic": {"id": topic_id}}, ensure_ascii=False) + "\n")
+        self._drop(topic_ids)
+
+    def delete(self, topic_ids: Iterable[str]):
+        with self.transaction():
+            topic_ids = {topic_id for topic_id in topic_ids if topic_id in self._index}
+            if topic_ids:
+                self._remove(topic_ids, 'deleted')
+
+    def count(self) -> int:
+        with self.transaction():
+            return len(self._doc['topics'])
+
+    def archive(self, topic_ids: Iterable[str]) -> int:
+        with self.transaction():
+            topic_ids = {topic_id for topic_id in topic_ids if topic_id in self._index}
+            if not topic_ids:
+                return 0
+            now = datetime.now(timezone.utc).isoformat()
+            topics = [dict(self._doc['topics'][self._index[topic_id]], archived_at=now)
+                      for topic_id in sorted(topic_ids, key=self._index.__getitem__)]
+            self.archive_store.add(topics)
+            self._remove(topic_ids, 'archived')
+            return len(topics)
+
+    def archived_keys(self) -> Set[Tuple[str, str]]:
+        with self.transaction():
+            return self.archive_store.keys()
+
+    def archived_count(self) -> int:
+        with self.transaction():
+            return self.archive_store.count()
+
+    def next_number(self) -> int:
+        with self.transaction():
+            live = max((topic_number(topic_id) for topic_id in self._index), default=0)
+            return max(live, self.archive_store.max_number()) + 1
+
+    def export(self) -> Dict:
+        with self.transaction():
+            return _copy(self._doc)
+
+    def events(self, topic_id: Optional[str] = None) -> List[Dict]:
+        """History kept by earlier compactions, then the journal, oldest first"""
+        with self.transaction():
+            events = self.archive_store.history(topic_id)
+            if not self._journal_valid:
+                return events
+            with open(self.journal_path, 'rb') as f:
+                lines = f.read(self._journal_offset).splitlines()[1:]
+            journal = [json.loads(line) for line in lines]
+            return events + [e for e in journal if topic_id is None or e['topic']['id'] == topic_id]
+
+    def compact(self) -> int:
+        with self.transaction():
+            folded = self._journal_events
+            if folded or (self.journal_path.exists() and not self._journal_valid):
+                self._compact()
+            return folded
+
+    def replace(self, data: Dict):
+        with self._lock:
+            if self._depth:
+                raise RuntimeError("replace() cannot run inside a transaction")
+            with file_lock(self.lock_path):
+                self._doc = _copy(data)
+                self._build_indexes()
+                self._reset_journal(self._write(data))
+
+
+class SQLiteQueueStorage(QueueStorage):
+    """Queue stored as one indexed SQLite row per topic (archived topics in a separate table)"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS topics (
+            id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            priority INTEGER NOT NULL,
+            created_at TEXT NOT NULL,
+            keyword_key TEXT NOT NULL,
+            lang TEXT NOT NULL,
+            expires_at TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_topics_status_priority
+            ON topics (status, priority DESC, created_at);
+        CREATE INDEX IF NOT EXISTS idx_topics_keyword_lang
+            ON topics (keyword_key, lang);
+        CREATE INDEX IF NOT EXISTS idx_topics_expiry
+            ON topics (status, expires_at);
+        CREATE TABLE IF NOT EXISTS archive (
+            id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            month TEXT NOT NULL,
+            keyword_key TEXT NOT NULL,
+            lang TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_archive_keyword_lang
+            ON archive (keyword_key, lang, status);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, path: Path, timeout: float = 30):
+        """
+        Args:
+            path: Database file
+            timeout: Seconds to wait for another writer's lock
+        """
+        self.path = Path(path)
+        self.timeout = timeout
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(topics)")}
+        if columns and 'expires_at' not in columns:
+            # Databases created before topics had expires_at
+            conn.execute("ALTER TABLE topics ADD COLUMN expires_at TEXT")
+            conn.execute("UPDATE topics SET expires_at = json_extract(data, '$.expires_at')")
+        conn.executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection (sqlite3 connections are not shared across threads)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        conn = self._connection()
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield
+            finally:
+                self._local.depth -= 1
+            return
+
+        # IMMEDIATE takes the write lock up front, so read-modify-write
+        # transitions from concurrent workers/processes serialize cleanly
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            self._local.depth = 0
+
+    @staticmethod
+    def _row(topic: Dict) -> Tuple:
+        keyword, lang = keyword_key(topic)
+        return (
+            topic['id'],
+            topic.get('status', 'pending'),
+            topic.get('priority', 5),
+            topic.get('created_at') or '',
+            keyword,
+            lang,
+            topic.get('expires_at'),
+            json.dumps(topic, ensure_ascii=False)
+        )
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Dict]:
+        return [json.loads(row[0]) for row in self._connection().execute(sql, params)]
+
+    def get(self, topic_id: str) -> Optional[Dict]:
+        topics = self._query("SELECT data FROM topics WHERE id = ?", (topic_id,))
+        return topics[0] if topics else None
+
+    def put(self, topic: Dict, event: Optional[str] = None):
+        # Upsert keeps the rowid, so queue order survives updates
+        self._connection().execute(
+            """
+            INSERT INTO topics (id, status, priority, created_at, keyword_key, lang, expires_at, data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                status = excluded.status,
+                priority = excluded.priority,
+                created_at = excluded.created_at,
+                keyword_key = excluded.keyword_key,
+                lang = excluded.lang,
+                expires_at = excluded.expires_at,
+                data = excluded.data
+            """,
+            self._row(topic)
+        )
+
+    def select(self, status: Optional[str] = None) -> List[Dict]:
+        if status is None:
+            return self._query("SELECT data FROM topics ORDER BY rowid")
+        return self._query("SELECT data FROM topics WHERE status = ? ORDER BY rowid", (status,))
+
+    def pending(self, priority_min: int = 1, limit: Optional[int] = None) -> List[Dict]:
+        return self._query(
+            """
+            SELECT data FROM topics
+            WHERE status = 'pending' AND priority >= ?
+            ORDER BY priority DESC, created_at
+            LIMIT ?
+            """,
+            (priority_min, -1 if limit is None else limit)
+        )
+
+    def iter_pending(self, priority_min: int = 1, page_size: int = 64) -> Iterator[Dict]:
+        # Keyset pages along idx_topics_status_priority: rows reserved while
+        # iterating simply drop out, and no page is read twice
+        conn = self._connection()
+        rows = conn.execute(
+            """
+            SELECT priority, created_at, rowid, data FROM topics
+            WHERE status = 'pending' AND priority >= ?
+            ORDER BY priority DESC, created_at, rowid
+            LIMIT ?
+            """,
+            (priority_min, page_size)
+        ).fetchall()
+        while rows:
+            for row in rows:
+                yield json.loads(row[3])
+            priority, created_at, rowid = rows[-1][:3]
+            rows = conn.execute(
+                """
+                SELECT priority, created_at, rowid, data FROM topics
+                WHERE status = 'pending' AND priority >= ?
+                  AND (priority < ? OR (priority = ? AND (created_at > ? OR (created_at = ? AND rowid > ?))))
+                ORDER BY priority DESC, created_at, rowid
+                LIMIT ?
+                """,
+                (priority_min, priority, priority, created_at, created_at, rowid, page_size)
+            ).fetchall()
+
+    def find_completed(self, topic: Dict) -> Optional[str]:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT id FROM topics WHERE keyword_key = ? AND lang = ? AND status = 'completed' ORDER BY rowid LIMIT 1",
+            keyword_key(topic)
+        ).fetchone() or conn.execute(
+            "SELECT id FROM archive WHERE keyword_key = ? AND lang = ? AND status = 'completed' ORDER BY rowid LIMIT 1",
+            keyword_key(topic)
+        ).fetchone()
+        return row[0] if row else None
+
+    def expiring(self, before: str, limit: int) -> List[Dict]:
+        return self._query(
+            """
+            SELECT data FROM topics
+            WHERE status = 'pending' AND expires_at IS NOT NULL AND expires_at < ?
+            ORDER BY expires_at
+            LIMIT ?
+            """,
+            (before, limit)
+        )
+
+    def delete(self, topic_ids: Iterable[str]):
+        with self.transaction():
+            self._connection().executemany("DELETE FROM topics WHERE id = ?", [(topic_id,) for topic_id in topic_ids])
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM topics").fetchone()[0]
+
+    def archive(self, topic_ids: Iterable[str]) -> int:
+        with self.transaction():
+            conn = self._connection()
+            now = datetime.now(timezone.utc).isoformat()
+            rows = []
+            for topic_id in topic_ids:
+                topic = self.get(topic_id)
+                if topic is not None:
+                    topic['archived_at'] = now
+                    keyword, lang = keyword_key(topic)
+                    rows.append((topic_id, topic.get('status', 'pending'), archive_month(topic), keyword, lang,
+                                 json.dumps(topic, ensure_ascii=False)))
+            conn.executemany(
+                "INSERT OR REPLACE INTO archive (id, status, month, keyword_key, lang, data) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.executemany("DELETE FROM topics WHERE id = ?", [row[:1] for row in rows])
+            return len(rows)
+
+    def archived_keys(self) -> Set[Tuple[str, str]]:
+        return set(self._connection().execute(
+            "SELECT DISTINCT keyword_key, lang FROM archive WHERE status = 'completed'"
+        ))
+
+    def archived_count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM archive").fetchone()[0]
+
+    def next_number(self) -> int:
+        # CAST reads the leading digits of an ID, like topic_number()
+        row = self._connection().execute(
+            """
+            SELECT MAX(n) FROM (
+                SELECT MAX(CAST(id AS INTEGER)) AS n FROM topics
+                UNION ALL SELECT MAX(CAST(id AS INTEGER)) FROM archive
+            )
+            """
+        ).fetchone()
+        return (row[0] or 0) + 1
+
+    def export(self) -> Dict:
+        with self.transaction():
+            data = {key: json.loads(value) for key, value in
+                    self._connection().execute("SELECT key, value FROM meta ORDER BY key")}
+            data['topics'] = self.select()
+        return data
+
+    def replace(self, data: Dict):
+        with self.transaction():
+            conn = self._connection()
+            conn.execute("DELETE FROM topics")
+            conn.execute("DELETE FROM meta")
+            conn.executemany(
+                "INSERT INTO topics (id, status, priority, created_at, keyword_key, lang, expires_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [self._row(topic) for topic in data.get('topics', [])]
+            )
+            # Keep any other top-level keys so export() round-trips the document
+            conn.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value, ensure_ascii=False)) for key, value in data.items() if key != 'topics']
+            )
+
+
+def open_storage(path) -> QueueStorage:
+    """Open the queue backend for a file (SQLite for .db/.sqlite, JSON otherwise)"""
+    path = Path(path)
+    if path.suffix.lower() in SQLITE_SUFFIXES:
+        return SQLiteQueueStorage(path)
+    return JSONQueueStorage(path)
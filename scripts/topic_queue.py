@@ -6,7 +6,42 @@ States:
 - pending: Ready to be processed
 - in_progress: Currently being processed
 - completed: Successfully processed
-- failed: Failed processing (will be retried)
+- failed: Dead letter: out of retries, never reserved until requeued
+- expired: Trend topic whose expires_at passed before it was reserved
+
+A failed attempt returns the topic to pending with an exponentially growing
+next_attempt_at that reserve_topics respects; after max_retries retries it
+moves to failed instead (`dead-letters` / `requeue` on the CLI).
+
+Trend topics get an expires_at (created_at + expiry_days) when added. Each
+reservation first sweeps a bounded number of pending topics past expires_at
+to expired (indexed, so no full pass), and never reserves an expired topic;
+trends added before expires_at existed are judged by created_at + expiry_days.
+purge_expired() (cleanup_expired.py) deletes expired trends outright.
+
+archive_topics() (`archive` on the CLI) moves completed topics older than a
+week, and expired ones, into a date-partitioned archive. Archived completed
+topics still block duplicates and their ID numbers are not reused, so the
+live queue only holds work in flight plus recent history.
+
+Storage is pluggable (see queue_storage.py): the default is the git-committed
+data/topics_queue.json; a .db path (e.g. TOPIC_QUEUE_PATH=data/topics_queue.db)
+uses an indexed SQLite database. `import`/`export` convert between the two.
+The JSON backend appends each transition (reserved, completed, failed,
+expired, ...) to data/topics_queue.journal.jsonl and folds the journal into
+the snapshot periodically; run `compact` before committing the snapshot.
+Folded events move to history-YYYY-MM.jsonl files in the archive, which
+`history` reads along with the journal.
+Both backends serialize transitions across threads and processes, so
+concurrent runs never reserve the same topic.
+
+Each reservation carries a short lease (lease_id, lease_expires_at) that the
+worker renews while the topic is in flight (see LeaseHeartbeat). Expired
+leases are reclaimed by reserve_topics, so topics held by a crashed run
+return to pending within minutes (topics of an interrupted --batch run
+within a day, unless a --batch run resumes them first). Passing the lease_id to
+mark_completed/mark_failed makes the transition a no-op if the topic has
+since been reclaimed and reserved by someone else.
 
 Usage:
     from topic_queue import reserve_topics, mark_completed, mark_failed
@@ -18,17 +53,27 @@ Usage:
             mark_completed(topic['id'])
         except Exception as e:
             mark_failed(topic['id'], str(e))
+
+    # Many transitions with one load and one write
+    with get_queue().batch() as batch:
+        batch.complete(topic_id)
+        batch.fail(other_id, "error")
 """
 
 import json
 import os
 import sys
+import threading
+import uuid
+from collections import deque
+from contextlib import closing, contextmanager
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Iterable, Iterator, List, Dict, Optional
 
 # Add utils to path
 sys.path.insert(0, str(Path(__file__).parent))
+from queue_storage import open_storage, priority_order, topic_lang
 from utils.validation import (
     validate_keyword,
     validate_category,
@@ -39,120 +84,730 @@ from utils.validation import (
 )
 
 
+DEFAULT_QUEUE_FILE = "data/topics_queue.json"
+
+# How long a reservation stays valid without a heartbeat (override with TOPIC_LEASE_MINUTES)
+DEFAULT_LEASE_MINUTES = 15
+
+# How long an interrupted --batch run's topics wait for a --batch resume after their
+# lease ran out; Message Batches finish or expire within a day (BatchRunner max_wait)
+BATCH_RESUME_GRACE_HOURS = 24
+
+# Retries after the first attempt before a topic is dead-lettered (override with TOPIC_MAX_RETRIES)
+DEFAULT_MAX_RETRIES = 3
+
+# Delay before the first retry, doubled for each further retry and capped
+RETRY_BASE_MINUTES = 30
+RETRY_MAX_MINUTES = 24 * 60
+
+# Trend topics expire this many days after they were added (unless expiry_days is set)
+DEFAULT_TREND_EXPIRY_DAYS = 3
+
+# Most topics moved to expired per reservation, keeping the sweep's cost bounded
+EXPIRY_SWEEP_LIMIT = 50
+
+# Completed topics stay in the live queue this long before archive_topics() moves them
+DEFAULT_ARCHIVE_AFTER_DAYS = 7
+
+# Reservation policies: strict priority order, or fair share across
+# languages (and categories within each language)
+RESERVATION_POLICIES = ('priority', 'fair')
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse an ISO timestamp from the queue as an aware datetime
+
+    Older topics mix naive and aware timestamps (and a trailing Z); naive
+    ones are treated as UTC.
+
+    Returns:
+        The timestamp, or None if missing or malformed
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+def topic_expires_at(topic: Dict, expiry_days: Optional[int] = None) -> Optional[str]:
+    """
+    When a topic expires: trend topics expiry_days after they were added
+
+    Args:
+        topic: Topic (uses keyword_type, expiry_days, added_at/created_at)
+        expiry_days: Override the topic's expiry_days
+
+    Returns:
+        UTC ISO timestamp, or None for evergreen topics and topics without a valid timestamp
+    """
+    if topic.get('keyword_type') != 'trend':
+        return None
+    added_at = parse_timestamp(topic.get('added_at') or topic.get('created_at'))
+    if added_at is None:
+        return None
+    days = expiry_days or topic.get('expiry_days') or DEFAULT_TREND_EXPIRY_DAYS
+    return (added_at + timedelta(days=days)).astimezone(timezone.utc).isoformat()
+
+
+def _round_robin(buckets: List[deque]) -> Iterator[Dict]:
+    """Take one topic from each bucket in turn until all are empty"""
+    while buckets:
+        for bucket in list(buckets):
+            yield bucket.popleft()
+            if not bucket:
+                buckets.remove(bucket)
+
+
+def fair_share(topics: Iterable[Dict], lang_weights: Optional[Dict[str, float]] = None) -> Iterator[Dict]:
+    """
+    Order topics so each language gets its share of reservations
+
+    Deficit round-robin across languages (each language earns its weight per
+    round, default 1), and round-robin across categories within a language,
+    so one busy category cannot crowd out the others. Topics keep priority
+    order within each (lang, category) bucket, and buckets holding
+    higher-priority topics go first in each round.
+
+    Args:
+        topics: Candidate topics in priority order
+        lang_weights: Relative share per language (missing languages get 1)
+
+    Yields:
+        Topics in reservation order
+    """
+    buckets: Dict[str, Dict[str, deque]] = {}
+    for topic in topics:
+        categories = buckets.setdefault(topic_lang(topic), {})
+        categories.setdefault(topic.get('category', 'tech'), deque()).append(topic)
+    if not buckets:
+        return
+
+    weights = {lang: (lang_weights or {}).get(lang, 1.0) for lang in buckets}
+    langs = [lang for lang in buckets if weights[lang] > 0]
+    if not langs:
+        return
+    # Scale so the heaviest language is served every round
+    heaviest = max(weights[lang] for lang in langs)
+    quantum = {lang: weights[lang] / heaviest for lang in langs}
+
+    # Input is priority ordered, so a bucket's first topic is its best one
+    streams = {}
+    for lang in sorted(langs, key=lambda lang: min(priority_order(q[0]) for q in buckets[lang].values())):
+        categories = sorted(buckets[lang].values(), key=lambda q: priority_order(q[0]))
+        streams[lang] = _round_robin(categories)
+
+    deficit = dict.fromkeys(streams, 0.0)
+    while streams:
+        for lang in list(streams):
+            deficit[lang] += quantum[lang]
+            while deficit[lang] >= 1:
+                topic = next(streams[lang], None)
+                if topic is None:
+                    del streams[lang]
+                    break
+                deficit[lang] -= 1
+                yield topic
+
+
+class QueueBatch:
+    """
+    Unit of work for the topic queue
+
+    Transitions are recorded (from any thread) with the time they happened
+    and applied together in one storage transaction when the batch is
+    committed, so N finished topics cost one load and one write instead of N.
+    """
+
+    def __init__(self, queue: 'TopicQueue'):
+        self.queue = queue
+        self._operations = []
+        self._lock = threading.Lock()
+
+    def _record(self, operation: str, *args):
+        with self._lock:
+            self._operations.append((operation, datetime.now(timezone.utc).isoformat(), args))
+
+    def complete(self, topic_id: str, lease_id: Optional[str] = None):
+        """Record a topic as completed"""
+        self._record('complete', topic_id, lease_id)
+
+    def fail(self, topic_id: str, error_message: str = "", lease_id: Optional[str] = None):
+        """Record a topic as failed (returns to pending for retry)"""
+        self._record('fail', topic_id, error_message, lease_id)
+
+    def requeue(self, topic_id: str):
+        """Record a topic to be returned to pending without counting a retry"""
+        self._record('requeue', topic_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._operations)
+
+    def commit(self) -> int:
+        """
+        Apply all recorded transitions in one transaction
+
+        Returns:
+            Number of transitions applied (stale leases and unknown IDs are skipped)
+        """
+        with self._lock:
+            operations, self._operations = self._operations, []
+        if not operations:
+            return 0
+
+        applied = 0
+        with self.queue.storage.transaction():
+            for operation, timestamp, args in operations:
+                if getattr(self.queue, f"_{operation}")(*args, timestamp=timestamp):
+                    applied += 1
+        return applied
+
+
+class LeaseHeartbeat:
+    """
+    Background thread renewing the leases of in-flight topics
+
+    Renews every interval (a third of the lease TTL by default), so a
+    topic's lease only runs out once the process holding it has stopped.
+    """
+
+    def __init__(self, queue: 'TopicQueue', topics: Iterable[Dict] = (), interval: Optional[float] = None):
+        self.queue = queue
+        self.interval = interval if interval is not None else queue.lease_minutes * 60 / 3
+        self._leases = {t['id']: t['lease_id'] for t in topics if t.get('lease_id')}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, topic: Dict):
+        """Keep renewing a topic's lease"""
+        if topic.get('lease_id'):
+            with self._lock:
+                self._leases[topic['id']] = topic['lease_id']
+
+    def remove(self, topic_id: str):
+        """Stop renewing a topic's lease"""
+        with self._lock:
+            self._leases.pop(topic_id, None)
+
+    def beat(self) -> int:
+        """Renew all held leases now; leases that were lost are dropped"""
+        with self._lock:
+            leases = dict(self._leases)
+        if not leases:
+            return 0
+
+        renewed = self.queue.renew_leases(leases)
+        with self._lock:
+            for topic_id in set(leases) - renewed:
+                self._leases.pop(topic_id, None)
+        return len(renewed)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.beat()
+            except Exception as e:
+                # Keep beating; the next renewal may succeed before the lease runs out
+                print(f"⚠️  Lease renewal failed: {e}")
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="lease-heartbeat", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'LeaseHeartbeat':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
 class TopicQueue:
-    def __init__(self, queue_file: str = "data/topics_queue.json"):
+    def __init__(self, queue_file: str = DEFAULT_QUEUE_FILE, lease_minutes: float = DEFAULT_LEASE_MINUTES,
+                 max_retries: int = DEFAULT_MAX_RETRIES, retry_base_minutes: float = RETRY_BASE_MINUTES):
+        """
+        Args:
+            queue_file: Queue file; .db/.sqlite selects the SQLite backend
+            lease_minutes: Lifetime of a reservation lease between heartbeats
+            max_retries: Retries after the first attempt before a topic is dead-lettered
+            retry_base_minutes: Backoff before the first retry (doubled per retry, 0 disables)
+        """
         self.queue_file = Path(queue_file)
-        self._ensure_queue_file()
+        self.lease_minutes = lease_minutes
+        self.max_retries = max_retries
+        self.retry_base_minutes = retry_base_minutes
+        self.storage = open_storage(self.queue_file)
+        self._batch: Optional[QueueBatch] = None
+
+    @contextmanager
+    def batch(self):
+        """
+        Group transitions into one write
 
-    def _ensure_queue_file(self):
-        """Create queue file if it doesn't exist"""
-        if not self.queue_file.exists():
-            self.queue_file.parent.mkdir(parents=True, exist_ok=True)
-            self._save_queue({"topics": []})
+        While the batch is open, mark_completed/mark_failed on this queue are
+        recorded into it too. Recorded transitions are applied when the block
+        exits, also when it exits with an error, since they describe work
+        that already happened.
+
+        Usage:
+            with queue.batch() as batch:
+                batch.complete(topic_id)
+        """
+        batch = QueueBatch(self)
+        outer, self._batch = self._batch, batch
+        try:
+            yield batch
+        finally:
+            self._batch = outer
+            batch.commit()
+
+    def heartbeat(self, topics: Iterable[Dict] = (), interval: Optional[float] = None) -> LeaseHeartbeat:
+        """
+        Renew the leases of topics while they are processed
+
+        Usage:
+            with queue.heartbeat(topics):
+                ...  # process topics (and mark them completed/failed)
+        """
+        return LeaseHeartbeat(self, topics, interval)
+
+    def _lease_expiry(self, now: datetime) -> str:
+        return (now + timedelta(minutes=self.lease_minutes)).isoformat()
+
+    def renew_leases(self, leases: Dict[str, str]) -> set:
+        """
+        Extend leases by the lease TTL from now
+
+        Args:
+            leases: Topic ID -> lease_id
+
+        Returns:
+            IDs of topics whose lease was renewed (the rest were lost or finished)
+        """
+        lease_expires_at = self._lease_expiry(datetime.now(timezone.utc))
+        renewed = set()
+        with self.storage.transaction():
+            for topic_id, lease_id in leases.items():
+                topic = self.storage.get(topic_id)
+                if topic is None or topic.get('status') != 'in_progress' or topic.get('lease_id') != lease_id:
+                    continue
+                topic['lease_expires_at'] = lease_expires_at
+                self.storage.put(topic, event='renewed')
+                renewed.add(topic_id)
+        return renewed
+
+    def reclaim_expired_leases(self) -> List[str]:
+        """
+        Return in_progress topics whose lease ran out to pending
+
+        Topics with in-flight Message Batches (batch_ids) get another
+        BATCH_RESUME_GRACE_HOURS so an interrupted --batch run can still
+        resume them, and are reclaimed after that, so runs without --batch
+        do not leave them in_progress.
+
+        Reclaiming counts as a failed attempt (backoff, dead letter).
+
+        Returns:
+            IDs of reclaimed topics
+        """
+        now = datetime.now(timezone.utc)
+        reclaimed = []
+        with self.storage.transaction():
+            for topic in self.storage.select('in_progress'):
+                lease_expires_at = topic.get('lease_expires_at')
+                if not lease_expires_at:
+                    continue
+                deadline = datetime.fromisoformat(lease_expires_at)
+                if topic.get('batch_ids'):
+                    deadline += timedelta(hours=BATCH_RESUME_GRACE_HOURS)
+                if deadline >= now:
+                    continue
+                self._record_failure(topic, "Lease expired (worker stopped renewing)", now)
+                self.storage.put(topic, event='reclaimed')
+                reclaimed.append(topic['id'])
+        return reclaimed
+
+    def resume_batch_topics(self) -> List[Dict]:
+        """
+        Take over the topics of an interrupted --batch run
+
+        Only in_progress topics with in-flight Message Batches (batch_ids)
+        whose lease ran out are resumed, so a live --batch run keeps its own
+        topics. Each gets a new lease in the same transaction, as in
+        reserve_topics.
+
+        Returns:
+            Resumed topics (with their new lease)
+        """
+        now = datetime.now(timezone.utc)
+        lease_expires_at = self._lease_expiry(now)
+        resumed = []
+        with self.storage.transaction():
+            for topic in self.storage.select('in_progress'):
+                if not topic.get('batch_ids'):
+                    continue
+                if topic.get('lease_expires_at') and datetime.fromisoformat(topic['lease_expires_at']) >= now:
+                    continue
+                topic['lease_id'] = uuid.uuid4().hex
+                topic['lease_expires_at'] = lease_expires_at
+                self.storage.put(topic, event='resumed')
+                resumed.append(topic)
+        return resumed
+
+    def expire_topics(self, limit: int = EXPIRY_SWEEP_LIMIT) -> List[str]:
+        """
+        Move up to `limit` pending topics past their expires_at to expired
+
+        Uses the storage's expiry index, so the cost is bounded by `limit`
+        rather than the queue size.
+
+        Returns:
+            IDs of expired topics
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        expired = []
+        with self.storage.transaction():
+            for topic in self.storage.expiring(now, limit):
+                topic['status'] = 'expired'
+                topic['expired_at'] = now
+                self.storage.put(topic, event='expired')
+                expired.append(topic['id'])
+        return expired
+
+    def purge_expired(self, expiry_days: Optional[int] = None) -> List[Dict]:
+        """
+        Delete expired trend topics (pending, completed or expired; never in_progress)
+
+        A full pass over the queue, for occasional cleanup; reservations
+        already skip expired topics. Completed trend topics without any
+        timestamp (data from before added_at existed) are deleted too.
+
+        Args:
+            expiry_days: Expire trends this many days after they were added,
+                instead of each topic's expires_at
+
+        Returns:
+            The deleted topics
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        with self.storage.transaction():
+            removed = []
+            for topic in self.storage.select():
+                status = topic.get('status')
+                if status == 'in_progress' or topic.get('keyword_type') != 'trend':
+                    continue
+                if expiry_days:
+                    expires_at = topic_expires_at(topic, expiry_days)
+                else:
+                    expires_at = topic.get('expires_at') or topic_expires_at(topic)
+                if expires_at is None:
+                    if status == 'completed' and not (topic.get('added_at') or topic.get('created_at')):
+                        removed.append(topic)
+                elif status == 'expired' or expires_at <= now:
+                    removed.append(topic)
+            self.storage.delete(t['id'] for t in removed)
+        return removed
+
+    def archive_topics(self, older_than_days: float = DEFAULT_ARCHIVE_AFTER_DAYS) -> int:
+        """
+        Move finished topics out of the live queue into the archive
+
+        Archives expired topics and topics completed more than
+        older_than_days ago (or without a completed_at). Recent completions
+        stay so they can still be requeued (e.g. by the quality gate).
+
+        Returns:
+            Number of topics archived
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+        with self.storage.transaction():
+            topic_ids = [t['id'] for t in self.storage.select('expired')]
+            for topic in self.storage.select('completed'):
+                completed_at = parse_timestamp(topic.get('completed_at'))
+                if completed_at is None or completed_at <= cutoff:
+                    topic_ids.append(topic['id'])
+            return self.storage.archive(topic_ids)
+
+    @staticmethod
+    def _lease_lost(topic: Dict, lease_id: Optional[str]) -> bool:
+        """True if the caller's lease no longer owns the topic"""
+        if lease_id is None or topic.get('lease_id') == lease_id:
+            return False
+        print(f"⚠️  Lease lost for {topic['id']}: topic was reclaimed by another reservation")
+        return True
+
+    @staticmethod
+    def _release(topic: Dict):
+        """Drop reservation-only fields"""
+        topic.pop('lease_id', None)
+        topic.pop('lease_expires_at', None)
+        # Batch IDs only matter while the topic is in flight
+        topic.pop('batch_ids', None)
+
+    def _record_failure(self, topic: Dict, error_message: str, now: datetime):
+        """
+        Count a failed attempt: back to pending with a backoff, or dead-letter it
+
+        Retry n waits retry_base_minutes * 2^(n-1) (capped); once retry_count
+        exceeds max_retries the topic moves to the terminal 'failed' state.
+        """
+        topic['retry_count'] = topic.get('retry_count', 0) + 1
+        topic['last_error'] = error_message
+        topic['last_failed_at'] = now.isoformat()
+
+        # Remove reservation timestamp, lease and in-flight batch IDs (and completion,
+        # when a generated post is rejected afterwards)
+        topic.pop('reserved_at', None)
+        topic.pop('completed_at', None)
+        self._release(topic)
+
+        if topic['retry_count'] > self.max_retries:
+            topic['status'] = 'failed'
+            topic.pop('next_attempt_at', None)
+            return
+
+        topic['status'] = 'pending'  # Rollback to pending
+        delay = min(RETRY_MAX_MINUTES, self.retry_base_minutes * 2 ** (topic['retry_count'] - 1))
+        if delay > 0:
+            topic['next_attempt_at'] = (now + timedelta(minutes=delay)).isoformat()
+        else:
+            topic.pop('next_attempt_at', None)
 
     def _load_queue(self) -> Dict:
-        """Load queue from file"""
-        with open(self.queue_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        """Load the whole queue as a JSON document"""
+        return self.storage.export()
 
     def _save_queue(self, data: Dict):
-        """Save queue to file"""
-        with open(self.queue_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        """Replace the whole queue with a JSON document"""
+        self.storage.replace(data)
 
-    def reserve_topics(self, count: int = 3, priority_min: int = 1) -> List[Dict]:
+    def reserve_topics(self, count: int = 3, priority_min: int = 1, policy: str = 'priority') -> List[Dict]:
         """
         Reserve topics by moving them from pending to in_progress
 
         Args:
             count: Number of topics to reserve
             priority_min: Minimum priority level (1-10)
+            policy: 'priority' (highest priority first) or 'fair' (spread
+                across languages and categories, see fair_share; reads every
+                pending topic)
 
         Returns:
             List of reserved topics
         """
-        data = self._load_queue()
-
-        # Get completed keywords to prevent duplicates
-        completed_keywords = {
-            (t['keyword'].lower(), t.get('lang', t.get('language', 'en'))): t['id']
-            for t in data['topics']
-            if t['status'] == 'completed'
-        }
-
-        # Find available topics sorted by priority (high to low) and created_at
-        # Note: Only 'pending' status is used (unified from 'available' on 2026-01-25)
-        available = [
-            t for t in data['topics']
-            if t['status'] == 'pending' and t.get('priority', 5) >= priority_min
-        ]
-        available.sort(key=lambda x: (-x.get('priority', 5), x.get('created_at', '')))
+        if policy not in RESERVATION_POLICIES:
+            raise ValueError(f"Unknown reservation policy: {policy} (expected one of {', '.join(RESERVATION_POLICIES)})")
 
         # Reserve top N topics
         reserved = []
-        now = datetime.now(timezone.utc).isoformat()
+        reserved_at = datetime.now(timezone.utc)
+        now = reserved_at.isoformat()
+        lease_expires_at = self._lease_expiry(reserved_at)
+
+        if count <= 0:
+            return reserved
+
+        with self.storage.transaction():
+            # Topics held by runs that stopped renewing are reservable again
+            reclaimed = self.reclaim_expired_leases()
+            if reclaimed:
+                print(f"♻️  Reclaimed {len(reclaimed)} topic(s) with expired leases")
+            expired = self.expire_topics()
+            if expired:
+                print(f"⌛ Expired {len(expired)} trend topic(s) past their expiry")
+
+            with closing(self.storage.iter_pending(priority_min)) as available:
+                # Pending topics by priority (high to low) and created_at, read lazily
+                # so duplicates/invalid topics at the head never cause an under-reserve
+                # Note: Only 'pending' status is used (unified from 'available' on 2026-01-25)
+                candidates = (topic for topic in available if self._reservable(topic, now))
+                if policy == 'fair':
+                    candidates = fair_share(candidates)
+
+                for topic in candidates:
+                    topic['status'] = 'in_progress'
+                    topic['reserved_at'] = now
+                    topic['retry_count'] = topic.get('retry_count', 0)
+                    topic['lease_id'] = uuid.uuid4().hex
+                    topic['lease_expires_at'] = lease_expires_at
+                    topic.pop('next_attempt_at', None)
+                    self.storage.put(topic, event='reserved')
+                    reserved.append(topic)
+
+                    # Stop when we have enough topics
+                    if len(reserved) >= count:
+                        break
 
-        for topic in available[:count * 2]:  # Check more topics to account for duplicates
-            # Skip if already completed for same keyword+lang
-            topic_lang = topic.get('lang', topic.get('language', 'en'))
-            topic_key = (topic['keyword'].lower(), topic_lang)
-            if topic_key in completed_keywords:
-                print(f"⚠️  Skipping duplicate: {topic['keyword']} ({topic_lang}) - already completed as {completed_keywords[topic_key]}")
-                continue
+        return reserved
 
-            # Validate topic data before reserving
-            errors = validate_topic_data(topic)
-            if errors:
-                # Skip invalid topics
-                print(f"⚠️  Skipping invalid topic {topic.get('id', 'unknown')}: {errors}")
-                continue
+    def _reservable(self, topic: Dict, now: str) -> bool:
+        """Whether a pending topic may be reserved (backoff over, not a duplicate, valid)"""
+        # Still backing off after a failure (both are UTC ISO timestamps)
+        if topic.get('next_attempt_at', '') > now:
+            return False
+
+        # Expired trend the bounded sweep has not reached yet, or one added before
+        # topics carried expires_at (those are not in the expiry index at all)
+        expires_at = topic.get('expires_at') or topic_expires_at(topic)
+        if expires_at and expires_at <= now:
+            return False
+
+        # Skip if already completed for same keyword+lang
+        completed_id = self.storage.find_completed(topic)
+        if completed_id:
+            print(f"⚠️  Skipping duplicate: {topic['keyword']} ({topic_lang(topic)}) - already completed as {completed_id}")
+            return False
+
+        # Validate topic data before reserving
+        errors = validate_topic_data(topic)
+        if errors:
+            # Skip invalid topics
+            print(f"⚠️  Skipping invalid topic {topic.get('id', 'unknown')}: {errors}")
+            return False
 
-            topic['status'] = 'in_progress'
-            topic['reserved_at'] = now
-            topic['retry_count'] = topic.get('retry_count', 0)
-            reserved.append(topic)
+        return True
 
-            # Stop when we have enough topics
-            if len(reserved) >= count:
-                break
+    def mark_completed(self, topic_id: str, lease_id: Optional[str] = None) -> bool:
+        """
+        Mark a topic as completed
 
-        self._save_queue(data)
-        return reserved
+        Args:
+            topic_id: Topic ID
+            lease_id: Lease from reserve_topics (None skips the ownership check)
+
+        Returns:
+            True if the topic was updated (or recorded into an open batch)
+        """
+        if self._batch is not None:
+            self._batch.complete(topic_id, lease_id)
+            return True
 
-    def mark_completed(self, topic_id: str):
-        """Mark a topic as completed"""
-        data = self._load_queue()
+        with self.storage.transaction():
+            return self._complete(topic_id, lease_id)
 
-        for topic in data['topics']:
-            if topic['id'] == topic_id:
-                topic['status'] = 'completed'
-                topic['completed_at'] = datetime.now(timezone.utc).isoformat()
-                break
+    def _complete(self, topic_id: str, lease_id: Optional[str] = None, timestamp: Optional[str] = None) -> bool:
+        topic = self.storage.get(topic_id)
+        if topic is None or self._lease_lost(topic, lease_id):
+            return False
 
-        self._save_queue(data)
+        topic['status'] = 'completed'
+        topic['completed_at'] = timestamp or datetime.now(timezone.utc).isoformat()
+        self._release(topic)
+        self.storage.put(topic, event='completed')
+        return True
 
-    def mark_failed(self, topic_id: str, error_message: str = ""):
+    def mark_failed(self, topic_id: str, error_message: str = "", lease_id: Optional[str] = None) -> bool:
         """
-        Mark a topic as failed and move back to pending for retry
+        Record a failed attempt: back to pending after a backoff, or to the
+        failed (dead-letter) state once max_retries is exceeded
 
         Args:
             topic_id: Topic ID
             error_message: Error description
+            lease_id: Lease from reserve_topics (None skips the ownership check)
+
+        Returns:
+            True if the topic was updated (or recorded into an open batch)
+        """
+        if self._batch is not None:
+            self._batch.fail(topic_id, error_message, lease_id)
+            return True
+
+        with self.storage.transaction():
+            return self._fail(topic_id, error_message, lease_id)
+
+    def _fail(self, topic_id: str, error_message: str = "", lease_id: Optional[str] = None,
+              timestamp: Optional[str] = None) -> bool:
+        topic = self.storage.get(topic_id)
+        if topic is None or self._lease_lost(topic, lease_id):
+            return False
+
+        now = datetime.fromisoformat(timestamp) if timestamp else datetime.now(timezone.utc)
+        self._record_failure(topic, error_message, now)
+        self.storage.put(topic, event='failed' if topic['status'] == 'pending' else 'dead_lettered')
+        return True
+
+    def requeue_dead_letter(self, topic_id: str) -> bool:
+        """
+        Give a dead-lettered topic a fresh set of retries
+
+        Returns:
+            True if the topic was in the failed state and is pending again
+        """
+        with self.storage.transaction():
+            topic = self.storage.get(topic_id)
+            if topic is None or topic.get('status') != 'failed':
+                return False
+            topic['status'] = 'pending'
+            topic['retry_count'] = 0
+            topic.pop('next_attempt_at', None)
+            self.storage.put(topic, event='requeued')
+            return True
+
+    def _requeue(self, topic_id: str, timestamp: Optional[str] = None) -> bool:
+        """Return a reserved/completed topic to pending (e.g. it failed the quality gate)"""
+        topic = self.storage.get(topic_id)
+        if topic is None or topic.get('status') not in ('in_progress', 'completed'):
+            return False
+
+        topic['status'] = 'pending'
+        topic['reserved_at'] = None
+        topic.pop('completed_at', None)
+        self._release(topic)
+        self.storage.put(topic, event='requeued')
+        return True
+
+    def update_topic(self, topic_id: str, fields: Dict) -> bool:
         """
-        data = self._load_queue()
+        Update fields on a topic in place
 
-        for topic in data['topics']:
-            if topic['id'] == topic_id:
-                topic['status'] = 'pending'  # Rollback to pending
-                topic['retry_count'] = topic.get('retry_count', 0) + 1
-                topic['last_error'] = error_message
-                topic['last_failed_at'] = datetime.now(timezone.utc).isoformat()
+        Args:
+            topic_id: Topic ID
+            fields: Fields to set (a value of None removes the field)
+
+        Returns:
+            True if the topic was found
+        """
+        with self.storage.transaction():
+            topic = self.storage.get(topic_id)
+            if topic is None:
+                return False
+
+            for key, value in fields.items():
+                if value is None:
+                    topic.pop(key, None)
+                else:
+                    topic[key] = value
+            self.storage.put(topic)
+            return True
+
+    def get_topic(self, topic_id: str) -> Optional[Dict]:
+        """Get a topic by ID (None if not found)"""
+        return self.storage.get(topic_id)
+
+    def get_topics(self, status: Optional[str] = None) -> List[Dict]:
+        """
+        Get topics, optionally filtered by status
 
-                # Remove reservation timestamp
-                topic.pop('reserved_at', None)
-                break
+        Args:
+            status: Only return topics in this state
 
-        self._save_queue(data)
+        Returns:
+            List of topics
+        """
+        return self.storage.select(status)
 
     def cleanup_stuck_topics(self, hours: int = 24):
         """
@@ -161,22 +816,17 @@ class TopicQueue:
         Args:
             hours: Number of hours before considering a topic stuck
         """
-        data = self._load_queue()
         now = datetime.now(timezone.utc)
         threshold = now - timedelta(hours=hours)
 
-        for topic in data['topics']:
-            if topic['status'] == 'in_progress':
+        with self.storage.transaction():
+            for topic in self.storage.select('in_progress'):
                 reserved_at_str = topic.get('reserved_at', '')
                 if reserved_at_str:
                     reserved_at = datetime.fromisoformat(reserved_at_str)
                     if reserved_at < threshold:
-                        topic['status'] = 'pending'
-                        topic['retry_count'] = topic.get('retry_count', 0) + 1
-                        topic['last_error'] = f"Stuck in progress for {hours}+ hours"
-                        topic.pop('reserved_at', None)
-
-        self._save_queue(data)
+                        self._record_failure(topic, f"Stuck in progress for {hours}+ hours", now)
+                        self.storage.put(topic, event='reclaimed')
 
     def add_topic(self, keyword: str, category: str, lang: str,
                   priority: int = 5, metadata: Optional[Dict] = None):
@@ -210,47 +860,75 @@ class TopicQueue:
         if error:
             raise ValueError(error)
 
-        data = self._load_queue()
+        with self.storage.transaction():
+            # Generate ID (numbers of deleted and archived topics are not reused)
+            topic_id = f"{self.storage.next_number():03d}-{lang}-{category}-{keyword[:20].replace(' ', '-').lower()}"
+
+            topic = {
+                "id": topic_id,
+                "keyword": keyword,
+                "category": category,
+                "lang": lang,
+                "priority": priority,
+                "status": "pending",
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "retry_count": 0
+            }
+
+            if metadata:
+                topic.update(metadata)
+
+            expires_at = topic_expires_at(topic)
+            if expires_at:
+                topic['expires_at'] = expires_at
+
+            # Final validation of complete topic
+            errors = validate_topic_data(topic)
+            if errors:
+                raise ValueError(f"Topic validation failed: {', '.join(errors)}")
 
-        # Generate ID
-        topic_id = f"{len(data['topics']) + 1:03d}-{lang}-{category}-{keyword[:20].replace(' ', '-').lower()}"
+            self.storage.put(topic)
+        return topic_id
 
-        topic = {
-            "id": topic_id,
-            "keyword": keyword,
-            "category": category,
-            "lang": lang,
-            "priority": priority,
-            "status": "pending",
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "retry_count": 0
-        }
+    def compact(self) -> int:
+        """
+        Fold the transition journal into the queue file (JSON backend)
 
-        if metadata:
-            topic.update(metadata)
+        Returns:
+            Number of journal events folded
+        """
+        return self.storage.compact()
 
-        # Final validation of complete topic
-        errors = validate_topic_data(topic)
-        if errors:
-            raise ValueError(f"Topic validation failed: {', '.join(errors)}")
+    def get_history(self, topic_id: Optional[str] = None) -> List[Dict]:
+        """
+        Transitions recorded for topics, oldest first
 
-        data['topics'].append(topic)
-        self._save_queue(data)
-        return topic_id
+        Compaction keeps folded events in the archive's history files
+        (JSON backend), so retries stay auditable after the journal is reset.
+
+        Args:
+            topic_id: Only return events for this topic
+
+        Returns:
+            Events ({"event", "at", "topic"}); empty for backends without a journal
+        """
+        return self.storage.events(topic_id)
 
     def get_stats(self) -> Dict:
-        """Get queue statistics"""
-        data = self._load_queue()
+        """Get queue statistics (snapshot plus journal tail)"""
+        topics = self.storage.select()
         stats = {
-            "total": len(data['topics']),
+            "total": len(topics),
             "pending": 0,
             "in_progress": 0,
             "completed": 0,
+            "failed": 0,
+            "expired": 0,
             "by_category": {"tech": 0, "business": 0, "society": 0, "entertainment": 0, "sports": 0},
             "by_language": {"en": 0, "ko": 0, "ja": 0}
         }
 
-        for topic in data['topics']:
+        for topic in topics:
             status = topic.get('status', 'pending')
             stats[status] = stats.get(status, 0) + 1
 
@@ -260,6 +938,7 @@ class TopicQueue:
             lang = topic.get('lang', 'en')
             stats['by_language'][lang] = stats['by_language'].get(lang, 0) + 1
 
+        stats['archived'] = self.storage.archived_count()
         return stats
 
 
@@ -270,24 +949,43 @@ def get_queue() -> TopicQueue:
     """Get or create global queue instance"""
     global _queue
     if _queue is None:
-        _queue = TopicQueue()
+        _queue = TopicQueue(
+            os.environ.get("TOPIC_QUEUE_PATH", DEFAULT_QUEUE_FILE),
+            float(os.environ.get("TOPIC_LEASE_MINUTES", DEFAULT_LEASE_MINUTES)),
+            int(os.environ.get("TOPIC_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+        )
     return _queue
 
 
 # Convenience functions
-def reserve_topics(count: int = 3, priority_min: int = 1) -> List[Dict]:
+def reserve_topics(count: int = 3, priority_min: int = 1, policy: str = 'priority') -> List[Dict]:
     """Reserve topics for processing"""
-    return get_queue().reserve_topics(count, priority_min)
+    return get_queue().reserve_topics(count, priority_min, policy)
+
 
+def resume_batch_topics() -> List[Dict]:
+    """Take over the topics of an interrupted --batch run"""
+    return get_queue().resume_batch_topics()
 
-def mark_completed(topic_id: str):
+
+def mark_completed(topic_id: str, lease_id: Optional[str] = None) -> bool:
     """Mark topic as completed"""
-    get_queue().mark_completed(topic_id)
+    return get_queue().mark_completed(topic_id, lease_id)
 
 
-def mark_failed(topic_id: str, error_message: str = ""):
+def mark_failed(topic_id: str, error_message: str = "", lease_id: Optional[str] = None) -> bool:
     """Mark topic as failed"""
-    get_queue().mark_failed(topic_id, error_message)
+    return get_queue().mark_failed(topic_id, error_message, lease_id)
+
+
+def update_topic(topic_id: str, fields: Dict) -> bool:
+    """Update fields on a topic"""
+    return get_queue().update_topic(topic_id, fields)
+
+
+def get_topics(status: Optional[str] = None) -> List[Dict]:
+    """Get topics, optionally filtered by status"""
+    return get_queue().get_topics(status)
 
 
 def cleanup_stuck_topics(hours: int = 24):
@@ -311,7 +1009,7 @@ if __name__ == "__main__":
     import sys
 
     if len(sys.argv) < 2:
-        print("Usage: python topic_queue.py [stats|cleanup|reserve]")
+        print("Usage: python topic_queue.py [stats|cleanup|reserve [N] [priority|fair]|archive [DAYS]|compact|history [TOPIC_ID]|dead-letters|requeue TOPIC_ID|--all|import FILE|export FILE]")
         sys.exit(1)
 
     command = sys.argv[1]
@@ -327,9 +1025,64 @@ if __name__ == "__main__":
 
     elif command == "reserve":
         count = int(sys.argv[2]) if len(sys.argv) > 2 else 3
-        topics = reserve_topics(count)
+        policy = sys.argv[3] if len(sys.argv) > 3 else 'priority'
+        topics = reserve_topics(count, policy=policy)
         print(json.dumps(topics, indent=2, ensure_ascii=False))
 
+    elif command == "archive":
+        days = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_ARCHIVE_AFTER_DAYS
+        archived = get_queue().archive_topics(days)
+        print(f"Archived {archived} completed/expired topic(s); {get_queue().storage.count()} remain in the queue")
+
+    elif command == "compact":
+        folded = get_queue().compact()
+        print(f"Compacted {folded} journal events into {get_queue().queue_file}")
+
+    elif command == "history":
+        topic_id = sys.argv[2] if len(sys.argv) > 2 else None
+        for event in get_queue().get_history(topic_id):
+            topic = event['topic']
+            detail = f" ({topic['last_error']})" if event['event'] == 'failed' and topic.get('last_error') else ""
+            print(f"{event['at']}  {event['event']:<10} {topic['id']}{detail}")
+
+    elif command == "dead-letters":
+        dead = get_topics('failed')
+        for topic in dead:
+            print(f"{topic['id']}  retries={topic.get('retry_count', 0)}  "
+                  f"last_failed_at={topic.get('last_failed_at', '?')}  {topic.get('last_error', '')}")
+        print(f"{len(dead)} dead-lettered topic(s)")
+
+    elif command == "requeue" and len(sys.argv) > 2:
+        queue = get_queue()
+        if sys.argv[2] == "--all":
+            topic_ids = [t['id'] for t in queue.get_topics('failed')]
+        else:
+            topic_ids = sys.argv[2:]
+        requeued = [topic_id for topic_id in topic_ids if queue.requeue_dead_letter(topic_id)]
+        for topic_id in set(topic_ids) - set(requeued):
+            print(f"Not a dead letter: {topic_id}")
+        print(f"Requeued {len(requeued)} topic(s)")
+
+    elif command in ("import", "export") and len(sys.argv) > 2:
+        # Convert between the active backend (TOPIC_QUEUE_PATH) and a JSON file
+        queue = get_queue()
+        json_file = Path(sys.argv[2])
+        if json_file.resolve() == queue.queue_file.resolve():
+            print(f"{json_file} is the active queue file; nothing to {command}")
+            sys.exit(1)
+
+        if command == "import":
+            with open(json_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            queue._save_queue(data)
+            print(f"Imported {len(data.get('topics', []))} topics from {json_file} into {queue.queue_file}")
+        else:
+            data = queue._load_queue()
+            json_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(json_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            print(f"Exported {len(data['topics'])} topics from {queue.queue_file} to {json_file}")
+
     else:
         print(f"Unknown command: {command}")
         sys.exit(1)
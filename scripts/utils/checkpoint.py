@@ -0,0 +1,127 @@
+"""
+Stage-level checkpoints for the content pipeline.
+
+Each topic gets a directory (keyed by topic ID) holding the artifacts of the
+stages it has completed: draft and edited text as Markdown, metadata and
+image info as JSON. A retried topic loads these instead of regenerating
+them, and the directory is removed once the post is saved.
+
+Usage:
+    store = CheckpointStore()
+    checkpoint = store.for_topic(topic['id'])
+    draft = checkpoint.load('draft')
+    if draft is None:
+        draft = generate_draft(topic)
+        checkpoint.save('draft', draft)
+    ...
+    checkpoint.clear()
+"""
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from .security import safe_print, mask_secrets
+
+# Checkpoint location (override with CHECKPOINT_DIR)
+DEFAULT_CHECKPOINT_DIR = "data/checkpoints"
+
+# Pipeline stages and the file each is stored in
+STAGE_FILES = {
+    'draft': 'draft.md',
+    'edited': 'edited.md',
+    'metadata': 'metadata.json',
+    'image': 'image.json'
+}
+
+
+class TopicCheckpoint:
+    """Checkpointed stage artifacts for one topic"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def _path(self, stage: str) -> Path:
+        if stage not in STAGE_FILES:
+            raise ValueError(f"Unknown checkpoint stage: {stage}")
+        return self.directory / STAGE_FILES[stage]
+
+    def load(self, stage: str) -> Optional[Any]:
+        """
+        Load a stage artifact.
+
+        Returns:
+            Text for .md stages, parsed JSON for .json stages, None if missing
+        """
+        path = self._path(stage)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if path.suffix == '.json':
+                    return json.load(f)
+                return f.read()
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def save(self, stage: str, value: Any):
+        """Write a stage artifact atomically (never leaves a partial file)"""
+        path = self._path(stage)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                if path.suffix == '.json':
+                    json.dump(value, f, indent=2, ensure_ascii=False)
+                else:
+                    f.write(value)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            # A missing checkpoint only costs a regeneration on retry
+            safe_print(f"  ⚠️  Could not write {stage} checkpoint: {mask_secrets(str(e))}")
+
+    def completed(self):
+        """Stages that have a checkpoint, in pipeline order"""
+        return [stage for stage in STAGE_FILES if self._path(stage).exists()]
+
+    def clear(self):
+        """Remove all checkpoints for this topic"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class CheckpointStore:
+    def __init__(self, root: Optional[str] = None):
+        """
+        Args:
+            root: Directory for all topic checkpoints (None uses CHECKPOINT_DIR or the default)
+        """
+        self.root = Path(root or os.environ.get("CHECKPOINT_DIR", DEFAULT_CHECKPOINT_DIR))
+
+    def for_topic(self, topic_id: str) -> TopicCheckpoint:
+        """Get the checkpoint for a topic ID"""
+        # Topic IDs embed keywords; keep word characters (incl. Korean/Japanese) and hyphens only
+        safe_id = re.sub(r'[^\w\-]', '_', topic_id).strip('._') or '_'
+        return TopicCheckpoint(self.root / safe_id)
+
+    def prune(self, max_age_days: float = 14) -> int:
+        """
+        Remove checkpoints not touched for max_age_days (topics never retried)
+
+        Returns:
+            Number of topic checkpoints removed
+        """
+        if not self.root.exists():
+            return 0
+
+        threshold = time.time() - max_age_days * 86400
+        removed = 0
+        for directory in self.root.iterdir():
+            if not directory.is_dir():
+                continue
+            mtimes = [p.stat().st_mtime for p in directory.iterdir()] or [directory.stat().st_mtime]
+            if max(mtimes) < threshold:
+                shutil.rmtree(directory, ignore_errors=True)
+                removed += 1
+        return removed
@@ -0,0 +1,228 @@
+"""
+Persistent index of published posts for the quality gate.
+
+Holds the frontmatter the gate compares against (slug, title, date, lang)
+and a MinHash signature of the title and body (utils/minhash.py) for every
+Markdown file under the content directory, keyed by path with the file's
+mtime and size. refresh() walks the tree once and re-reads only files that
+are new or changed since the index was saved, so duplicate checks are
+in-memory lookups instead of opening every post for every checked file.
+
+Usage:
+    index = CorpusIndex("content")
+    index.refresh()
+    for post in index.find('en', 'ai-coding-tools'):
+        print(post['path'], post['date'], post['title'])
+    for post, similarity in index.near_duplicates('ko', title, body, before=post_order(date, rel_path)):
+        print(post['path'], similarity)
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .minhash import (
+    LSHIndex, NEAR_DUPLICATE_THRESHOLD, decode_signature, encode_signature, estimate_similarity, text_signature
+)
+from .security import safe_print, mask_secrets
+
+# Index location (override with QUALITY_INDEX_PATH)
+DEFAULT_INDEX_PATH = "data/quality_index.json"
+
+# Bump when the entry format changes; older indexes are rebuilt
+INDEX_VERSION = 2
+
+
+def post_name(path: Path) -> str:
+    """Dated name of a post: the filename stem, or the directory of a page bundle's index.md"""
+    return path.parent.name if path.name == 'index.md' else path.stem
+
+
+def post_slug(path: Path) -> str:
+    """Keyword part of a post filename ("2026-01-22-ai-coding.md" or "2026-01-22-ai-coding/index.md" -> "ai-coding")"""
+    name = post_name(path)
+    parts = name.split('-')
+    return '-'.join(parts[3:]) if len(parts) >= 4 else name
+
+
+def post_order(date: str, rel_path: str) -> Tuple[str, str]:
+    """Publication order of a post: its frontmatter date (else the filename's), then its path"""
+    return (date or post_name(Path(rel_path))[:10], rel_path)
+
+
+def parse_post(content: str) -> Tuple[Dict[str, str], str]:
+    """Simple key: value frontmatter between the leading --- markers (quotes stripped), and the body"""
+    if not content.startswith('---'):
+        return {}, content
+    parts = content.split('---', 2)
+    if len(parts) < 3:
+        return {}, content
+
+    frontmatter = {}
+    for line in parts[1].strip().split('\n'):
+        if ':' in line:
+            key, value = line.split(':', 1)
+            frontmatter[key.strip()] = value.strip().strip('"').strip("'")
+    return frontmatter, parts[2].strip()
+
+
+def post_signature(title: str, body: str, lang: str) -> Optional[List[int]]:
+    """MinHash signature of a post, as stored in the index"""
+    return text_signature(f"{title}\n{body}", lang)
+
+
+class CorpusIndex:
+    """Frontmatter of every post under a content directory, kept in sync by mtime"""
+
+    def __init__(self, content_dir: str = "content", path: Optional[str] = None):
+        """
+        Args:
+            content_dir: Hugo content root (one subdirectory per language)
+            path: Index file (None uses QUALITY_INDEX_PATH or the default)
+        """
+        self.content_dir = Path(content_dir)
+        self.path = Path(path or os.environ.get("QUALITY_INDEX_PATH", DEFAULT_INDEX_PATH))
+        self.entries: Dict[str, Dict] = {}
+        self._by_slug: Dict[Tuple[str, str], List[Dict]] = {}
+        self._lsh: Dict[str, LSHIndex] = {}
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('version') != INDEX_VERSION or data.get('content_dir') != str(self.content_dir):
+            return {}
+        return data.get('entries', {})
+
+    def _save(self):
+        """Write the index atomically; a missing index only costs a full rebuild"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": INDEX_VERSION, "content_dir": str(self.content_dir), "entries": self.entries},
+                          f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except (OSError, TypeError, ValueError) as e:
+            safe_print(f"  ⚠️  Could not write corpus index: {mask_secrets(str(e))}")
+
+    def _walk(self):
+        """Yield (relative path, stat) for every .md file under content_dir"""
+        stack = [self.content_dir]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.name.startswith('.'):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(Path(entry.path))
+                        elif entry.name.endswith('.md'):
+                            yield Path(entry.path).relative_to(self.content_dir).as_posix(), entry.stat()
+            except OSError:
+                continue
+
+    def refresh(self) -> int:
+        """
+        Bring the index up to date with the content tree and save it if anything changed
+
+        Returns:
+            Number of posts (re-)read; unchanged posts are not opened
+        """
+        previous = self._load()
+        entries = {}
+        reread = 0
+        for rel_path, stat in self._walk():
+            entry = previous.get(rel_path)
+            if entry is None or entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+                try:
+                    with open(self.content_dir / rel_path, 'r', encoding='utf-8') as f:
+                        frontmatter, body = parse_post(f.read())
+                except (OSError, UnicodeDecodeError):
+                    frontmatter, body = {}, ""
+                lang = rel_path.split('/', 1)[0]
+                entry = {
+                    "slug": post_slug(Path(rel_path)),
+                    "title": frontmatter.get('title', ''),
+                    "date": frontmatter.get('date', ''),
+                    "lang": lang,
+                    "minhash": encode_signature(post_signature(frontmatter.get('title', ''), body, lang)),
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size
+                }
+                reread += 1
+            entries[rel_path] = entry
+
+        self._use(entries)
+        if reread or entries.keys() != previous.keys():
+            self._save()
+        return reread
+
+    def load(self) -> bool:
+        """
+        Use the saved index as is, without walking the content tree
+
+        For read-only users (quality gate workers) after refresh() already
+        ran in another process.
+
+        Returns:
+            Whether a saved index was found
+        """
+        entries = self._load()
+        self._use(entries)
+        return bool(entries)
+
+    def _use(self, entries: Dict[str, Dict]):
+        self.entries = entries
+        self._by_slug = {}
+        self._lsh = {}
+        for rel_path, entry in entries.items():
+            self._by_slug.setdefault((entry['lang'], entry['slug']), []).append(dict(entry, path=rel_path))
+
+    def find(self, lang: str, slug: str) -> List[Dict]:
+        """Posts in a language with this slug (each with its path relative to content_dir)"""
+        return self._by_slug.get((lang, slug), [])
+
+    def _lsh_for(self, lang: str) -> LSHIndex:
+        """LSH buckets of one language's posts, built on first use"""
+        lsh = self._lsh.get(lang)
+        if lsh is None:
+            lsh = self._lsh[lang] = LSHIndex()
+            for rel_path, entry in self.entries.items():
+                if entry['lang'] == lang and entry['minhash']:
+                    lsh.add(rel_path, decode_signature(entry['minhash']))
+        return lsh
+
+    def near_duplicates(self, lang: str, title: str, body: str,
+                        threshold: float = NEAR_DUPLICATE_THRESHOLD,
+                        before: Optional[Tuple[str, str]] = None) -> List[Tuple[Dict, float]]:
+        """
+        Posts in a language whose title and body are near-duplicates of the given ones
+
+        Only posts sharing an LSH band with the text are compared, so the
+        cost does not grow with the corpus.
+
+        Args:
+            before: post_order() key of the checked post; only earlier posts are reported,
+                    so of two near-duplicates the older one is kept
+
+        Returns:
+            (post with its path, estimated similarity) pairs at or above threshold, most similar first
+        """
+        signature = post_signature(title, body, lang)
+        if signature is None:
+            return []
+        matches = []
+        for rel_path in self._lsh_for(lang).query(signature):
+            if before is not None and post_order(self.entries[rel_path]['date'], rel_path) >= before:
+                continue
+            similarity = estimate_similarity(signature, decode_signature(self.entries[rel_path]['minhash']))
+            if similarity >= threshold:
+                matches.append((dict(self.entries[rel_path], path=rel_path), similarity))
+        return sorted(matches, key=lambda match: -match[1])
+
+    def __len__(self) -> int:
+        return len(self.entries)
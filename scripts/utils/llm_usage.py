@@ -0,0 +1,339 @@
+"""
+Token and latency accounting for Claude API calls.
+
+MeteredClient wraps client.messages.create so every call records its stage,
+token usage (input, output, cache read, cache create), wall time and SDK
+retries. Records are appended to a JSONL run ledger as they happen and can
+be summarized per stage at the end of a run. With a ResponseCache attached,
+identical requests are served from disk and recorded as cache hits. With a
+RateLimiter attached, calls are paced and retried by the limiter instead of
+the SDK.
+
+Usage:
+    ledger = UsageLedger("generate_posts")
+    llm = MeteredClient(client, ledger)
+    response = llm.create("draft", model=..., max_tokens=..., messages=[...])
+    ledger.print_summary()
+"""
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .security import safe_print, mask_secrets
+from .rate_limit import estimate_input_tokens
+
+# Ledger location (override with LLM_USAGE_LEDGER)
+DEFAULT_LEDGER_PATH = "data/llm_usage.jsonl"
+
+# USD per million tokens: (input, output, cache write, cache read)
+MODEL_PRICES = {
+    "claude-sonnet-4-20250514": (3.00, 15.00, 3.75, 0.30),
+}
+
+# Message Batches are billed at half the interactive price
+BATCH_DISCOUNT = 0.5
+
+USAGE_FIELDS = [
+    'input_tokens',
+    'output_tokens',
+    'cache_read_input_tokens',
+    'cache_creation_input_tokens'
+]
+
+
+def estimate_cost(model: str, usage: Dict, batch: bool = False) -> Optional[float]:
+    """
+    Estimate the USD cost of one call from its token counts.
+
+    Returns:
+        Cost in USD, or None if the model has no known price
+    """
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return None
+
+    input_price, output_price, write_price, read_price = prices
+    cost = (
+        usage.get('input_tokens', 0) * input_price
+        + usage.get('output_tokens', 0) * output_price
+        + usage.get('cache_creation_input_tokens', 0) * write_price
+        + usage.get('cache_read_input_tokens', 0) * read_price
+    ) / 1_000_000
+    return cost * BATCH_DISCOUNT if batch else cost
+
+
+class UsageLedger:
+    """Thread-safe collector of per-call usage records for one run"""
+
+    def __init__(self, script: str, path: Optional[str] = None, run_id: Optional[str] = None):
+        """
+        Args:
+            script: Name of the calling script (stored on every record)
+            path: JSONL ledger file (None uses LLM_USAGE_LEDGER or the default)
+            run_id: Identifier shared by all records of this run
+        """
+        self.script = script
+        self.path = Path(path or os.environ.get("LLM_USAGE_LEDGER", DEFAULT_LEDGER_PATH))
+        self.run_id = run_id or f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+        self._records: List[Dict] = []
+        self._lock = threading.Lock()
+        self._write_failed = False
+
+    def record(self, stage: str, model: Optional[str], usage=None, elapsed: float = 0.0,
+               retries: int = 0, error: Optional[str] = None, batch: bool = False,
+               cached: bool = False) -> Dict:
+        """
+        Record one Claude call and append it to the ledger file.
+
+        Args:
+            stage: Pipeline stage (e.g. 'draft', 'review')
+            model: Model name
+            usage: Response usage object (or dict)
+            elapsed: Wall time in seconds
+            retries: Retries taken before the final attempt
+            error: Error type if the call failed
+            batch: Call was served through the Message Batches API
+            cached: Call was served from the response cache (no API spend)
+        """
+        counts = {}
+        for field in USAGE_FIELDS:
+            value = usage.get(field) if isinstance(usage, dict) else getattr(usage, field, None)
+            counts[field] = value or 0
+
+        entry = {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "run_id": self.run_id,
+            "script": self.script,
+            "stage": stage,
+            "model": model,
+            **counts,
+            "elapsed_s": round(elapsed, 3),
+            "retries": retries,
+            "batch": batch,
+            "cached": cached,
+            "cost_usd": estimate_cost(model, counts, batch),
+            "error": error
+        }
+
+        with self._lock:
+            self._records.append(entry)
+            self._append(entry)
+
+        return entry
+
+    def _append(self, entry: Dict):
+        """Append a record to the ledger file (warn once if it can't be written)"""
+        if self._write_failed:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            self._write_failed = True
+            safe_print(f"  ⚠️  Could not write usage ledger {self.path}: {mask_secrets(str(e))}")
+
+    @property
+    def records(self) -> List[Dict]:
+        """Records collected in this run"""
+        with self._lock:
+            return list(self._records)
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Aggregate records per stage (in first-seen order) plus a 'total' row.
+
+        Returns:
+            Dict mapping stage to totals
+        """
+        rows: Dict[str, Dict] = {}
+        total = self._empty_row()
+
+        for entry in self.records:
+            row = rows.setdefault(entry['stage'], self._empty_row())
+            for target in (row, total):
+                target['calls'] += 1
+                target['cached'] += 1 if entry.get('cached') else 0
+                target['errors'] += 1 if entry['error'] else 0
+                target['retries'] += entry['retries']
+                target['elapsed_s'] += entry['elapsed_s']
+                for field in USAGE_FIELDS:
+                    target[field] += entry[field]
+                if entry['cost_usd'] is not None:
+                    target['cost_usd'] += entry['cost_usd']
+
+        rows['total'] = total
+        return rows
+
+    @staticmethod
+    def _empty_row() -> Dict:
+        row = {"calls": 0, "cached": 0, "errors": 0, "retries": 0, "elapsed_s": 0.0, "cost_usd": 0.0}
+        row.update({field: 0 for field in USAGE_FIELDS})
+        return row
+
+    def print_summary(self):
+        """Print the per-stage usage table"""
+        if not self.records:
+            return
+
+        header = f"  {'Stage':<18}{'Calls':>6}{'Hits':>6}{'Input':>10}{'Output':>9}{'Cache R':>10}{'Cache W':>9}{'Time s':>9}{'Retry':>7}{'USD':>9}"
+
+        safe_print(f"\n{'='*60}")
+        safe_print(f"  💰 Claude Usage ({self.run_id})")
+        safe_print(f"{'='*60}\n")
+        safe_print(header)
+        safe_print(f"  {'-' * (len(header) - 2)}")
+
+        for stage, row in self.summary().items():
+            if stage == 'total':
+                safe_print(f"  {'-' * (len(header) - 2)}")
+            safe_print(
+                f"  {stage:<18}{row['calls']:>6}{row['cached']:>6}{row['input_tokens']:>10,}{row['output_tokens']:>9,}"
+                f"{row['cache_read_input_tokens']:>10,}{row['cache_creation_input_tokens']:>9,}"
+                f"{row['elapsed_s']:>9.1f}{row['retries']:>7}{row['cost_usd']:>9.4f}"
+            )
+
+        safe_print(f"\n  Ledger: {self.path}\n")
+
+
+def _retries_taken(raw_response) -> int:
+    """Read how many retries the SDK made from a raw response"""
+    retries = getattr(raw_response, 'retries_taken', None)
+    if retries is None:
+        request = getattr(raw_response, 'http_request', None)
+        headers = getattr(request, 'headers', None) or {}
+        retries = headers.get('x-stainless-retry-count', 0)
+    try:
+        return int(retries)
+    except (TypeError, ValueError):
+        return 0
+
+
+class MeteredClient:
+    """Wraps client.messages.create and records every call in a UsageLedger"""
+
+    def __init__(self, client, ledger: UsageLedger, cache=None, limiter=None):
+        """
+        Args:
+            client: Anthropic client
+            ledger: UsageLedger receiving one record per call
+            cache: Optional ResponseCache consulted before the API
+            limiter: Optional RateLimiter that paces and retries API calls
+        """
+        # The limiter owns retries, so the SDK must not retry underneath it
+        if limiter is not None and hasattr(client, 'with_options'):
+            client = client.with_options(max_retries=0)
+        self.client = client
+        self.ledger = ledger
+        self.cache = cache
+        self.limiter = limiter
+
+    def create(self, stage: str, **params):
+        """
+        Call client.messages.create(**params) and record it under `stage`.
+
+        Uses messages.with_raw_response when available so the SDK's own
+        retries can be counted.
+        """
+        start = time.monotonic()
+        cached = self._lookup(stage, params, start)
+        if cached is not None:
+            return cached
+
+        try:
+            response, retries = self._send(params)
+        except Exception as e:
+            self._record_error(stage, params, start, e)
+            raise
+
+        return self._finish(stage, params, start, response, retries)
+
+    def _lookup(self, stage: str, params: Dict, start: float):
+        """Return a cached response (recorded as a hit) or None"""
+        if self.cache is None:
+            return None
+        try:
+            response = self.cache.get(params)
+        except Exception as e:
+            self._record_error(stage, params, start, e)
+            raise
+        if response is not None:
+            self.ledger.record(stage, params.get('model'), elapsed=time.monotonic() - start, cached=True)
+        return response
+
+    def _record_error(self, stage: str, params: Dict, start: float, error: Exception):
+        self.ledger.record(stage, params.get('model'), elapsed=time.monotonic() - start,
+                           error=type(error).__name__)
+
+    def _finish(self, stage: str, params: Dict, start: float, response, retries: int):
+        """Record a completed API call and store it in the cache"""
+        usage = getattr(response, 'usage', None)
+        self.ledger.record(stage, params.get('model'), usage,
+                           elapsed=time.monotonic() - start, retries=retries)
+        if self.limiter is not None and usage is not None:
+            actual = (getattr(usage, 'input_tokens', 0) or 0) + (getattr(usage, 'cache_creation_input_tokens', 0) or 0)
+            self.limiter.settle(estimate_input_tokens(params), actual)
+        if self.cache is not None:
+            self.cache.put(params, response)
+        return response
+
+    def _send(self, params: Dict):
+        if self.limiter is None:
+            return self._send_once(params)
+        (response, sdk_retries), retries = self.limiter.call_with_retries(
+            self._send_once, params, tokens=estimate_input_tokens(params)
+        )
+        return response, sdk_retries + retries
+
+    def _send_once(self, params: Dict):
+        messages = self.client.messages
+        raw_api = getattr(messages, 'with_raw_response', None)
+        if raw_api is None:
+            return messages.create(**params), 0
+
+        raw_response = raw_api.create(**params)
+        return raw_response.parse(), _retries_taken(raw_response)
+
+
+class AsyncMeteredClient(MeteredClient):
+    """MeteredClient for AsyncAnthropic"""
+
+    async def create(self, stage: str, **params):
+        start = time.monotonic()
+        cached = self._lookup(stage, params, start)
+        if cached is not None:
+            return cached
+
+        try:
+            response, retries = await self._send(params)
+        except Exception as e:
+            self._record_error(stage, params, start, e)
+            raise
+
+        return self._finish(stage, params, start, response, retries)
+
+    async def _send(self, params: Dict):
+        if self.limiter is None:
+            return await self._send_once(params)
+        (response, sdk_retries), retries = await self.limiter.call_with_retries_async(
+            self._send_once, params, tokens=estimate_input_tokens(params)
+        )
+        return response, sdk_retries + retries
+
+    async def _send_once(self, params: Dict):
+        messages = self.client.messages
+        raw_api = getattr(messages, 'with_raw_response', None)
+        if raw_api is None:
+            return await messages.create(**params), 0
+
+        raw_response = await raw_api.create(**params)
+        response = raw_response.parse()
+        if inspect.isawaitable(response):
+            response = await response
+        return response, _retries_taken(raw_response)
@@ -0,0 +1,136 @@
+"""
+MinHash signatures and LSH buckets for near-duplicate posts.
+
+A post becomes a set of shingles (runs of SHINGLE_SIZE consecutive tokens).
+Tokens are script-aware: Latin/digit words for English, and single
+characters for Hangul, kana and kanji, since Korean eojeol and Japanese
+text do not split into comparable words on whitespace. The shingle set is
+summarized by a one-permutation MinHash: one 64-bit hash per shingle,
+spread over NUM_BINS bins keeping the minimum of each. The fraction of equal
+bins between two signatures estimates the Jaccard similarity of the posts.
+
+LSHIndex splits signatures into BANDS bands; posts sharing any whole band
+land in the same bucket, so a query only compares against the few posts it
+collides with instead of the whole corpus. With 32 bands of 2 bins, pairs
+at the Jaccard 0.5 threshold share at least one band with probability
+~0.9999, pairs at 0.3 with ~0.95 and pairs at 0.1 with ~0.27; candidates
+below the threshold are dropped by estimate_similarity.
+
+Usage:
+    signature = text_signature(title + "\\n" + body, 'ko')
+    lsh = LSHIndex()
+    lsh.add(path, signature)
+    for other in lsh.query(signature):
+        estimate_similarity(signature, signatures[other])
+"""
+import base64
+import hashlib
+import re
+import struct
+from typing import Dict, Hashable, Iterable, List, Optional, Set
+
+NUM_BINS = 64
+BANDS = 32
+ROWS_PER_BAND = NUM_BINS // BANDS
+
+# Tokens per shingle; Japanese characters (mostly kana) carry less than a Hangul syllable
+SHINGLE_SIZE = 3
+SHINGLE_SIZES = {'ja': 4}
+
+# Estimated Jaccard similarity above which two posts are near-duplicates
+NEAR_DUPLICATE_THRESHOLD = 0.5
+
+# Hangul syllables/jamo, kana, CJK ideographs
+_CJK = '\u1100-\u11ff\u3040-\u30ff\u3130-\u318f\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff'
+_TOKEN = re.compile(f'[{_CJK}]|[^\\W_{_CJK}]+')
+_URL = re.compile(r'\(?https?://\S+|\(/[^)\s]*\)')
+
+# Added per step when an empty bin borrows a neighbor's value, so borrowed bins stay distinct
+_DENSIFY_STEP = 0x9E3779B1
+_EMPTY = 1 << 32
+
+
+def tokens(text: str) -> List[str]:
+    """Lowercased words and CJK characters of a text, without URLs and image paths"""
+    return _TOKEN.findall(_URL.sub(' ', text.lower()))
+
+
+def shingles(text: str, lang: str = 'en') -> Set[str]:
+    """Set of SHINGLE_SIZE-token shingles (the whole text if it is shorter)"""
+    words = tokens(text)
+    size = SHINGLE_SIZES.get(lang, SHINGLE_SIZE)
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash(items: Iterable[str]) -> Optional[List[int]]:
+    """
+    One-permutation MinHash of a set of strings
+
+    Returns:
+        NUM_BINS 32-bit values, or None for an empty set
+    """
+    bins = [_EMPTY] * NUM_BINS
+    for item in items:
+        h = int.from_bytes(hashlib.blake2b(item.encode('utf-8'), digest_size=8).digest(), 'little')
+        index, value = h % NUM_BINS, (h // NUM_BINS) & 0xFFFFFFFF
+        if value < bins[index]:
+            bins[index] = value
+
+    if all(value == _EMPTY for value in bins):
+        return None
+
+    # Densify: an empty bin takes the next filled bin's value (circularly), offset by the distance
+    signature = list(bins)
+    for i in range(NUM_BINS):
+        distance = 0
+        while bins[(i + distance) % NUM_BINS] == _EMPTY:
+            distance += 1
+        signature[i] = (bins[(i + distance) % NUM_BINS] + distance * _DENSIFY_STEP) & 0xFFFFFFFF
+    return signature
+
+
+def text_signature(text: str, lang: str = 'en') -> Optional[List[int]]:
+    """MinHash signature of a text's shingles (None if it has no tokens)"""
+    return minhash(shingles(text, lang))
+
+
+def estimate_similarity(a: List[int], b: List[int]) -> float:
+    """Estimated Jaccard similarity of the sets behind two signatures"""
+    return sum(x == y for x, y in zip(a, b)) / NUM_BINS
+
+
+def encode_signature(signature: Optional[List[int]]) -> str:
+    """Compact text form for JSON ("" for no signature)"""
+    if signature is None:
+        return ""
+    return base64.b64encode(struct.pack(f'<{NUM_BINS}I', *signature)).decode('ascii')
+
+
+def decode_signature(encoded: str) -> Optional[List[int]]:
+    if not encoded:
+        return None
+    return list(struct.unpack(f'<{NUM_BINS}I', base64.b64decode(encoded)))
+
+
+class LSHIndex:
+    """Banded LSH buckets: keys whose signatures share a whole band"""
+
+    def __init__(self):
+        self._buckets: Dict[int, List[Hashable]] = {}
+
+    @staticmethod
+    def _band_keys(signature: List[int]) -> List[int]:
+        return [hash((band, *signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND])) for band in range(BANDS)]
+
+    def add(self, key: Hashable, signature: List[int]):
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, []).append(key)
+
+    def query(self, signature: List[int]) -> Set[Hashable]:
+        """Keys colliding with the signature in at least one band (candidates, not yet verified)"""
+        found = set()
+        for band_key in self._band_keys(signature):
+            found.update(self._buckets.get(band_key, ()))
+        return found
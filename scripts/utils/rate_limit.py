@@ -0,0 +1,324 @@
+"""
+Rate-limit aware pacing and retries for external APIs.
+
+Each provider (Anthropic, Brave Search, Unsplash) gets one shared
+RateLimiter per process. Requests are paced by token buckets (requests per
+window, and for Anthropic estimated input tokens per minute), so concurrent
+workers use the whole quota without tripping it. Retryable failures (429,
+529, 5xx, timeouts, connection errors) are retried with jittered exponential
+backoff; a server-sent retry-after pauses every caller of that provider.
+
+Limits default to the lowest published tier and can be raised per
+deployment through environment variables (see PROVIDER_LIMITS).
+
+Usage:
+    limiter = get_limiter('brave')
+    response = limiter.call(fetch, query)             # paced + retried
+    response = await limiter.call_async(afetch, query)
+"""
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .security import safe_print, mask_secrets
+
+# Per-provider limits: bucket -> (env override, default amount, window seconds)
+PROVIDER_LIMITS = {
+    'anthropic': {
+        'requests': ('ANTHROPIC_REQUESTS_PER_MINUTE', 50, 60),
+        'tokens': ('ANTHROPIC_INPUT_TOKENS_PER_MINUTE', 30000, 60)
+    },
+    'brave': {
+        'requests': ('BRAVE_REQUESTS_PER_SECOND', 1, 1)
+    },
+    'unsplash': {
+        'requests': ('UNSPLASH_REQUESTS_PER_HOUR', 50, 3600)
+    }
+}
+
+# 529 is Anthropic's "overloaded"
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+# Transport errors across requests, httpx and the Anthropic SDK (matched by name
+# so this module does not import any of them)
+RETRYABLE_ERROR_NAMES = {
+    'Timeout', 'ConnectTimeout', 'ReadTimeout', 'TimeoutException',
+    'ConnectionError', 'TransportError', 'APIConnectionError', 'APITimeoutError'
+}
+
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with reservations.
+
+    reserve() takes tokens immediately (the balance may go negative) and
+    returns how long the caller must wait before using them, so callers
+    queue up in order without polling.
+    """
+
+    def __init__(self, capacity: float, period: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            capacity: Tokens available per period (also the burst size)
+            period: Refill window in seconds
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float = 1) -> float:
+        """Take `amount` tokens and return the seconds to wait before using them"""
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+    def refund(self, amount: float):
+        """Return tokens (or take more with a negative amount) after the real cost is known"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+
+def status_code_of(error: Exception) -> Optional[int]:
+    """HTTP status of an SDK/requests/httpx error, if it has one"""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def retry_after_of(error: Exception) -> Optional[float]:
+    """Seconds requested by a retry-after(-ms) header on the error's response"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+
+    try:
+        retry_after_ms = headers.get('retry-after-ms')
+        if retry_after_ms is not None:
+            return max(0.0, float(retry_after_ms) / 1000)
+
+        retry_after = headers.get('retry-after')
+        if retry_after is None:
+            return None
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            # HTTP-date form
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether a failed call is worth retrying"""
+    status = status_code_of(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    return any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+
+def estimate_input_tokens(params: Dict) -> int:
+    """
+    Rough input token count of a messages.create() request.
+
+    About 4 characters per token for Latin text and one token per character
+    for Korean/Japanese; only used for pacing, and corrected by settle().
+    """
+    text = json.dumps([params.get('system'), params.get('messages')], ensure_ascii=False)
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+class RateLimiter:
+    """Token-bucket pacing plus retry scheduling for one API provider"""
+
+    def __init__(self, name: str, requests: Optional[Tuple[float, float]] = None,
+                 tokens: Optional[Tuple[float, float]] = None,
+                 max_retries: int = DEFAULT_MAX_RETRIES, base_delay: float = DEFAULT_BASE_DELAY,
+                 max_delay: float = DEFAULT_MAX_DELAY, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep, rng: Optional[random.Random] = None):
+        """
+        Args:
+            name: Provider name used in log lines
+            requests: (requests, window seconds), or None for no request pacing
+            tokens: (tokens, window seconds), or None for no token pacing
+            max_retries: Retries after the first attempt before giving up
+            base_delay: First backoff delay in seconds (doubled per retry)
+            max_delay: Upper bound for one backoff delay
+            clock, sleep, rng: Injectable for tests
+        """
+        self.name = name
+        self.request_bucket = TokenBucket(*requests, clock=clock) if requests else None
+        self.token_bucket = TokenBucket(*tokens, clock=clock) if tokens else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+
+    def _reserve(self, tokens: float = 0) -> float:
+        """Reserve one request (and `tokens`) and return the wait in seconds"""
+        wait = 0.0
+        if self.request_bucket is not None:
+            wait = max(wait, self.request_bucket.reserve(1))
+        if self.token_bucket is not None and tokens:
+            wait = max(wait, self.token_bucket.reserve(tokens))
+        with self._lock:
+            wait = max(wait, self._paused_until - self.clock())
+        return wait
+
+    def acquire(self, tokens: float = 0):
+        """Block until one request (and `tokens`) may be sent"""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            self.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 0):
+        """Coroutine version of acquire()"""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def settle(self, estimated: float, actual: float):
+        """Correct the token bucket once a response reports its real token usage"""
+        if self.token_bucket is not None:
+            self.token_bucket.refund(estimated - actual)
+
+    def pause(self, seconds: float):
+        """Hold every caller of this provider for `seconds` (server asked us to back off)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self.clock() + seconds)
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Delay before retry number `attempt` (1-based).
+
+        Honors retry-after when the server sent one; otherwise full-jitter
+        exponential backoff so concurrent workers don't retry in lockstep.
+        """
+        if retry_after is not None:
+            return min(self.max_delay, retry_after) + self.rng.uniform(0, self.base_delay)
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _schedule_retry(self, error: Exception, attempt: int) -> Optional[float]:
+        """Return the retry delay for a failure, or None if it should be raised"""
+        if attempt > self.max_retries or not is_retryable(error):
+            return None
+
+        retry_after = retry_after_of(error)
+        delay = self.backoff_delay(attempt, retry_after)
+        if retry_after is not None:
+            self.pause(delay)
+
+        status = status_code_of(error)
+        reason = f"HTTP {status}" if status is not None else type(error).__name__
+        safe_print(f"  ⏳ {self.name}: {reason}, retrying in {delay:.1f}s "
+                   f"(retry {attempt}/{self.max_retries})")
+        return delay
+
+    def call_with_retries(self, fn: Callable, *args, tokens: float = 0, **kwargs) -> Tuple[Any, int]:
+        """
+        Pace and retry fn(*args, **kwargs).
+
+        `tokens` are reserved before every attempt and refunded when the
+        attempt fails with a retryable error, so retries don't pay twice.
+
+        Returns:
+            (result, retries taken)
+
+        Raises:
+            The last error once it is not retryable or retries are exhausted
+        """
+        attempt = 0
+        while True:
+            self.acquire(tokens)
+            try:
+                return fn(*args, **kwargs), attempt
+            except Exception as e:
+                attempt += 1
+                if is_retryable(e):
+                    self.settle(tokens, 0)  # Rejected or dropped: the attempt used no tokens
+                delay = self._schedule_retry(e, attempt)
+                if delay is None:
+                    raise
+                self.sleep(delay)
+
+    async def call_with_retries_async(self, fn: Callable, *args, tokens: float = 0, **kwargs) -> Tuple[Any, int]:
+        """Coroutine version of call_with_retries() for an async fn"""
+        attempt = 0
+        while True:
+            await self.acquire_async(tokens)
+            try:
+                return await fn(*args, **kwargs), attempt
+            except Exception as e:
+                attempt += 1
+                if is_retryable(e):
+                    self.settle(tokens, 0)  # Rejected or dropped: the attempt used no tokens
+                delay = self._schedule_retry(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """Pace and retry fn(*args, **kwargs) and return its result"""
+        return self.call_with_retries(fn, *args, **kwargs)[0]
+
+    async def call_async(self, fn: Callable, *args, **kwargs) -> Any:
+        """Pace and retry an async fn(*args, **kwargs) and return its result"""
+        return (await self.call_with_retries_async(fn, *args, **kwargs))[0]
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _limit_from_env(env_name: str, default: float, period: float) -> Optional[Tuple[float, float]]:
+    value = os.environ.get(env_name)
+    if value is None:
+        return default, period
+    try:
+        amount = float(value)
+    except ValueError:
+        safe_print(f"  ⚠️  Ignoring invalid {env_name}={mask_secrets(value)}")
+        return default, period
+    # 0 disables pacing for that bucket
+    return (amount, period) if amount > 0 else None
+
+
+def get_limiter(provider: str) -> RateLimiter:
+    """
+    Get the process-wide limiter for a provider.
+
+    All clients of one provider share it, so threads and async tasks draw
+    from the same quota.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            buckets = {bucket: _limit_from_env(*spec) for bucket, spec in PROVIDER_LIMITS.get(provider, {}).items()}
+            limiter = RateLimiter(provider, **buckets)
+            _limiters[provider] = limiter
+        return limiter
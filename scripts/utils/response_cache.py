@@ -0,0 +1,194 @@
+"""
+Content-addressed on-disk cache for Claude responses.
+
+Responses are stored as JSON files named by the sha256 of the request
+parameters (model, prompt, max_tokens, ...), so an identical request is
+served from disk instead of the API. Entries expire after a TTL, and the
+oldest entries are evicted once the cache grows past its size limit. The
+cache size is tracked across puts, so the directory is only scanned when
+that estimate passes the limit or every EVICT_INTERVAL puts (to drop
+expired entries and account for other processes' writes).
+
+In replay mode the cache never falls through to the API: a miss raises
+CacheMissError, which allows fully offline reruns of the pipeline.
+
+Usage:
+    cache = ResponseCache()
+    response = cache.get(params)       # None on miss
+    if response is None:
+        response = client.messages.create(**params)
+        cache.put(params, response)
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+from .security import safe_print, mask_secrets
+
+# Cache location (override with LLM_CACHE_DIR)
+DEFAULT_CACHE_DIR = "data/llm_cache"
+DEFAULT_TTL_HOURS = 7 * 24
+DEFAULT_MAX_SIZE_MB = 200
+# Puts between full directory scans while the tracked size stays under the limit
+EVICT_INTERVAL = 100
+
+
+class CacheMissError(LookupError):
+    """Raised in replay mode when a request has no cached response"""
+
+
+def cache_key(params: Dict) -> str:
+    """Hash request parameters into a stable cache key"""
+    payload = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _to_plain(obj: Any) -> Any:
+    """Convert an SDK response (pydantic model or plain object) to JSON-safe data"""
+    if hasattr(obj, 'model_dump'):
+        return obj.model_dump(mode='json')
+    if isinstance(obj, dict):
+        return {k: _to_plain(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_to_plain(v) for v in obj]
+    if hasattr(obj, '__dict__'):
+        return {k: _to_plain(v) for k, v in vars(obj).items() if not k.startswith('_')}
+    return obj
+
+
+def _to_namespace(data: Any) -> Any:
+    """Rebuild attribute access (response.content[0].text) from cached JSON"""
+    if isinstance(data, dict):
+        return SimpleNamespace(**{k: _to_namespace(v) for k, v in data.items()})
+    if isinstance(data, list):
+        return [_to_namespace(v) for v in data]
+    return data
+
+
+class ResponseCache:
+    def __init__(self, cache_dir: Optional[str] = None, ttl_hours: float = DEFAULT_TTL_HOURS,
+                 max_size_mb: float = DEFAULT_MAX_SIZE_MB, replay: bool = False):
+        """
+        Args:
+            cache_dir: Directory for cached responses (None uses LLM_CACHE_DIR or the default)
+            ttl_hours: Entries older than this are ignored and removed
+            max_size_mb: Oldest entries are evicted once the cache exceeds this size
+            replay: Serve only from cache; a miss raises CacheMissError
+        """
+        self.cache_dir = Path(cache_dir or os.environ.get("LLM_CACHE_DIR", DEFAULT_CACHE_DIR))
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.replay = replay
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._size: Optional[int] = None  # Bytes on disk as of the last scan plus later puts
+        self._puts_since_scan = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, params: Dict) -> Optional[Any]:
+        """
+        Look up the cached response for a request.
+
+        Returns:
+            Response object, or None on a miss (outside replay mode)
+
+        Raises:
+            CacheMissError: On a miss in replay mode
+        """
+        key = cache_key(params)
+        entry = self._read(self._path(key))
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if entry is None:
+            if self.replay:
+                raise CacheMissError(f"No cached response for {params.get('model')} request {key[:12]} (replay mode)")
+            return None
+
+        return _to_namespace(entry['response'])
+
+    def _read(self, path: Path) -> Optional[Dict]:
+        """Read an entry, dropping it if expired or unreadable"""
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def put(self, params: Dict, response: Any):
+        """Store a response, then evict expired/oldest entries if the cache may be over its limit"""
+        key = cache_key(params)
+        path = self._path(key)
+        entry = {
+            "key": key,
+            "model": params.get('model'),
+            "created_at": time.time(),
+            "response": _to_plain(response)
+        }
+
+        try:
+            try:
+                replaced = path.stat().st_size
+            except FileNotFoundError:
+                replaced = 0
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            size = tmp_path.stat().st_size
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            safe_print(f"  ⚠️  Could not write response cache: {mask_secrets(str(e))}")
+            return
+
+        with self._lock:
+            self._puts_since_scan += 1
+            if self._size is not None:
+                self._size += size - replaced
+            due = (self._size is None or self._size > self.max_size_bytes
+                   or self._puts_since_scan >= EVICT_INTERVAL)
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Remove expired entries, then the oldest ones until under the size limit"""
+        with self._lock:
+            now = time.time()
+            entries = []
+            total = 0
+            for path in self.cache_dir.glob("*/*.json"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                if now - stat.st_mtime > self.ttl_seconds:
+                    path.unlink(missing_ok=True)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            if total > self.max_size_bytes:
+                entries.sort()
+                for _, size, path in entries:
+                    if total <= self.max_size_bytes:
+                        break
+                    path.unlink(missing_ok=True)
+                    total -= size
+
+            self._size = total
+            self._puts_since_scan = 0
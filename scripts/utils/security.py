@@ -3,7 +3,15 @@ Security utilities for masking sensitive data in logs.
 """
 import os
 import re
-from typing import List
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+# Output buffer used by buffered_output(); a ContextVar keeps it separate
+# per worker thread and per asyncio task
+_output_buffer: ContextVar[Optional[List[str]]] = ContextVar('output_buffer', default=None)
+_print_lock = threading.Lock()
 
 def get_sensitive_patterns() -> List[str]:
     """Get list of sensitive environment variables to mask."""
@@ -47,4 +55,34 @@ def mask_secrets(text: str) -> str:
 
 def safe_print(message: str):
     """Print message with secrets masked."""
-    print(mask_secrets(message))
+    lines = _output_buffer.get()
+    if lines is not None:
+        lines.append(mask_secrets(message))
+        return
+    with _print_lock:
+        print(mask_secrets(message))
+
+@contextmanager
+def buffered_output(emit: bool = True):
+    """
+    Collect safe_print output of the current thread/task and emit it as one block.
+
+    Used by concurrent workers so each topic's log stays grouped together
+    instead of interleaving with other threads.
+
+    Args:
+        emit: Print the collected lines on exit. With emit=False the caller
+              gets the (already masked) lines back and prints them itself.
+
+    Yields:
+        The list that collects the output lines
+    """
+    lines = []
+    token = _output_buffer.set(lines)
+    try:
+        yield lines
+    finally:
+        _output_buffer.reset(token)
+        if emit and lines:
+            with _print_lock:
+                print("\n".join(lines), flush=True)
@@ -0,0 +1,255 @@
+"""
+Title similarity for duplicate detection.
+
+Similarity is 1 - Levenshtein distance / length of the longer string, as
+the quality gate has always computed it. The distance uses Myers'
+bit-parallel algorithm (one pass over the second string with a handful of
+integer operations per character, no matrix), and callers that only care
+whether a threshold is reached pass min_similarity: pairs whose length
+difference already rules it out are skipped, and the scan stops as soon as
+the distance can no longer get low enough.
+
+similarities() compares one title against many. With NumPy installed it
+runs the same algorithm for all candidates at once (one vector step per
+character position), so thousands of titles take milliseconds; without
+NumPy it falls back to a loop over title_similarity().
+
+Usage:
+    title_similarity("AI Coding Tools", "AI coding tool")          # 0.93...
+    similarities(title, recent_titles, min_similarity=0.7)       # [0.0, 0.82, ...]
+"""
+import math
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # similarities() falls back to pure Python
+
+# Candidates checked per NumPy step before dropping those that can no longer reach the threshold
+PRUNE_INTERVAL = 16
+
+
+def _max_distance(max_len: int, min_similarity: float) -> int:
+    """Largest distance that still gives at least min_similarity"""
+    # Small epsilon: 1 - d/n is computed in floating point by callers
+    return max_len if min_similarity <= 0 else math.floor((1 - min_similarity) * max_len + 1e-9)
+
+
+def edit_distance(a: str, b: str, max_distance: Optional[int] = None) -> int:
+    """
+    Levenshtein distance (Myers/Hyyrö bit-parallel)
+
+    Args:
+        a, b: Strings to compare
+        max_distance: Stop early once the distance is known to exceed this
+
+    Returns:
+        The distance, or max_distance + 1 if it is larger than max_distance
+    """
+    # Common prefix and suffix never cost anything
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+
+    # The shorter string is the bit pattern
+    if len(a) > len(b):
+        a, b = b, a
+    if max_distance is not None and len(b) - len(a) > max_distance:
+        return max_distance + 1
+    if not a:
+        return len(b)
+
+    peq: Dict[str, int] = {}
+    for i, ch in enumerate(a):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+
+    mask = (1 << len(a)) - 1
+    high = 1 << (len(a) - 1)
+    pv, mv, score = mask, 0, len(a)
+    remaining = len(b)
+    for ch in b:
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & mask
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+
+        # Each remaining character lowers the distance by at most one
+        remaining -= 1
+        if max_distance is not None and score - remaining > max_distance:
+            return max_distance + 1
+    return score
+
+
+def _normalize(title: str) -> str:
+    return title.lower().strip()
+
+
+def title_similarity(title1: str, title2: str, min_similarity: float = 0.0) -> float:
+    """
+    Similarity of two titles (case-insensitive), from 0.0 to 1.0
+
+    Args:
+        min_similarity: Only the exact value at or above this matters; lower
+            similarities may be returned as 0.0 without computing them
+
+    Returns:
+        1 - edit distance / length of the longer title
+    """
+    t1, t2 = _normalize(title1), _normalize(title2)
+    if t1 == t2:
+        return 1.0
+    max_len = max(len(t1), len(t2))
+    if min(len(t1), len(t2)) == 0:
+        return 0.0
+
+    max_distance = _max_distance(max_len, min_similarity)
+    distance = edit_distance(t1, t2, max_distance)
+    if distance > max_distance:
+        return 0.0
+    return 1 - distance / max_len
+
+
+def similarities(title: str, candidates: Sequence[str], min_similarity: float = 0.0) -> List[float]:
+    """
+    title_similarity() of one title against many, in candidate order
+
+    Uses NumPy when available; results are the same either way.
+    """
+    if np is None or len(candidates) < 2:
+        return [title_similarity(title, candidate, min_similarity) for candidate in candidates]
+
+    query = _normalize(title)
+    texts = [_normalize(candidate) for candidate in candidates]
+    results = [0.0] * len(texts)
+
+    # Exact matches, empty strings and length-based pruning need no distance
+    todo = []
+    for i, text in enumerate(texts):
+        if text == query:
+            results[i] = 1.0
+        elif text and query:
+            max_len = max(len(query), len(text))
+            if abs(len(query) - len(text)) <= _max_distance(max_len, min_similarity):
+                todo.append(i)
+    if not todo:
+        return results
+
+    distances = _batch_edit_distance(query, [texts[i] for i in todo], min_similarity)
+    for i, distance in zip(todo, distances):
+        max_len = max(len(query), len(texts[i]))
+        if distance <= _max_distance(max_len, min_similarity):
+            results[i] = 1 - distance / max_len
+    return results
+
+
+def _encode(texts: List[str]):
+    """Texts as a zero-padded (len(texts), longest) array of code points, plus their lengths"""
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+    codes = np.frombuffer("".join(texts).encode('utf-32-le'), dtype=np.uint32)
+    matrix = np.zeros((len(texts), int(lengths.max())), dtype=np.uint32)
+    rows = np.repeat(np.arange(len(texts)), lengths)
+    cols = np.arange(len(codes)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    matrix[rows, cols] = codes
+    return matrix, lengths
+
+
+def _batch_edit_distance(query: str, texts: List[str], min_similarity: float) -> List[int]:
+    """
+    Myers' algorithm with the query as the bit pattern, vectorized over texts
+
+    The pattern is split into 64-bit words (titles rarely need more than
+    two). Texts that can no longer reach min_similarity are dropped every
+    PRUNE_INTERVAL characters; their distance is reported as too large.
+    """
+    m = len(query)
+    words = (m + 63) // 64
+    one = np.uint64(1)
+
+    # Pattern bitmask per distinct query character, split into words
+    chars = sorted(set(query))
+    char_codes = np.array([ord(ch) for ch in chars], dtype=np.uint32)
+    peq = np.zeros((len(chars), words), dtype=np.uint64)
+    for i, ch in enumerate(query):
+        peq[chars.index(ch), i // 64] |= one << np.uint64(i % 64)
+    last_mask = np.uint64((1 << (m - 64 * (words - 1))) - 1)
+    high_word, high_bit = (m - 1) // 64, np.uint64(1 << ((m - 1) % 64))
+
+    matrix, lengths = _encode(texts)
+    max_len = np.maximum(lengths, m)
+    limit = np.floor((1 - min_similarity) * max_len + 1e-9).astype(np.int64) if min_similarity > 0 else max_len
+
+    n = len(texts)
+    alive = np.arange(n)
+    pv = np.full((n, words), np.uint64(0xFFFFFFFFFFFFFFFF))
+    pv[:, -1] = last_mask
+    mv = np.zeros((n, words), dtype=np.uint64)
+    score = np.full(n, m, dtype=np.int64)
+    distances = np.full(n, -1, dtype=np.int64)
+
+    for j in range(matrix.shape[1]):
+        column = matrix[alive, j]
+        active = j < lengths[alive]
+
+        index = np.minimum(np.searchsorted(char_codes, column), len(chars) - 1)
+        eq = np.where((char_codes[index] == column)[:, None], peq[index], np.uint64(0))
+
+        xv = eq | mv
+        # (eq & pv) + pv across words, carrying between them
+        addend = eq & pv
+        total = np.empty_like(pv)
+        carry = np.zeros(len(alive), dtype=np.uint64)
+        for w in range(words):
+            partial = addend[:, w] + pv[:, w]
+            overflow = partial < addend[:, w]
+            total[:, w] = partial + carry
+            carry = (overflow | (total[:, w] < partial)).astype(np.uint64)
+        xh = (total ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+
+        step = ((ph[:, high_word] & high_bit) != 0).astype(np.int64) - ((mh[:, high_word] & high_bit) != 0)
+        score[alive] += np.where(active, step, 0)
+
+        # Shift left by one across words (ph shifts in a 1: the top DP row grows by one per column)
+        ph_carry = np.ones(len(alive), dtype=np.uint64)
+        mh_carry = np.zeros(len(alive), dtype=np.uint64)
+        for w in range(words):
+            ph_next, mh_next = ph[:, w] >> np.uint64(63), mh[:, w] >> np.uint64(63)
+            ph[:, w] = (ph[:, w] << one) | ph_carry
+            mh[:, w] = (mh[:, w] << one) | mh_carry
+            ph_carry, mh_carry = ph_next, mh_next
+        ph[:, -1] &= last_mask
+        mh[:, -1] &= last_mask
+
+        new_pv = mh | ~(xv | ph)
+        new_pv[:, -1] &= last_mask
+        pv = np.where(active[:, None], new_pv, pv)
+        mv = np.where(active[:, None], ph & xv, mv)
+
+        if (j + 1) % PRUNE_INTERVAL == 0:
+            remaining = np.maximum(lengths[alive] - (j + 1), 0)
+            hopeless = score[alive] - remaining > limit[alive]
+            if hopeless.any():
+                distances[alive[hopeless]] = limit[alive[hopeless]] + 1
+                keep = ~hopeless
+                alive, pv, mv = alive[keep], pv[keep], mv[keep]
+                if not len(alive):
+                    break
+
+    distances[alive] = score[alive]
+    return distances.tolist()
@@ -18,7 +18,7 @@ VALID_CATEGORIES = [
 VALID_LANGUAGES = ['en', 'ko', 'ja']
 
 # Allowed statuses
-VALID_STATUSES = ['pending', 'in_progress', 'completed', 'failed']  # Removed 'available' - unified to 'pending'
+VALID_STATUSES = ['pending', 'in_progress', 'completed', 'failed', 'expired']  # Removed 'available' - unified to 'pending'
 
 def validate_keyword(keyword: str) -> Optional[str]:
     """
@@ -120,6 +120,61 @@ def validate_topic_data(topic: dict) -> List[str]:
     return errors
 
 
+# Generated post metadata limits (characters)
+MAX_TITLE_LENGTH = 120
+MAX_DESCRIPTION_LENGTH = 300
+
+# Claims a title may only make if the content makes them too
+UNSUPPORTED_CLAIM_WORDS = [
+    'confirmed', 'revealed', 'secret', 'breaking', 'shocking',
+    '확정', '폭로', '충격', '속보',
+    '確定', '暴露', '衝撃', '速報'
+]
+
+def validate_title(title: str, content: str) -> List[str]:
+    """
+    Check a generated title against the post content (local alignment check).
+
+    Catches the critical mismatches only: figures the content never states
+    and hype words the content does not back up. Years are ignored.
+
+    Returns:
+        List of error messages (empty if valid)
+    """
+    if not title or not title.strip():
+        return ["Title is empty"]
+
+    errors = []
+
+    if len(title) > MAX_TITLE_LENGTH:
+        errors.append(f"Title must be at most {MAX_TITLE_LENGTH} characters")
+
+    for figure in re.findall(r'\$?\d[\d,.]*%?', title):
+        figure = figure.rstrip('.,')
+        if re.fullmatch(r'(19|20)\d{2}', figure):
+            continue
+        if figure not in content:
+            errors.append(f"Title figure '{figure}' not found in content")
+
+    title_lower = title.lower()
+    content_lower = content.lower()
+    for word in UNSUPPORTED_CLAIM_WORDS:
+        if word in title_lower and word not in content_lower:
+            errors.append(f"Title claims '{word}' but content does not")
+
+    return errors
+
+def validate_description(description: str) -> Optional[str]:
+    """Validate a generated meta description."""
+    if not description or not description.strip():
+        return "Description is empty"
+
+    if len(description) > MAX_DESCRIPTION_LENGTH:
+        return f"Description must be at most {MAX_DESCRIPTION_LENGTH} characters"
+
+    return None
+
+
 # JSON Schema validation (optional, requires jsonschema package)
 try:
     import jsonschema
@@ -154,6 +209,7 @@ TOPIC_SCHEMA = {
             "enum": VALID_STATUSES
         },
         "expiry_days": {"type": "integer", "minimum": 1, "maximum": 30},
+        "expires_at": {"type": ["string", "null"]},
         "keyword_type": {
             "type": "string",
             "enum": ["trend", "evergreen"]
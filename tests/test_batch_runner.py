@@ -0,0 +1,159 @@
+"""
+Tests for scripts/batch_runner.py
+"""
+import pytest
+import re
+from pathlib import Path
+from types import SimpleNamespace
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+from batch_runner import BatchRunner, batch_custom_id
+from topic_queue import TopicQueue
+
+
+class FakeBatches:
+    """In-memory stand-in for client.messages.batches"""
+
+    def __init__(self, polls_until_ended=1, errored=()):
+        self.polls_until_ended = polls_until_ended
+        self.errored = set(errored)
+        self.batches = {}
+        self.created = []
+
+    def create(self, requests):
+        batch_id = f"msgbatch_{len(self.batches) + 1:03d}"
+        self.batches[batch_id] = {"requests": requests, "polls": 0}
+        self.created.append(batch_id)
+        return SimpleNamespace(id=batch_id)
+
+    def retrieve(self, batch_id):
+        batch = self.batches[batch_id]
+        batch["polls"] += 1
+        ended = batch["polls"] > self.polls_until_ended
+        return SimpleNamespace(
+            id=batch_id,
+            processing_status="ended" if ended else "in_progress",
+            request_counts=SimpleNamespace(processing=0 if ended else len(batch["requests"]),
+                                           succeeded=0, errored=0)
+        )
+
+    def results(self, batch_id):
+        for request in self.batches[batch_id]["requests"]:
+            custom_id = request["custom_id"]
+            if custom_id in self.errored:
+                result = SimpleNamespace(type="errored", error="overloaded_error")
+            else:
+                text = request["params"]["messages"][0]["content"]
+                message = SimpleNamespace(content=[SimpleNamespace(text=f"reply to {text}")],
+                                          usage=SimpleNamespace(input_tokens=1, output_tokens=1))
+                result = SimpleNamespace(type="succeeded", message=message)
+            yield SimpleNamespace(custom_id=custom_id, result=result)
+
+
+def make_client(**kwargs):
+    return SimpleNamespace(messages=SimpleNamespace(batches=FakeBatches(**kwargs)))
+
+
+def build_params(topic):
+    return {"model": "test", "max_tokens": 10,
+            "messages": [{"role": "user", "content": topic["keyword"]}]}
+
+
+class TestBatchCustomId:
+    """Test custom_id generation."""
+
+    def test_custom_id_is_ascii_and_stable(self):
+        """Test that non-ASCII topic IDs map to a valid, stable custom_id."""
+        custom_id = batch_custom_id("draft", "004-ko-tech-인공지능")
+
+        assert re.fullmatch(r"[a-zA-Z0-9_-]{1,64}", custom_id)
+        assert custom_id == batch_custom_id("draft", "004-ko-tech-인공지능")
+        assert custom_id != batch_custom_id("edit", "004-ko-tech-인공지능")
+
+
+class TestRunStage:
+    """Test submitting, polling and collecting a stage."""
+
+    def test_run_stage_submits_one_batch(self, temp_queue_file):
+        """Test that all topics go into a single batch and results map back."""
+        queue = TopicQueue(temp_queue_file)
+        topics = queue.get_topics()[:2]
+        client = make_client(polls_until_ended=2)
+        sleeps = []
+        runner = BatchRunner(client, queue, poll_interval=5, sleep=sleeps.append)
+
+        messages, errors = runner.run_stage("draft", topics, build_params)
+
+        assert client.messages.batches.created == ["msgbatch_001"]
+        assert errors == {}
+        assert set(messages) == {t["id"] for t in topics}
+        assert messages[topics[0]["id"]].content[0].text == f"reply to {topics[0]['keyword']}"
+        assert sleeps == [5, 5]
+
+    def test_run_stage_persists_batch_ids(self, temp_queue_file):
+        """Test that the batch ID is stored on each topic in the queue."""
+        queue = TopicQueue(temp_queue_file)
+        topics = queue.get_topics()[:2]
+        runner = BatchRunner(make_client(), queue, sleep=lambda _: None)
+
+        runner.run_stage("draft", topics, build_params)
+
+        stored = {t["id"]: t for t in queue.get_topics()}
+        for topic in topics:
+            assert stored[topic["id"]]["batch_ids"] == {"draft": "msgbatch_001"}
+
+    def test_run_stage_resumes_existing_batch(self, temp_queue_file):
+        """Test that an interrupted run reuses the in-flight batch."""
+        queue = TopicQueue(temp_queue_file)
+        topics = queue.get_topics()[:2]
+        client = make_client()
+        BatchRunner(client, queue, sleep=lambda _: None).submit("draft", topics, build_params)
+
+        # A new run reloads the topics (with batch IDs) from the queue
+        resumed = [t for t in queue.get_topics() if t.get("batch_ids")]
+        messages, errors = BatchRunner(client, queue, sleep=lambda _: None).run_stage(
+            "draft", resumed, build_params
+        )
+
+        assert client.messages.batches.created == ["msgbatch_001"]
+        assert len(messages) == 2
+        assert errors == {}
+
+    def test_run_stage_reports_errored_requests(self, temp_queue_file):
+        """Test that errored requests are reported per topic."""
+        queue = TopicQueue(temp_queue_file)
+        topics = queue.get_topics()[:2]
+        failed_id = batch_custom_id("edit", topics[1]["id"])
+        runner = BatchRunner(make_client(errored=[failed_id]), None, sleep=lambda _: None)
+
+        messages, errors = runner.run_stage("edit", topics, build_params)
+
+        assert list(messages) == [topics[0]["id"]]
+        assert "errored" in errors[topics[1]["id"]]
+
+    def test_run_stage_reports_submit_errors(self, temp_queue_file):
+        """Test that a rejected batch submission fails its topics instead of raising."""
+        queue = TopicQueue(temp_queue_file)
+        topics = queue.get_topics()[:2]
+        client = make_client()
+
+        def reject(requests):
+            raise ConnectionError("api unreachable")
+
+        client.messages.batches.create = reject
+        messages, errors = BatchRunner(client, queue, sleep=lambda _: None).run_stage("edit", topics, build_params)
+
+        assert messages == {}
+        assert set(errors) == {t["id"] for t in topics}
+        assert "api unreachable" in errors[topics[0]["id"]]
+        assert all("batch_ids" not in t for t in queue.get_topics())
+
+    def test_wait_times_out(self):
+        """Test that a batch that never ends raises TimeoutError."""
+        client = make_client(polls_until_ended=100)
+        batch = client.messages.batches.create(requests=[])
+        runner = BatchRunner(client, None, poll_interval=10, max_wait=20, sleep=lambda _: None)
+
+        with pytest.raises(TimeoutError):
+            runner.wait(batch.id)
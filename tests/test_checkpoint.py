@@ -0,0 +1,106 @@
+"""
+Tests for scripts/utils/checkpoint.py
+"""
+import os
+import time
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+from utils.checkpoint import CheckpointStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(str(tmp_path / "checkpoints"))
+
+
+class TestTopicCheckpoint:
+    """Test saving and loading stage artifacts."""
+
+    def test_missing_stage_returns_none(self, store):
+        """Test that a stage never saved loads as None."""
+        assert store.for_topic("001-en-tech-test").load('draft') is None
+
+    def test_text_roundtrip(self, store):
+        """Test that draft text is stored and read back unchanged."""
+        checkpoint = store.for_topic("001-en-tech-test")
+        checkpoint.save('draft', "# 제목\n\nBody text")
+
+        assert store.for_topic("001-en-tech-test").load('draft') == "# 제목\n\nBody text"
+
+    def test_json_roundtrip(self, store):
+        """Test that metadata is stored as JSON."""
+        checkpoint = store.for_topic("001-en-tech-test")
+        checkpoint.save('metadata', {"title": "AI 코딩", "description": "Desc"})
+
+        assert checkpoint.load('metadata') == {"title": "AI 코딩", "description": "Desc"}
+
+    def test_save_leaves_no_temp_files(self, store):
+        """Test that atomic writes clean up their temp file."""
+        checkpoint = store.for_topic("001-en-tech-test")
+        checkpoint.save('edited', "text")
+
+        assert [p.name for p in checkpoint.directory.iterdir()] == ['edited.md']
+
+    def test_corrupt_json_returns_none(self, store):
+        """Test that an unreadable checkpoint is treated as missing."""
+        checkpoint = store.for_topic("001-en-tech-test")
+        checkpoint.directory.mkdir(parents=True)
+        (checkpoint.directory / "metadata.json").write_text("{broken", encoding='utf-8')
+
+        assert checkpoint.load('metadata') is None
+
+    def test_unknown_stage_raises(self, store):
+        """Test that an unknown stage name is rejected."""
+        with pytest.raises(ValueError):
+            store.for_topic("001-en-tech-test").save('review', "text")
+
+    def test_completed_in_pipeline_order(self, store):
+        """Test that completed() lists stages in pipeline order."""
+        checkpoint = store.for_topic("001-en-tech-test")
+        checkpoint.save('metadata', {"title": "T", "description": "D"})
+        checkpoint.save('draft', "draft")
+
+        assert checkpoint.completed() == ['draft', 'metadata']
+
+    def test_clear_removes_directory(self, store):
+        """Test that clear() drops every stage."""
+        checkpoint = store.for_topic("001-en-tech-test")
+        checkpoint.save('draft', "draft")
+        checkpoint.clear()
+
+        assert not checkpoint.directory.exists()
+        assert checkpoint.completed() == []
+
+
+class TestCheckpointStore:
+    """Test topic directories and pruning."""
+
+    def test_topic_id_is_sanitized(self, store):
+        """Test that path separators cannot escape the checkpoint root."""
+        checkpoint = store.for_topic("../../etc/passwd")
+
+        assert checkpoint.directory.parent == store.root
+
+    def test_unicode_topic_id_kept(self, store):
+        """Test that Korean keywords stay readable in directory names."""
+        assert store.for_topic("002-ko-business-손흥민").directory.name == "002-ko-business-손흥민"
+
+    def test_prune_removes_stale_topics(self, store):
+        """Test that only checkpoints older than the limit are removed."""
+        stale = store.for_topic("001-stale")
+        stale.save('draft', "old")
+        old = time.time() - 30 * 86400
+        os.utime(stale.directory / "draft.md", (old, old))
+        fresh = store.for_topic("002-fresh")
+        fresh.save('draft', "new")
+
+        assert store.prune(max_age_days=14) == 1
+        assert not stale.directory.exists()
+        assert fresh.directory.exists()
+
+    def test_prune_without_root(self, store):
+        """Test that pruning a missing root is a no-op."""
+        assert store.prune() == 0
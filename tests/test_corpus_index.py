@@ -0,0 +1,232 @@
+"""
+Tests for scripts/utils/corpus_index.py
+"""
+import os
+import time
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+from utils.corpus_index import CorpusIndex, post_slug
+from quality_gate import QualityGate, check_files
+
+
+def write_post(content_dir, rel_path, title, date="2026-01-20T12:00:00+09:00", body="Body text."):
+    path = content_dir / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f'---\ntitle: "{title}"\ndate: {date}\ndraft: false\n---\n\n{body}\n', encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def content_dir(tmp_path):
+    content = tmp_path / "content"
+    write_post(content, "en/tech/2026-01-20-ai-coding.md", "AI Coding Tools")
+    write_post(content, "ko/tech/2026-01-20-ai-coding.md", "AI 코딩 도구")
+    return content
+
+
+def make_index(content_dir):
+    return CorpusIndex(str(content_dir), path=str(content_dir.parent / "index.json"))
+
+
+class TestCorpusIndex:
+    """Test building and incrementally refreshing the index."""
+
+    def test_slug_strips_date(self):
+        """Test that the YYYY-MM-DD- prefix is removed from filenames and page bundle directories."""
+        assert post_slug(Path("2026-01-20-ai-coding-tools.md")) == "ai-coding-tools"
+        assert post_slug(Path("about.md")) == "about"
+        assert post_slug(Path("en/tech/2026-01-20-ai-coding/index.md")) == "ai-coding"
+
+    def test_find_by_lang_and_slug(self, content_dir):
+        """Test that lookups return the frontmatter of matching posts only."""
+        index = make_index(content_dir)
+        assert index.refresh() == 2
+
+        [post] = index.find('ko', 'ai-coding')
+        assert post['path'] == "ko/tech/2026-01-20-ai-coding.md"
+        assert post['title'] == "AI 코딩 도구"
+        assert post['date'] == "2026-01-20T12:00:00+09:00"
+        assert index.find('ja', 'ai-coding') == []
+
+    def test_unchanged_posts_not_reread(self, content_dir):
+        """Test that a saved index is reused for files whose mtime did not change."""
+        make_index(content_dir).refresh()
+        index = make_index(content_dir)
+
+        assert index.refresh() == 0
+        assert len(index) == 2
+
+    def test_changed_added_and_removed_posts(self, content_dir):
+        """Test that edits are re-read, new posts added and deleted posts dropped."""
+        make_index(content_dir).refresh()
+        edited = write_post(content_dir, "en/tech/2026-01-20-ai-coding.md", "AI Coding Tools, Revised")
+        os.utime(edited, ns=(time.time_ns(), time.time_ns() + 10**9))
+        write_post(content_dir, "ja/tech/2026-01-21-ai-coding.md", "AIコーディング")
+        (content_dir / "ko/tech/2026-01-20-ai-coding.md").unlink()
+
+        index = make_index(content_dir)
+
+        assert index.refresh() == 2
+        assert index.find('en', 'ai-coding')[0]['title'] == "AI Coding Tools, Revised"
+        assert index.find('ko', 'ai-coding') == []
+        assert len(make_index(content_dir)._load()) == 2
+
+    def test_corrupt_index_rebuilt(self, content_dir):
+        """Test that an unreadable index file is replaced by a full rebuild."""
+        (content_dir.parent / "index.json").write_text("{not json")
+
+        assert make_index(content_dir).refresh() == 2
+
+    def test_load_uses_saved_index_only(self, content_dir):
+        """Test that load() reads the saved entries without picking up new files."""
+        assert make_index(content_dir).load() is False
+        make_index(content_dir).refresh()
+        write_post(content_dir, "ja/tech/2026-01-21-ai-coding.md", "AIコーディング")
+
+        index = make_index(content_dir)
+
+        assert index.load() is True
+        assert len(index) == 2
+        assert index.find('ja', 'ai-coding') == []
+
+
+class TestDuplicateCheck:
+    """Test QualityGate duplicate detection through the index."""
+
+    def test_recent_duplicate_fails(self, content_dir):
+        """Test that a recent post with the same keyword and a similar title is caught."""
+        new_post = write_post(content_dir, "en/tech/2026-01-22-ai-coding.md", "AI Coding Tool")
+        gate = QualityGate(content_dir=str(content_dir))
+        checks = {"language": "en", "critical_failures": []}
+
+        gate._check_duplicate_topic(
+            {"title": "AI Coding Tool", "date": "2026-01-22T12:00:00+09:00"}, new_post, checks
+        )
+
+        assert len(checks["critical_failures"]) == 2
+        assert "2026-01-20-ai-coding.md" in checks["critical_failures"][0]
+
+    def test_old_post_and_self_ignored(self, content_dir):
+        """Test that posts older than 7 days and the checked file itself are not duplicates."""
+        new_post = write_post(content_dir, "en/tech/2026-02-10-ai-coding.md", "AI Coding Tools")
+        gate = QualityGate(content_dir=str(content_dir))
+        checks = {"language": "en", "critical_failures": []}
+
+        gate._check_duplicate_topic(
+            {"title": "AI Coding Tools", "date": "2026-02-10T12:00:00+09:00"}, new_post, checks
+        )
+
+        assert checks["critical_failures"] == []
+
+
+    def test_near_duplicate_under_other_slug(self, content_dir):
+        """Test that a reworded keyword with the same body is caught via MinHash."""
+        body = ("AI coding tools are changing how developers write, review and ship software, "
+                "and this guide compares the editors and assistants worth trying this year.")
+        write_post(content_dir, "en/tech/2025-06-01-ai-coding.md", "AI Coding Tools", body=body)
+        new_post = write_post(content_dir, "en/tech/2026-01-22-coding-assistants.md", "AI Coding Tools", body=body)
+        gate = QualityGate(content_dir=str(content_dir))
+        checks = {"language": "en", "critical_failures": []}
+
+        gate._check_near_duplicate({"title": "AI Coding Tools"}, body, new_post, checks)
+
+        assert len(checks["critical_failures"]) == 1
+        assert "2025-06-01-ai-coding.md" in checks["critical_failures"][0]
+
+    def test_same_run_pair_keeps_older_post(self, content_dir, monkeypatch):
+        """Test that of two near-duplicates only the newer one fails and the older survives."""
+        monkeypatch.setenv("QUALITY_INDEX_PATH", str(content_dir.parent / "index.json"))
+        body = ("Battery prices fell again this quarter, and installers say home storage now pays "
+                "for itself faster than rooftop solar did five years ago in most regions.")
+        older = write_post(content_dir, "en/tech/2026-10-17-home-batteries.md", "Home Batteries",
+                           date="2026-10-17T09:00:00+0900", body=body)
+        newer = write_post(content_dir, "en/tech/2026-10-18-battery-storage.md", "Home Batteries",
+                           date="2026-10-18T09:00:00+0900", body=body + " Prices keep falling.")
+        gate = QualityGate(content_dir=str(content_dir))
+
+        older_failures = gate.check_file(older)['critical_failures']
+        newer_failures = gate.check_file(newer)['critical_failures']
+
+        assert not any("Near-duplicate" in failure for failure in older_failures)
+        assert any("Near-duplicate" in failure and older.name in failure for failure in newer_failures)
+
+    def test_distinct_post_not_near_duplicate(self, content_dir):
+        """Test that the checked file itself and unrelated posts are not reported."""
+        new_post = write_post(content_dir, "en/tech/2026-01-22-stock-market.md", "Stock Market Outlook",
+                              body="Markets rallied after the central bank held rates steady.")
+        gate = QualityGate(content_dir=str(content_dir))
+        checks = {"language": "en", "critical_failures": []}
+
+        gate._check_near_duplicate({"title": "Stock Market Outlook"},
+                                   "Markets rallied after the central bank held rates steady.", new_post, checks)
+
+        assert checks["critical_failures"] == []
+
+
+class TestCheckFiles:
+    """Test checking several files in a process pool."""
+
+    def test_parallel_matches_sequential(self, content_dir, monkeypatch):
+        """Test that --jobs gives the same results, in input order, as a sequential run."""
+        monkeypatch.setenv("QUALITY_INDEX_PATH", str(content_dir.parent / "index.json"))
+        paths = [
+            write_post(content_dir, "en/tech/2026-01-22-ai-coding.md", "AI Coding Tool"),
+            write_post(content_dir, "en/tech/2026-01-22-stock-market.md", "Stock Market Outlook"),
+            write_post(content_dir, "ko/tech/2026-01-22-ai-coding.md", "AI 코딩 도구"),
+            write_post(content_dir, "en/tech/2026-01-23-cloud-costs.md", "Cloud Costs"),
+        ]
+
+        sequential = list(check_files(QualityGate(content_dir=str(content_dir)), paths))
+        parallel = list(check_files(QualityGate(content_dir=str(content_dir)), paths, jobs=2))
+
+        assert parallel == sequential
+        assert [result["file"] for result in parallel] == [str(path) for path in paths]
+        assert parallel[0]["critical_failures"]
+
+
+@pytest.mark.slow
+class TestCorpusIndexBenchmark:
+    """Benchmark duplicate checks against a large synthetic content tree."""
+
+    def test_checks_against_50k_posts(self, tmp_path, monkeypatch):
+        """Test that a warm index refresh reads nothing and each check is an in-memory lookup."""
+        content = tmp_path / "content"
+        frontmatter = '---\ntitle: "Post {i}"\ndate: 2026-01-{day:02d}T12:00:00+09:00\n---\n\nBody.\n'
+        for i in range(50_000):
+            directory = content / ("en", "ko", "ja")[i % 3] / f"cat{i % 5}"
+            directory.mkdir(parents=True, exist_ok=True)
+            (directory / f"2026-01-{i % 28 + 1:02d}-keyword-{i % 10_000}.md").write_text(
+                frontmatter.format(i=i, day=i % 28 + 1), encoding='utf-8'
+            )
+        index_path = str(tmp_path / "index.json")
+        CorpusIndex(str(content), path=index_path).refresh()
+
+        monkeypatch.setenv("QUALITY_INDEX_PATH", index_path)
+        gate = QualityGate(content_dir=str(content))
+        corpus = gate.corpus
+        start = time.perf_counter()
+        assert corpus.refresh() == 0
+        refresh_seconds = time.perf_counter() - start
+
+        new_posts = [content / "en" / "cat0" / f"2026-01-28-keyword-{k}.md" for k in range(0, 10_000, 500)]
+        start = time.perf_counter()
+        for path in new_posts:
+            gate._check_duplicate_topic(
+                {"title": "Post", "date": "2026-01-28T12:00:00+09:00"}, path,
+                {"language": "en", "critical_failures": []}
+            )
+        per_check = (time.perf_counter() - start) / len(new_posts)
+
+        corpus.near_duplicates("en", "warm up", "Builds the LSH buckets for en")
+        start = time.perf_counter()
+        for k in range(20):
+            corpus.near_duplicates("en", f"Post {k}", "Body.")
+        per_query = (time.perf_counter() - start) / 20
+
+        print(f"\nwarm refresh of 50k posts: {refresh_seconds:.2f}s, duplicate check: {per_check * 1000:.2f} ms, "
+              f"near-duplicate query: {per_query * 1000:.2f} ms")
+        assert per_check < 0.01
+        assert per_query < 0.01
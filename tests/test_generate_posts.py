@@ -0,0 +1,418 @@
+"""
+Tests for the topic pipeline in scripts/generate_posts.py
+
+The generator runs end to end against fake Claude clients (messages.create
+and messages.batches), in a temporary working directory so posts, images,
+checkpoints and the usage ledger never touch the repository.
+"""
+import asyncio
+import json
+import threading
+import time
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+pytest.importorskip("anthropic")
+pytest.importorskip("dotenv")
+pytest.importorskip("requests")
+
+import topic_queue
+from topic_queue import TopicQueue
+from utils.checkpoint import CheckpointStore
+from utils.llm_usage import MeteredClient
+from tests.test_batch_runner import FakeBatches
+
+KEYWORDS = ["Solar Panels", "Electric Cars", "Home Batteries"]
+BODY = "\n\n## Overview\n\n" + "Plain sentences about the subject and what readers should know. " * 20
+
+
+def response(text):
+    return SimpleNamespace(content=[SimpleNamespace(text=text)],
+                           usage=SimpleNamespace(input_tokens=10, output_tokens=10))
+
+
+class FakeMessages:
+    """Stand-in for client.messages: drafts, edits and metadata JSON per keyword"""
+
+    def __init__(self, fail=(), delays=None):
+        """
+        Args:
+            fail: (keyword, request kind) pairs that raise, kind being draft/edit/metadata
+            delays: Seconds each request for a keyword takes
+        """
+        self.fail = set(fail)
+        self.delays = delays or {}
+        self.calls = []
+        self.batches = FakeBatches(polls_until_ended=0)
+
+    def create(self, **params):
+        text = json.dumps(params, ensure_ascii=False)
+        keyword = next(k for k in KEYWORDS if k in text)
+        kind = 'metadata' if '"aligned"' in text else 'draft' if "system" in params else 'edit'
+        self.calls.append((keyword, kind))
+        time.sleep(self.delays.get(keyword, 0))
+        if (keyword, kind) in self.fail:
+            raise ConnectionError(f"{kind} failed for {keyword}")
+
+        if kind == 'metadata':
+            return response(json.dumps({"title": f"{keyword} Explained", "aligned": True,
+                                        "description": f"What to know about {keyword}."}))
+        if kind == 'draft':
+            return response(f"Draft about {keyword}.{BODY}")
+        return response(f"Edited post about {keyword}.{BODY}")
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    from generate_posts import ContentGenerator
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("UNSPLASH_ACCESS_KEY", raising=False)
+    generator = ContentGenerator(api_key="test-key", unsplash_key="",
+                                 checkpoints=CheckpointStore(str(tmp_path / "checkpoints")))
+    generator.client = SimpleNamespace(messages=FakeMessages())
+    generator.llm = MeteredClient(generator.client, generator.ledger)
+    return generator
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    queue = TopicQueue(str(tmp_path / "queue.json"))
+    queue._save_queue({"topics": []})
+    for keyword in KEYWORDS:
+        queue.add_topic(keyword, "tech", "en")
+    monkeypatch.setattr(topic_queue, "_queue", queue)
+    return queue
+
+
+def statuses(queue):
+    return {topic["keyword"]: topic["status"] for topic in queue.get_topics()}
+
+
+def use_messages(generator, messages):
+    generator.client = SimpleNamespace(messages=messages)
+    generator.llm = MeteredClient(generator.client, generator.ledger)
+
+
+class TestRunTopics:
+    """Test the per-topic pipeline sequentially and with --workers."""
+
+    def test_sequential_run_completes_topics(self, generator, queue):
+        """Test that each topic is drafted, edited, saved and marked completed."""
+        from generate_posts import run_topics
+
+        topics = queue.reserve_topics(count=3)
+        results = run_topics(generator, topics, 1, True)
+
+        assert [Path(path).name.split("-", 3)[3] for path in results] == [
+            "solar-panels.md", "electric-cars.md", "home-batteries.md"]
+        assert "Edited post about Solar Panels" in Path(results[0]).read_text(encoding="utf-8")
+        assert set(statuses(queue).values()) == {"completed"}
+        assert all(generator.checkpoints.for_topic(t["id"]).completed() == [] for t in topics)
+
+    def test_workers_keep_topic_order(self, generator, queue):
+        """Test that results follow topic order even when the first topic finishes last."""
+        from generate_posts import run_topics
+
+        messages = FakeMessages(delays={"Solar Panels": 0.3})
+        use_messages(generator, messages)
+        topics = queue.reserve_topics(count=3)
+
+        results = run_topics(generator, topics, 3, True)
+
+        assert [Path(path).stem.split("-", 3)[3] for path in results] == [
+            "solar-panels", "electric-cars", "home-batteries"]
+        assert messages.calls[-1][0] == "Solar Panels"
+
+    def test_failed_worker_only_fails_its_topic(self, generator, queue):
+        """Test that one worker's API error sends only that topic back, with its draft checkpointed."""
+        from generate_posts import run_topics
+
+        use_messages(generator, FakeMessages(fail={("Electric Cars", "edit")}))
+        topics = queue.reserve_topics(count=3)
+
+        results = run_topics(generator, topics, 3, True)
+
+        assert results[0] and results[2] and results[1] is None
+        assert statuses(queue) == {"Solar Panels": "completed", "Electric Cars": "pending",
+                                   "Home Batteries": "completed"}
+        failed = queue.get_topic(topics[1]["id"])
+        assert failed["retry_count"] == 1 and "edit failed" in failed["last_error"]
+        assert generator.checkpoints.for_topic(topics[1]["id"]).completed() == ["draft"]
+
+    def test_worker_output_grouped_per_topic(self, generator, queue, capsys):
+        """Test that with --workers each topic's log is printed as one uninterrupted block."""
+        from generate_posts import run_topics
+
+        use_messages(generator, FakeMessages(delays={"Solar Panels": 0.2, "Electric Cars": 0.1}))
+        topics = queue.reserve_topics(count=3)
+        capsys.readouterr()
+
+        run_topics(generator, topics, 3, True)
+
+        lines = capsys.readouterr().out.splitlines()
+        for topic in topics:
+            start = lines.index(next(line for line in lines if line.endswith(f"] {topic['id']}")))
+            end = next(i for i in range(start, len(lines)) if "✅ Completed!" in lines[i])
+            block = "\n".join(lines[start:end])
+            assert all(other["id"] not in block for other in topics if other is not topic)
+
+
+def stub_images(generator, monkeypatch, delay=0.0, error=None):
+    """Replace the Unsplash lookup with one that writes static/images/<slug>.jpg after a delay"""
+    def fetch_featured_image(keyword, category):
+        if error:
+            raise error
+        return {"photographer": "Ansel", "photographer_url": "https://unsplash.com/@a",
+                "unsplash_url": "https://unsplash.com/photos/1"}
+
+    def download_image(image_info, keyword):
+        time.sleep(delay)
+        path = Path("static/images") / f"{keyword.lower().replace(' ', '-')}.jpg"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"jpg")
+        return f"/images/{path.name}"
+
+    monkeypatch.setattr(generator, "fetch_featured_image", fetch_featured_image)
+    monkeypatch.setattr(generator, "download_image", download_image)
+
+
+class TestBackgroundImage:
+    """Test the image step running alongside the LLM stages."""
+
+    def test_image_joined_before_save(self, generator, monkeypatch):
+        """Test that a slow image download finishes before the post is saved with it."""
+        from generate_posts import process_topic
+
+        stub_images(generator, monkeypatch, delay=0.3)
+        save_post = generator.save_post
+        saved = []
+
+        def spy(topic, title, description, content, image_path=None, image_credit=None):
+            saved.append((image_path, (Path("static") / image_path.lstrip("/")).exists()))
+            return save_post(topic, title, description, content, image_path, image_credit)
+
+        monkeypatch.setattr(generator, "save_post", spy)
+        topic = {"id": "001-en-tech-solar", "keyword": "Solar Panels", "category": "tech", "lang": "en"}
+
+        filepath = process_topic(generator, topic, 1, 1, update_queue=False)
+
+        assert saved == [("/images/solar-panels.jpg", True)]
+        assert "Photo by [Ansel]" in Path(filepath).read_text(encoding="utf-8")
+
+    def test_image_discarded_when_topic_fails_without_checkpoints(self, generator, monkeypatch):
+        """Test that the downloaded image is removed when the topic fails and nothing is checkpointed."""
+        from generate_posts import process_topic
+
+        generator.checkpoints = None
+        stub_images(generator, monkeypatch)
+        use_messages(generator, FakeMessages(fail={("Solar Panels", "edit")}))
+        topic = {"id": "001-en-tech-solar", "keyword": "Solar Panels", "category": "tech", "lang": "en"}
+
+        assert process_topic(generator, topic, 1, 1, update_queue=False) is None
+        assert not Path("static/images/solar-panels.jpg").exists()
+
+    def test_failed_image_lookup_uses_placeholder(self, generator, monkeypatch):
+        """Test that an image lookup error still saves the post, with the category placeholder."""
+        from generate_posts import process_topic
+
+        stub_images(generator, monkeypatch, error=ConnectionError("unsplash down"))
+        topic = {"id": "001-en-tech-solar", "keyword": "Solar Panels", "category": "tech", "lang": "en"}
+
+        filepath = process_topic(generator, topic, 1, 1, update_queue=False)
+
+        assert 'image: "/images/placeholder-tech.jpg"' in Path(filepath).read_text(encoding="utf-8")
+
+    def test_async_failure_discards_pending_image(self, tmp_path, monkeypatch):
+        """Test that a failing async topic waits for its in-flight download and removes the file."""
+        from generate_posts import process_topic_async
+
+        monkeypatch.chdir(tmp_path)
+        image = Path("static/images/solar-panels.jpg")
+
+        class FailingGenerator:
+            checkpoints = None
+
+            async def fetch_featured_image(self, keyword, category):
+                await asyncio.sleep(0.05)
+                return {"photographer": "Ansel"}
+
+            async def download_image(self, image_info, keyword):
+                def write():
+                    time.sleep(0.05)
+                    image.parent.mkdir(parents=True, exist_ok=True)
+                    image.write_bytes(b"jpg")
+                    return "/images/solar-panels.jpg"
+                return await asyncio.to_thread(write)
+
+            async def generate_draft(self, topic):
+                await asyncio.sleep(0.07)  # Fails while the download thread is writing
+                raise ConnectionError("draft failed")
+
+        topic = {"id": "001-en-tech-solar", "keyword": "Solar Panels", "category": "tech", "lang": "en"}
+
+        assert asyncio.run(process_topic_async(FailingGenerator(), topic, 1, 1, update_queue=False)) is None
+        time.sleep(0.2)  # An orphaned download would land here
+        assert not image.exists()
+
+
+class TestAsyncBlockingIO:
+    """Test that --async runs blocking file I/O off the event loop."""
+
+    def test_save_does_not_block_other_topics(self, tmp_path, monkeypatch):
+        """Test that a slow post save runs in a worker thread while the loop keeps serving tasks."""
+        from generate_posts import process_topic_async
+
+        monkeypatch.chdir(tmp_path)
+        loop_thread = threading.get_ident()
+        save_threads = []
+
+        class SlowSaveGenerator:
+            checkpoints = None
+
+            async def fetch_featured_image(self, keyword, category):
+                return None
+
+            async def generate_draft(self, topic):
+                return "draft"
+
+            async def edit_draft(self, draft, topic):
+                return "edited"
+
+            async def generate_metadata(self, content, keyword, lang, references=None):
+                return "Title", "Description"
+
+            def save_post(self, topic, title, description, content, image_path=None, image_credit=None):
+                save_threads.append(threading.get_ident())
+                time.sleep(0.2)
+                return "content/posts/en/solar.md"
+
+        async def run():
+            ticks = []
+
+            async def ticker():
+                while True:
+                    ticks.append(1)
+                    await asyncio.sleep(0.01)
+
+            task = asyncio.create_task(ticker())
+            topic = {"id": "001-en-tech-solar", "keyword": "Solar Panels", "category": "tech", "lang": "en"}
+            result = await process_topic_async(SlowSaveGenerator(), topic, 1, 1, update_queue=False)
+            task.cancel()
+            return result, len(ticks)
+
+        result, ticks = asyncio.run(run())
+
+        assert result == "content/posts/en/solar.md"
+        assert save_threads and save_threads[0] != loop_thread
+        assert ticks >= 5
+
+    def test_checkpoint_reads_run_in_thread(self, tmp_path, monkeypatch):
+        """Test that resuming from a checkpoint reads it outside the event loop thread."""
+        from generate_posts import process_topic_async
+        from utils.checkpoint import TopicCheckpoint
+
+        monkeypatch.chdir(tmp_path)
+        store = CheckpointStore(str(tmp_path / "checkpoints"))
+        topic = {"id": "001-en-tech-solar", "keyword": "Solar Panels", "category": "tech", "lang": "en"}
+        checkpoint = store.for_topic(topic["id"])
+        checkpoint.save("edited", f"Edited post about Solar Panels.{BODY}")
+        checkpoint.save("metadata", {"title": "Solar Panels Explained", "description": "About solar."})
+        read_threads = set()
+        for name in ("load", "completed"):
+            original = getattr(TopicCheckpoint, name)
+
+            def record(self, *args, _original=original):
+                read_threads.add(threading.get_ident())
+                return _original(self, *args)
+
+            monkeypatch.setattr(TopicCheckpoint, name, record)
+
+        class ResumingGenerator:
+            checkpoints = store
+
+            async def fetch_featured_image(self, keyword, category):
+                return None
+
+            def save_post(self, topic, title, description, content, image_path=None, image_credit=None):
+                return "content/posts/en/solar.md"
+
+        async def run():
+            result = await process_topic_async(ResumingGenerator(), topic, 1, 1, update_queue=False)
+            return result, threading.get_ident()
+
+        result, loop_thread = asyncio.run(run())
+
+        assert result == "content/posts/en/solar.md"
+        assert read_threads and loop_thread not in read_threads
+
+    def test_photo_claim_runs_in_thread(self, tmp_path, monkeypatch):
+        """Test that the async image search claims its photo outside the event loop thread."""
+        pytest.importorskip("httpx")
+        from generate_posts import AsyncContentGenerator
+
+        monkeypatch.chdir(tmp_path)
+        generator = AsyncContentGenerator(api_key="test-key", unsplash_key="test-unsplash")
+        photo = {"id": "p1", "urls": {"regular": "https://images.unsplash.com/p1"},
+                 "links": {"download_location": "https://api.unsplash.com/p1/download",
+                           "html": "https://unsplash.com/photos/p1"},
+                 "user": {"name": "Ansel", "links": {"html": "https://unsplash.com/@a"}}}
+        claim_threads = []
+
+        async def search(query):
+            return [photo]
+
+        def claim(results):
+            claim_threads.append(threading.get_ident())
+            return results[0]
+
+        monkeypatch.setattr(generator, "_search_unsplash", search)
+        monkeypatch.setattr(generator, "_claim_unused_photo", claim)
+
+        async def run():
+            try:
+                return await generator.fetch_featured_image("Solar Panels", "tech"), threading.get_ident()
+            finally:
+                await generator.aclose()
+
+        image_info, loop_thread = asyncio.run(run())
+
+        assert image_info["photographer"] == "Ansel"
+        assert claim_threads and claim_threads[0] != loop_thread
+
+
+class TestBatchPipeline:
+    """Test --batch drafts and edits through the Message Batches API."""
+
+    def test_edit_submit_failure_keeps_drafts(self, generator, queue):
+        """Test that a rejected edit batch fails its topics and a retry reuses the checkpointed drafts."""
+        from generate_posts import run_topics_batch
+
+        topics = queue.reserve_topics(count=2)
+        batches = generator.client.messages.batches
+        create = batches.create
+
+        def reject_edits(requests):
+            if requests[0]["custom_id"].startswith("edit-"):
+                raise ConnectionError("batch API unavailable")
+            return create(requests)
+
+        batches.create = reject_edits
+        assert run_topics_batch(generator, topics, 1, True) == []
+
+        assert list(statuses(queue).values()).count("pending") == 3
+        assert all("batch_ids" not in topic for topic in queue.get_topics())
+        for topic in topics:
+            assert generator.checkpoints.for_topic(topic["id"]).load("draft").startswith("reply to")
+
+        # The retry (queue updates off: the topics are backing off) only submits edits
+        batches.create = create
+        results = run_topics_batch(generator, [queue.get_topic(t["id"]) for t in topics], 1, False)
+
+        assert len(results) == 2 and all(results)
+        assert batches.created == ["msgbatch_001", "msgbatch_002"]
+        assert batches.batches["msgbatch_002"]["requests"][0]["custom_id"].startswith("edit-")
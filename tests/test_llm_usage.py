@@ -0,0 +1,127 @@
+"""
+Tests for scripts/utils/llm_usage.py
+"""
+import asyncio
+import json
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+from utils.llm_usage import UsageLedger, MeteredClient, AsyncMeteredClient, estimate_cost
+
+MODEL = "claude-sonnet-4-20250514"
+
+
+def make_response(input_tokens=100, output_tokens=50, cache_read=0, cache_create=0):
+    usage = SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens,
+                            cache_read_input_tokens=cache_read,
+                            cache_creation_input_tokens=cache_create)
+    return SimpleNamespace(content=[SimpleNamespace(text="ok")], usage=usage)
+
+
+class FakeRawResponse:
+    def __init__(self, response, retries):
+        self.response = response
+        self.http_request = SimpleNamespace(headers={"x-stainless-retry-count": str(retries)})
+
+    def parse(self):
+        return self.response
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    return UsageLedger("test", path=str(tmp_path / "usage.jsonl"))
+
+
+class TestMeteredClient:
+    """Test recording of Claude calls."""
+
+    def test_records_usage_and_writes_ledger(self, ledger):
+        """Test that a call is recorded with its token counts."""
+        messages = SimpleNamespace(create=lambda **params: make_response(cache_read=900))
+        client = MeteredClient(SimpleNamespace(messages=messages), ledger)
+
+        response = client.create("draft", model=MODEL, max_tokens=10, messages=[])
+
+        assert response.content[0].text == "ok"
+        record = ledger.records[0]
+        assert record["stage"] == "draft"
+        assert record["input_tokens"] == 100
+        assert record["cache_read_input_tokens"] == 900
+        assert record["retries"] == 0
+
+        lines = ledger.path.read_text(encoding="utf-8").splitlines()
+        assert json.loads(lines[0])["run_id"] == ledger.run_id
+
+    def test_counts_sdk_retries_from_raw_response(self, ledger):
+        """Test that retries are read from the raw response when available."""
+        raw_api = SimpleNamespace(create=lambda **params: FakeRawResponse(make_response(), 2))
+        messages = SimpleNamespace(with_raw_response=raw_api)
+        client = MeteredClient(SimpleNamespace(messages=messages), ledger)
+
+        client.create("review", model=MODEL, max_tokens=10, messages=[])
+
+        assert ledger.records[0]["retries"] == 2
+
+    def test_records_failed_call(self, ledger):
+        """Test that a failed call is recorded and the error re-raised."""
+        def fail(**params):
+            raise RuntimeError("overloaded")
+
+        client = MeteredClient(SimpleNamespace(messages=SimpleNamespace(create=fail)), ledger)
+
+        with pytest.raises(RuntimeError):
+            client.create("title", model=MODEL, max_tokens=10, messages=[])
+
+        assert ledger.records[0]["error"] == "RuntimeError"
+        assert ledger.records[0]["input_tokens"] == 0
+
+    def test_async_client(self, ledger):
+        """Test the async wrapper records like the sync one."""
+        async def create(**params):
+            return make_response(output_tokens=7)
+
+        client = AsyncMeteredClient(SimpleNamespace(messages=SimpleNamespace(create=create)), ledger)
+
+        asyncio.run(client.create("edit", model=MODEL, max_tokens=10, messages=[]))
+
+        assert ledger.records[0]["stage"] == "edit"
+        assert ledger.records[0]["output_tokens"] == 7
+
+
+class TestSummary:
+    """Test per-stage aggregation."""
+
+    def test_summary_per_stage(self, ledger):
+        """Test that records are summed per stage and in total."""
+        ledger.record("draft", MODEL, make_response().usage, elapsed=2.0)
+        ledger.record("draft", MODEL, make_response().usage, elapsed=3.0, retries=1)
+        ledger.record("metadata", MODEL, {"input_tokens": 10, "output_tokens": 5}, elapsed=0.5)
+
+        summary = ledger.summary()
+
+        assert list(summary) == ["draft", "metadata", "total"]
+        assert summary["draft"]["calls"] == 2
+        assert summary["draft"]["input_tokens"] == 200
+        assert summary["draft"]["retries"] == 1
+        assert summary["total"]["elapsed_s"] == pytest.approx(5.5)
+
+    def test_estimate_cost(self):
+        """Test cost estimation, batch discount and unknown models."""
+        usage = {"input_tokens": 1_000_000, "output_tokens": 0}
+
+        assert estimate_cost(MODEL, usage) == pytest.approx(3.0)
+        assert estimate_cost(MODEL, usage, batch=True) == pytest.approx(1.5)
+        assert estimate_cost("unknown-model", usage) is None
+
+    def test_print_summary(self, ledger, capsys):
+        """Test that the summary table lists each stage."""
+        ledger.record("curation", MODEL, make_response().usage, elapsed=1.0)
+
+        ledger.print_summary()
+
+        output = capsys.readouterr().out
+        assert "curation" in output
+        assert "total" in output
@@ -0,0 +1,82 @@
+"""
+Tests for scripts/utils/minhash.py
+"""
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+from utils.minhash import (
+    LSHIndex, NEAR_DUPLICATE_THRESHOLD, decode_signature, encode_signature, estimate_similarity, minhash,
+    shingles, text_signature, tokens
+)
+
+KO_POST = ("AI 코딩 도구가 개발자 생산성을 바꾸는 방법과 주의할 점을 정리했습니다. "
+           "오늘은 최신 도구를 비교하고 실제 프로젝트에 적용한 경험을 공유합니다.")
+KO_EDITED = ("AI 코딩 도구가 개발자 생산성을 바꾸는 방법과 주의할 점을 정리합니다. "
+             "오늘은 최신 도구들을 비교하고 실제 프로젝트에 적용한 경험을 공유합니다.")
+KO_OTHER = "서울 부동산 시장 전망과 금리 인상이 전세 가격에 미치는 영향을 분석합니다."
+
+EN_POST = ("Apple announced the new iPhone lineup today with a faster chip, a brighter display "
+           "and a camera system that finally closes the gap with dedicated compact cameras.")
+EN_EDITED = ("Apple announced the new iPhone lineup on Tuesday with a faster chip, a brighter display "
+             "and a camera system that finally closes the gap with dedicated compact cameras.")
+
+
+class TestShingles:
+    """Test script-aware tokenization."""
+
+    def test_cjk_characters_are_tokens(self):
+        """Test that Hangul, kana and kanji split per character while Latin words stay whole."""
+        assert tokens("Hello AI코딩 テスト漢字") == ["hello", "ai", "코", "딩", "テ", "ス", "ト", "漢", "字"]
+
+    def test_urls_and_image_paths_dropped(self):
+        """Test that links and image paths do not become shingles."""
+        assert tokens("See ![cover](/images/a.jpg) https://example.com/x now") == ["see", "cover", "now"]
+
+    def test_short_text_is_one_shingle(self):
+        """Test that texts shorter than a shingle still get a signature."""
+        assert shingles("AI news") == {"ai news"}
+        assert text_signature("...") is None
+
+
+class TestSignatures:
+    """Test similarity estimates and LSH candidates."""
+
+    @pytest.mark.parametrize("original,edited,lang", [(KO_POST, KO_EDITED, 'ko'), (EN_POST, EN_EDITED, 'en')])
+    def test_edited_copy_is_similar(self, original, edited, lang):
+        """Test that a lightly edited post scores far above an unrelated one."""
+        signature = text_signature(original, lang)
+
+        assert estimate_similarity(signature, text_signature(edited, lang)) >= 0.5
+        assert estimate_similarity(signature, text_signature(KO_OTHER, lang)) < 0.2
+
+    def test_encode_roundtrip(self):
+        """Test that signatures survive the JSON text form."""
+        signature = text_signature(KO_POST, 'ko')
+
+        assert decode_signature(encode_signature(signature)) == signature
+        assert decode_signature(encode_signature(None)) is None
+
+    def test_lsh_returns_colliding_posts_only(self):
+        """Test that a query finds the near-duplicate and not the unrelated post."""
+        lsh = LSHIndex()
+        lsh.add("edited", text_signature(KO_EDITED, 'ko'))
+        lsh.add("other", text_signature(KO_OTHER, 'ko'))
+
+        assert lsh.query(text_signature(KO_POST, 'ko')) == {"edited"}
+
+    def test_lsh_recall_at_threshold(self):
+        """Test that at least 95% of pairs at the near-duplicate threshold collide in some band."""
+        pairs = 200
+        found = 0
+        for pair in range(pairs):
+            shared = [f"{pair}-shared-{i}" for i in range(100)]
+            a = minhash(shared + [f"{pair}-a-{i}" for i in range(50)])
+            b = minhash(shared + [f"{pair}-b-{i}" for i in range(50)])  # Jaccard 100/200
+            lsh = LSHIndex()
+            lsh.add("b", b)
+            found += lsh.query(a) == {"b"}
+
+        assert NEAR_DUPLICATE_THRESHOLD == 0.5
+        assert found / pairs >= 0.95
@@ -0,0 +1,95 @@
+"""
+Tests for prompt cache layout in generate_posts, ai_reviewer and keyword_curator
+
+The part of each request up to the last cache_control breakpoint must be
+byte-identical across topics/posts of the same language, otherwise the
+prompt cache never hits.
+"""
+import json
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+pytest.importorskip("anthropic")
+pytest.importorskip("dotenv")
+pytest.importorskip("requests")
+
+
+def cached_prefix(request: dict) -> bytes:
+    """Serialize every content block up to and including the last cache breakpoint"""
+    blocks = list(request.get("system", []))
+    for message in request["messages"]:
+        content = message["content"]
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        blocks.extend(content)
+
+    last = max(i for i, block in enumerate(blocks) if "cache_control" in block)
+    prefix = [request["model"]] + blocks[:last + 1]
+    return json.dumps(prefix, ensure_ascii=False, sort_keys=True).encode("utf-8")
+
+
+TOPICS = [
+    {"id": "001-{lang}-tech-a", "keyword": "AI coding assistants", "category": "tech", "lang": "{lang}"},
+    {"id": "002-{lang}-sports-b", "keyword": "손흥민 이적", "category": "sports", "lang": "{lang}",
+     "references": [{"title": "Source", "url": "https://example.com", "source": "Example"}]},
+]
+
+
+def topics_for(lang):
+    return [{k: v.replace("{lang}", lang) if isinstance(v, str) else v for k, v in t.items()} for t in TOPICS]
+
+
+@pytest.fixture(scope="module")
+def generator():
+    from generate_posts import ContentGenerator
+    return ContentGenerator(api_key="test-key", unsplash_key="")
+
+
+@pytest.mark.parametrize("lang", ["en", "ko", "ja"])
+class TestGeneratorPrefixes:
+    """Test draft and editor request prefixes."""
+
+    def test_draft_prefix_shared_across_topics(self, generator, lang):
+        """Test that the cached draft system prompt does not depend on the topic."""
+        first, second = (generator._draft_request(t) for t in topics_for(lang))
+
+        assert cached_prefix(first) == cached_prefix(second)
+        assert "AI coding assistants".encode() not in cached_prefix(first)
+        assert "AI coding assistants" in first["messages"][0]["content"]
+
+    def test_edit_prefix_shared_across_topics(self, generator, lang):
+        """Test that the cached editor instructions do not depend on the draft."""
+        first_topic, second_topic = topics_for(lang)
+        first = generator._edit_request("First draft body", first_topic)
+        second = generator._edit_request("Completely different draft", second_topic)
+
+        assert cached_prefix(first) == cached_prefix(second)
+
+
+@pytest.mark.parametrize("lang", ["en", "ko", "ja"])
+def test_review_prefix_shared_across_posts(lang):
+    """Test that the cached review instructions do not depend on the post."""
+    from ai_reviewer import AIReviewer
+    reviewer = AIReviewer(api_key="test-key")
+
+    first = reviewer._review_request("---\ntitle: A\n---\nPost {one}", lang)
+    second = reviewer._review_request("Another post entirely", lang)
+
+    assert cached_prefix(first) == cached_prefix(second)
+    assert "Post {one}" in first["messages"][0]["content"][-1]["text"]
+
+
+def test_curation_prefix_shared_across_runs():
+    """Test that the cached curation rules do not depend on trends or counts."""
+    from keyword_curator import KeywordCurator, CURATION_TRENDS_TEMPLATE
+    curator = KeywordCurator(api_key="test-key")
+
+    first = curator._curation_request(CURATION_TRENDS_TEMPLATE.format(
+        trends_en="- NBA", trends_ko="- 지진", trends_ja="- 地震", count=15, per_lang=5))
+    second = curator._curation_request(CURATION_TRENDS_TEMPLATE.format(
+        trends_en="- Oscars", trends_ko="- 환율", trends_ja="- 円安", count=30, per_lang=10))
+
+    assert cached_prefix(first) == cached_prefix(second)
@@ -1,6 +1,7 @@
 """
 Tests for scripts/quality_gate.py
 """
+import json
 import pytest
 from pathlib import Path
 
@@ -314,3 +315,106 @@ Reference: https://example.com
         assert "critical_failures" in result
         assert "warnings" in result
         assert "info" in result
+
+
+class TestReturnFailedTopics:
+    """Test sending failed posts back to the queue."""
+
+    def test_failed_posts_requeued(self, tmp_path, monkeypatch):
+        """Test that failed files reset their topics in one batch."""
+        import topic_queue
+        from quality_gate import return_failed_topics_to_queue
+
+        queue = topic_queue.TopicQueue(str(tmp_path / "queue.json"))
+        queue._save_queue({"topics": [
+            {"id": "001-en-tech-ai-coding", "keyword": "ai-coding", "lang": "en", "status": "completed",
+             "completed_at": "2026-01-21T00:00:00+00:00"},
+            {"id": "002-ko-tech-ai-coding", "keyword": "ai-coding", "lang": "ko", "status": "completed"}
+        ]})
+        monkeypatch.setattr(topic_queue, "_queue", queue)
+
+        return_failed_topics_to_queue(["content/en/tech/2026-01-22-ai-coding.md"])
+
+        assert queue.get_topic("001-en-tech-ai-coding")["status"] == "pending"
+        assert "completed_at" not in queue.get_topic("001-en-tech-ai-coding")
+        assert queue.get_topic("002-ko-tech-ai-coding")["status"] == "completed"
+
+
+    def test_near_duplicate_counts_retry(self, tmp_path, monkeypatch):
+        """Test that a near-duplicate is recorded as a failed attempt instead of a free requeue."""
+        import topic_queue
+        from quality_gate import return_failed_topics_to_queue
+
+        queue = topic_queue.TopicQueue(str(tmp_path / "queue.json"))
+        queue._save_queue({"topics": [
+            {"id": "001-en-tech-ai-coding", "keyword": "ai-coding", "lang": "en", "status": "completed",
+             "completed_at": "2026-01-21T00:00:00+00:00"}
+        ]})
+        monkeypatch.setattr(topic_queue, "_queue", queue)
+        filepath = "content/en/tech/2026-01-22-ai-coding.md"
+
+        return_failed_topics_to_queue([filepath], {filepath: [
+            "Near-duplicate content detected: 2026-01-20-ai-tools.md (~96% overlap)"]})
+
+        topic = queue.get_topic("001-en-tech-ai-coding")
+        assert topic["status"] == "pending" and topic["retry_count"] == 1
+        assert topic["last_error"].startswith("Near-duplicate content detected")
+        assert "completed_at" not in topic
+
+
+class TestAudit:
+    """Test auditing published posts with --all / --since."""
+
+    @pytest.fixture
+    def content_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("QUALITY_INDEX_PATH", str(tmp_path / "index.json"))
+        content = tmp_path / "content"
+        for rel_path in ["en/tech/2026-01-20-ai-coding.md", "en/tech/2026-01-25-cloud/index.md",
+                         "en/tech/2026-01-25-cloud/notes.md", "en/about.md",
+                         "ja/tech/2026-01-21-ai-coding.md", "ko/tech/2026-01-22-ai-coding.md",
+                         "fr/tech/2026-01-22-ai-coding.md"]:
+            path = content / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(f'---\ntitle: "{path.stem}"\ndate: 2026-01-20T12:00:00+09:00\n---\n\nBody.\n',
+                            encoding='utf-8')
+        return content
+
+    def test_iter_posts_order_bundles_and_since(self, content_dir):
+        """Test that posts stream in sorted order, bundles as index.md, pages and other languages skipped."""
+        from quality_gate import iter_posts
+
+        posts = [p.relative_to(content_dir).as_posix() for p in iter_posts(str(content_dir))]
+
+        assert posts == ["en/tech/2026-01-20-ai-coding.md", "en/tech/2026-01-25-cloud/index.md",
+                         "ja/tech/2026-01-21-ai-coding.md", "ko/tech/2026-01-22-ai-coding.md"]
+        assert [p.name for p in iter_posts(str(content_dir), since="2026-01-22")] == ["index.md", "2026-01-22-ai-coding.md"]
+        assert len(list(iter_posts(str(content_dir), after="en/tech/2026-01-25-cloud/index.md"))) == 2
+
+    def test_resume_after_interruption(self, content_dir, tmp_path, monkeypatch):
+        """Test that --resume continues after the last saved post and the report has each post once."""
+        import quality_gate
+
+        report = tmp_path / "audit.jsonl"
+        monkeypatch.setattr(quality_gate, "AUDIT_CURSOR_INTERVAL", 1)
+        check_file = QualityGate.check_file
+        calls = []
+
+        def failing_check(self, filepath):
+            calls.append(filepath.name)
+            if len(calls) == 3:
+                raise KeyboardInterrupt
+            return check_file(self, filepath)
+
+        monkeypatch.setattr(QualityGate, "check_file", failing_check)
+        with pytest.raises(KeyboardInterrupt):
+            quality_gate.audit_posts(QualityGate(content_dir=str(content_dir)), report_path=str(report))
+        monkeypatch.setattr(QualityGate, "check_file", check_file)
+
+        summary = quality_gate.audit_posts(QualityGate(content_dir=str(content_dir)),
+                                           report_path=str(report), resume=True)
+
+        lines = [json.loads(line) for line in report.read_text(encoding='utf-8').splitlines()]
+        assert [Path(line["file"]).name for line in lines] == [
+            "2026-01-20-ai-coding.md", "index.md", "2026-01-21-ai-coding.md", "2026-01-22-ai-coding.md"]
+        assert summary["checked"] == 4
+        assert not (tmp_path / "audit.jsonl.cursor").exists()
@@ -0,0 +1,839 @@
+"""
+Tests for scripts/queue_storage.py
+"""
+import json
+import multiprocessing
+import sqlite3
+import threading
+import time
+import pytest
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+from queue_storage import open_storage, JSONQueueStorage, SQLiteQueueStorage
+from topic_queue import BATCH_RESUME_GRACE_HOURS, TopicQueue
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def queue_path(request, tmp_path, sample_queue):
+    """Queue file for each backend, seeded with the sample queue."""
+    suffix = ".json" if request.param == "json" else ".db"
+    path = tmp_path / f"queue{suffix}"
+    open_storage(path).replace(sample_queue)
+    return str(path)
+
+
+class TestOpenStorage:
+    """Test backend selection."""
+
+    def test_suffix_selects_backend(self, tmp_path):
+        """Test that .db selects SQLite and anything else JSON."""
+        assert isinstance(open_storage(tmp_path / "q.db"), SQLiteQueueStorage)
+        assert isinstance(open_storage(tmp_path / "q.json"), JSONQueueStorage)
+
+    def test_sqlite_indexes(self, tmp_path):
+        """Test that the status/priority and keyword/lang indexes exist."""
+        path = tmp_path / "q.db"
+        open_storage(path)
+
+        with sqlite3.connect(str(path)) as conn:
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+        assert {"idx_topics_status_priority", "idx_topics_keyword_lang"} <= indexes
+
+    def test_reservation_query_uses_index(self, tmp_path):
+        """Test that picking pending topics does not scan the table."""
+        path = tmp_path / "q.db"
+        open_storage(path)
+
+        with sqlite3.connect(str(path)) as conn:
+            plan = " ".join(str(row) for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT data FROM topics WHERE status = 'pending' AND priority >= 1 "
+                "ORDER BY priority DESC, created_at"
+            ))
+
+        assert "idx_topics_status_priority" in plan
+
+
+class TestQueueStorage:
+    """Test the storage interface on both backends."""
+
+    def test_export_roundtrip(self, queue_path, sample_queue):
+        """Test that export returns the imported document unchanged."""
+        assert open_storage(queue_path).export() == sample_queue
+
+    def test_put_updates_in_place(self, queue_path, sample_queue):
+        """Test that updating a topic keeps queue order."""
+        storage = open_storage(queue_path)
+        topic = storage.get("002-ko-business-test-inprogress")
+        topic["status"] = "completed"
+        storage.put(topic)
+
+        ids = [t["id"] for t in storage.select()]
+        assert ids == [t["id"] for t in sample_queue["topics"]]
+        assert storage.get("002-ko-business-test-inprogress")["status"] == "completed"
+
+    def test_pending_order(self, queue_path):
+        """Test that pending topics come by priority then age."""
+        storage = open_storage(queue_path)
+        for i, priority in enumerate([3, 9, 9]):
+            storage.put({"id": f"10{i}", "keyword": f"k{i}", "lang": "en", "status": "pending",
+                         "priority": priority, "created_at": f"2026-01-2{5 - i}T00:00:00+00:00"})
+
+        ids = [t["id"] for t in storage.pending(priority_min=1)]
+
+        assert ids[:2] == ["102", "101"]
+        assert ids[-1] == "100"
+        assert [t["id"] for t in storage.pending(priority_min=9)] == ["102", "101"]
+
+    def test_find_completed_is_case_insensitive(self, queue_path):
+        """Test duplicate detection on (keyword, lang)."""
+        storage = open_storage(queue_path)
+        storage.put({"id": "004-en-done", "keyword": "AI Coding", "lang": "en", "status": "completed"})
+
+        assert storage.find_completed({"keyword": "ai coding", "lang": "en"}) == "004-en-done"
+        assert storage.find_completed({"keyword": "テスト完了", "language": "ja"}) == "003-ja-lifestyle-test-completed"
+        assert storage.find_completed({"keyword": "AI Coding", "lang": "ko"}) is None
+
+    def test_transaction_rolls_back(self, queue_path):
+        """Test that an error inside a transaction leaves the queue untouched."""
+        storage = open_storage(queue_path)
+
+        with pytest.raises(RuntimeError):
+            with storage.transaction():
+                topic = storage.get("001-en-tech-test-pending")
+                topic["status"] = "completed"
+                storage.put(topic)
+                raise RuntimeError("boom")
+
+        assert open_storage(queue_path).get("001-en-tech-test-pending")["status"] == "pending"
+
+
+def valid_topic(topic_id, keyword, status="pending", priority=5, lang="en"):
+    return {"id": topic_id, "keyword": keyword, "category": "tech", "lang": lang, "status": status,
+            "priority": priority, "created_at": "2026-01-21T00:00:00+00:00"}
+
+
+class TestTopicQueueBackends:
+    """Test TopicQueue state transitions on both backends."""
+
+    def test_reserve_and_complete(self, queue_path):
+        """Test the pending -> in_progress -> completed flow."""
+        queue = TopicQueue(queue_path)
+        queue.storage.put(valid_topic("004-en-tech-ai", "AI Coding"))
+
+        reserved = queue.reserve_topics(count=5)
+        assert [t["id"] for t in reserved] == ["004-en-tech-ai"]
+
+        queue.mark_completed(reserved[0]["id"])
+        assert TopicQueue(queue_path).get_topic(reserved[0]["id"])["status"] == "completed"
+
+    def test_reserve_skips_completed_duplicate(self, queue_path):
+        """Test that a pending topic matching a completed keyword is not reserved."""
+        queue = TopicQueue(queue_path)
+        queue.storage.put(valid_topic("004-en-done", "AI Coding", status="completed"))
+        queue.storage.put(valid_topic("005-en-dup", "ai coding", priority=10))
+        queue.storage.put(valid_topic("006-en-new", "Remote Work"))
+
+        assert [t["id"] for t in queue.reserve_topics(count=5)] == ["006-en-new"]
+
+    def test_mark_failed_returns_to_pending(self, queue_path):
+        """Test that a failure increments retries and clears the reservation."""
+        queue = TopicQueue(queue_path)
+        queue.mark_failed("002-ko-business-test-inprogress", "boom")
+
+        topic = queue.get_topic("002-ko-business-test-inprogress")
+        assert topic["status"] == "pending"
+        assert topic["retry_count"] == 1
+        assert "reserved_at" not in topic
+
+    def test_reserve_past_duplicate_head(self, queue_path):
+        """Test that duplicates at the head of the queue do not cause an under-reserve."""
+        queue = TopicQueue(queue_path)
+        with queue.storage.transaction():
+            queue.storage.put(valid_topic("004-en-done", "AI Coding", status="completed"))
+            for i in range(6):
+                queue.storage.put(valid_topic(f"{10 + i}-en-dup", "ai coding", priority=10))
+            for i in range(3):
+                queue.storage.put(valid_topic(f"{20 + i}-en-new", f"fresh {i}", priority=2))
+
+        assert [t["id"] for t in queue.reserve_topics(count=2)] == ["20-en-new", "21-en-new"]
+        assert len(queue.storage.pending()) == 8  # 6 duplicates, 1 fresh, 1 fixture topic
+
+    def test_pending_order_follows_updates(self, queue_path):
+        """Test that the priority index tracks priority changes and requeues."""
+        queue = TopicQueue(queue_path)
+        with queue.storage.transaction():
+            for i in range(3):
+                queue.storage.put(valid_topic(f"{100 + i}-en-tech-k{i}", f"keyword {i}", priority=6))
+        reserved = queue.reserve_topics(count=1, priority_min=6)[0]
+        queue.update_topic("102-en-tech-k2", {"priority": 9})
+        queue.mark_failed(reserved["id"], "boom")
+
+        ids = [t["id"] for t in queue.storage.pending(priority_min=6)]
+
+        # The fixture's pending topic has priority 8
+        assert ids == ["102-en-tech-k2", "001-en-tech-test-pending", "100-en-tech-k0", "101-en-tech-k1"]
+        assert [t["id"] for t in TopicQueue(queue_path).storage.pending(priority_min=6)] == ids
+
+    def test_add_topic_and_stats(self, queue_path):
+        """Test that added topics are counted."""
+        queue = TopicQueue(queue_path)
+        topic_id = queue.add_topic("New Keyword", "tech", "en")
+
+        assert topic_id.startswith("004-en-tech-")
+        assert queue.get_stats()["total"] == 4
+
+    def test_concurrent_reservations_do_not_overlap(self, queue_path):
+        """Test that threads reserving at once never get the same topic."""
+        queue = TopicQueue(queue_path)
+        for i in range(20):
+            queue.storage.put(valid_topic(f"{100 + i}-en-tech-k{i}", f"keyword {i}"))
+
+        results = []
+
+        def worker():
+            results.extend(t["id"] for t in queue.reserve_topics(count=3))
+
+        threads = [threading.Thread(target=worker) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(results) == 18
+        assert len(set(results)) == 18
+
+
+def _reserve_all(queue_path):
+    """Worker process: reserve topics until the queue runs dry"""
+    queue = TopicQueue(queue_path)
+    reserved = []
+    while True:
+        batch = queue.reserve_topics(count=2)
+        if not batch:
+            return reserved
+        reserved.extend(t["id"] for t in batch)
+
+
+def _add_topics(queue_path):
+    """Worker process: add topics while others reserve"""
+    queue = TopicQueue(queue_path)
+    for i in range(10):
+        queue.add_topic(f"added keyword {i}", "tech", "en", priority=1)
+    return []
+
+
+class TestMultiProcess:
+    """Stress reservation across processes."""
+
+    def test_no_topic_reserved_twice(self, queue_path):
+        """Test that processes racing on one queue never share a topic or lose a write."""
+        queue = TopicQueue(queue_path)
+        with queue.storage.transaction():
+            for i in range(80):
+                queue.storage.put(valid_topic(f"{100 + i}-en-tech-k{i}", f"keyword {i}"))
+
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        with context.Pool(5) as pool:
+            reservers = [pool.apply_async(_reserve_all, (queue_path,)) for _ in range(4)]
+            adder = pool.apply_async(_add_topics, (queue_path,))
+            results = [r.get(timeout=60) for r in reservers]
+            adder.get(timeout=60)
+
+        reserved = [topic_id for result in results for topic_id in result]
+        assert len(reserved) == len(set(reserved))
+
+        final = TopicQueue(queue_path)
+        assert final.get_stats()["total"] == 3 + 80 + 10
+        in_progress = {t["id"] for t in final.get_topics("in_progress")}
+        assert set(reserved) <= in_progress
+        assert len({t["lease_id"] for t in final.get_topics("in_progress") if t.get("lease_id")}) == len(reserved)
+
+
+class TestLeases:
+    """Test reservation leases."""
+
+    def test_reserve_sets_lease(self, queue_path):
+        """Test that reserved topics carry a lease and its expiry."""
+        queue = TopicQueue(queue_path, lease_minutes=30)
+        queue.storage.put(valid_topic("004-en-tech-ai", "AI Coding"))
+
+        topic = queue.reserve_topics(count=1)[0]
+
+        assert topic["lease_id"]
+        assert topic["lease_expires_at"] > topic["reserved_at"]
+
+    def test_stale_lease_cannot_complete(self, queue_path):
+        """Test that a worker whose topic was reclaimed cannot overwrite the new owner."""
+        queue = TopicQueue(queue_path, retry_base_minutes=0)
+        queue.storage.put(valid_topic("004-en-tech-ai", "AI Coding"))
+        first = queue.reserve_topics(count=1)[0]
+        queue.mark_failed(first["id"], "timeout")
+        second = queue.reserve_topics(count=1)[0]
+
+        assert queue.mark_completed(first["id"], lease_id=first["lease_id"]) is False
+        assert queue.get_topic(first["id"])["status"] == "in_progress"
+        assert queue.mark_completed(second["id"], lease_id=second["lease_id"]) is True
+
+        completed = queue.get_topic(first["id"])
+        assert completed["status"] == "completed"
+        assert "lease_id" not in completed
+
+
+def hours_ago(hours):
+    return (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
+
+
+def expire_lease(queue, topic_id):
+    """Backdate a topic's lease as if its worker died"""
+    queue.update_topic(topic_id, {"lease_expires_at": "2026-01-01T00:00:00+00:00"})
+
+
+class TestLeaseReclaim:
+    """Test lease renewal and reclaiming expired leases."""
+
+    def test_reserve_reclaims_expired_lease(self, queue_path):
+        """Test that a topic whose lease ran out is reserved again."""
+        queue = TopicQueue(queue_path, retry_base_minutes=0)
+        queue.storage.put(valid_topic("004-en-tech-ai", "AI Coding"))
+        first = queue.reserve_topics(count=1)[0]
+        expire_lease(queue, first["id"])
+
+        second = queue.reserve_topics(count=1)[0]
+
+        assert second["id"] == first["id"]
+        assert second["retry_count"] == 1
+        assert second["lease_id"] != first["lease_id"]
+        assert queue.mark_completed(first["id"], lease_id=first["lease_id"]) is False
+
+    def test_live_and_batch_leases_kept(self, queue_path):
+        """Test that unexpired leases and recently stopped batch topics are not reclaimed."""
+        queue = TopicQueue(queue_path)
+        queue.storage.put(valid_topic("004-en-tech-ai", "AI Coding"))
+        queue.storage.put(valid_topic("005-en-tech-batch", "Batch Topic"))
+        for topic in queue.reserve_topics(count=2):
+            if topic["id"] == "005-en-tech-batch":
+                queue.update_topic(topic["id"], {"batch_ids": {"draft": "msgbatch_1"},
+                                                 "lease_expires_at": hours_ago(1)})
+
+        assert queue.reclaim_expired_leases() == []
+
+    def test_unresumed_batch_topics_reclaimed_after_grace(self, queue_path):
+        """Test that a run without --batch reclaims batch topics once the resume grace period passed."""
+        queue = TopicQueue(queue_path, retry_base_minutes=0)
+        queue.storage.put(valid_topic("004-en-tech-batch", "Batch Topic"))
+        [topic] = queue.reserve_topics(count=1)
+        queue.update_topic(topic["id"], {"batch_ids": {"draft": "msgbatch_1"},
+                                         "lease_expires_at": hours_ago(BATCH_RESUME_GRACE_HOURS + 1)})
+
+        [reserved] = queue.reserve_topics(count=1)
+
+        assert reserved["id"] == topic["id"]
+        assert reserved["retry_count"] == 1
+        assert "batch_ids" not in reserved
+        assert queue.mark_completed(topic["id"], lease_id=topic["lease_id"]) is False
+
+    def test_resume_takes_over_expired_batch_topics_only(self, queue_path):
+        """Test that --batch resumes interrupted topics under a new lease and leaves live runs alone."""
+        queue = TopicQueue(queue_path)
+        queue.storage.put(valid_topic("004-en-tech-live", "Live Batch"))
+        queue.storage.put(valid_topic("005-en-tech-stopped", "Stopped Batch"))
+        topics = {t["id"]: t for t in queue.reserve_topics(count=2)}
+        for topic_id in topics:
+            queue.update_topic(topic_id, {"batch_ids": {"draft": "msgbatch_1"}})
+        expire_lease(queue, "005-en-tech-stopped")
+
+        [resumed] = queue.resume_batch_topics()
+
+        assert resumed["id"] == "005-en-tech-stopped"
+        assert resumed["batch_ids"] == {"draft": "msgbatch_1"}
+        assert resumed["lease_id"] != topics["005-en-tech-stopped"]["lease_id"]
+        assert queue.mark_completed(resumed["id"], lease_id=topics[resumed["id"]]["lease_id"]) is False
+        assert queue.resume_batch_topics() == []
+
+    def test_renew_extends_owned_leases_only(self, queue_path):
+        """Test that renewal extends a held lease and reports lost ones."""
+        queue = TopicQueue(queue_path)
+        queue.storage.put(valid_topic("004-en-tech-ai", "AI Coding"))
+        topic = queue.reserve_topics(count=1)[0]
+        expire_lease(queue, topic["id"])
+
+        assert queue.renew_leases({topic["id"]: topic["lease_id"], "002-ko-business-test-inprogress": "x"}) == {topic["id"]}
+        assert queue.get_topic(topic["id"])["lease_expires_at"] > topic["reserved_at"]
+        assert queue.reclaim_expired_leases() == []
+
+    def test_heartbeat_thread_renews(self, queue_path):
+        """Test that the heartbeat keeps renewing until stopped and drops finished topics."""
+        queue = TopicQueue(queue_path)
+        queue.storage.put(valid_topic("004-en-tech-ai", "AI Coding"))
+        queue.storage.put(valid_topic("005-en-tech-ml", "Machine Learning"))
+        first, second = queue.reserve_topics(count=2)
+
+        with queue.heartbeat([first, second], interval=0.01) as heartbeat:
+            expire_lease(queue, first["id"])
+            queue.mark_completed(second["id"], lease_id=second["lease_id"])
+            deadline = time.monotonic() + 5
+            while queue.get_topic(first["id"])["lease_expires_at"] < "2026-02" and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        assert queue.get_topic(first["id"])["lease_expires_at"] > "2026-02"
+        assert heartbeat.beat() == 1
+
+
+class TestRetryPolicy:
+    """Test retry backoff and dead letters."""
+
+    def test_failure_backs_off(self, queue_path):
+        """Test that a failed topic is not reserved again before its next attempt time."""
+        queue = TopicQueue(queue_path, retry_base_minutes=30)
+        queue.storage.put(valid_topic("004-en-tech-ai", "AI Coding"))
+        topic = queue.reserve_topics(count=1)[0]
+        queue.mark_failed(topic["id"], "timeout")
+
+        failed = queue.get_topic(topic["id"])
+        delay = datetime.fromisoformat(failed["next_attempt_at"]) - datetime.fromisoformat(failed["last_failed_at"])
+        assert delay == timedelta(minutes=30)
+        assert queue.reserve_topics(count=1) == []
+
+        queue.update_topic(topic["id"], {"next_attempt_at": "2026-01-01T00:00:00+00:00"})
+        retried = queue.reserve_topics(count=1)[0]
+        assert retried["id"] == topic["id"]
+        assert "next_attempt_at" not in retried
+
+    def test_backoff_doubles(self, queue_path):
+        """Test that each retry waits twice as long as the one before."""
+        queue = TopicQueue(queue_path, max_retries=5, retry_base_minutes=10)
+        for expected in [10, 20, 40]:
+            queue.mark_failed("002-ko-business-test-inprogress", "boom")
+            topic = queue.get_topic("002-ko-business-test-inprogress")
+            delay = datetime.fromisoformat(topic["next_attempt_at"]) - datetime.fromisoformat(topic["last_failed_at"])
+            assert delay == timedelta(minutes=expected)
+
+    def test_dead_letter_after_max_retries(self, queue_path):
+        """Test that a topic out of retries moves to failed and can be requeued."""
+        queue = TopicQueue(queue_path, max_retries=2, retry_base_minutes=0)
+        for _ in range(3):
+            queue.mark_failed("002-ko-business-test-inprogress", "broken keyword")
+
+        topic = queue.get_topic("002-ko-business-test-inprogress")
+        assert topic["status"] == "failed"
+        assert topic["retry_count"] == 3
+        assert queue.get_stats()["failed"] == 1
+
+        assert queue.requeue_dead_letter(topic["id"]) is True
+        assert queue.requeue_dead_letter("001-en-tech-test-pending") is False
+        requeued = queue.get_topic(topic["id"])
+        assert requeued["status"] == "pending"
+        assert requeued["retry_count"] == 0
+        assert requeued["last_error"] == "broken keyword"
+
+
+def trend_topic(topic_id, keyword, expires_at, status="pending"):
+    return dict(valid_topic(topic_id, keyword, status), keyword_type="trend", expires_at=expires_at)
+
+
+class TestTrendExpiry:
+    """Test expiring trend topics during reservation."""
+
+    def test_expires_at_set_on_add(self, queue_path):
+        """Test that trend topics get an expiry from expiry_days and evergreen ones none."""
+        queue = TopicQueue(queue_path)
+        queue.add_topic("AI Trends", "tech", "en", metadata={"keyword_type": "trend", "expiry_days": 2})
+        queue.add_topic("Python Basics", "tech", "en")
+
+        trend, evergreen = queue.storage.select()[-2:]
+        created = datetime.fromisoformat(trend["created_at"]).astimezone()
+        assert datetime.fromisoformat(trend["expires_at"]) - created == timedelta(days=2)
+        assert "expires_at" not in evergreen
+
+    def test_expired_trend_never_reserved(self, queue_path):
+        """Test that reserve sweeps expired trends instead of reserving them."""
+        queue = TopicQueue(queue_path)
+        queue.storage.put(trend_topic("004-en-tech-old", "Old Trend", "2026-01-01T00:00:00+00:00"))
+        queue.storage.put(trend_topic("005-en-tech-new", "New Trend", "2999-01-01T00:00:00+00:00"))
+
+        reserved = queue.reserve_topics(count=5)
+
+        assert [t["id"] for t in reserved] == ["005-en-tech-new"]
+        assert queue.get_topic("004-en-tech-old")["status"] == "expired"
+        assert queue.get_stats()["expired"] == 1
+
+    def test_legacy_trend_without_expires_at_not_reserved(self, queue_path):
+        """Test that a trend added before expires_at existed is skipped once expiry_days passed."""
+        queue = TopicQueue(queue_path)
+        legacy = dict(valid_topic("004-ja-business-old", "ニデック", lang="ja"), keyword_type="trend",
+                      expiry_days=3, created_at="2026-01-28T00:00:00+00:00")
+        queue.storage.put(legacy)
+        queue.storage.put(valid_topic("005-en-tech-ai", "AI Coding"))
+
+        reserved = queue.reserve_topics(count=5)
+
+        assert [t["id"] for t in reserved] == ["005-en-tech-ai"]
+        assert queue.get_topic("004-ja-business-old")["status"] == "pending"
+        assert [t["id"] for t in queue.purge_expired()] == ["004-ja-business-old"]
+
+    def test_sweep_is_bounded(self, queue_path):
+        """Test that one sweep expires at most `limit` topics, oldest expiry first."""
+        queue = TopicQueue(queue_path)
+        for i in range(5):
+            queue.storage.put(trend_topic(f"{100 + i}-en-tech-t{i}", f"trend {i}", f"2026-01-0{i + 1}T00:00:00+00:00"))
+
+        assert queue.expire_topics(limit=2) == ["100-en-tech-t0", "101-en-tech-t1"]
+        assert len(queue.expire_topics(limit=10)) == 3
+        assert queue.expire_topics() == []
+
+    def test_purge_deletes_expired_trends(self, queue_path):
+        """Test that purge removes expired and stale trends but keeps in-progress and fresh ones."""
+        queue = TopicQueue(queue_path)
+        queue.storage.put(trend_topic("004-en-tech-old", "Old Trend", "2026-01-01T00:00:00+00:00"))
+        queue.storage.put(trend_topic("005-en-tech-new", "New Trend", "2999-01-01T00:00:00+00:00"))
+        naive = dict(valid_topic("006-en-tech-naive", "Naive Trend", "completed"), keyword_type="trend",
+                     created_at="2026-01-01T00:00:00")
+        queue.storage.put(naive)
+        queue.storage.put(trend_topic("007-en-tech-busy", "Busy Trend", "2026-01-01T00:00:00+00:00", "in_progress"))
+        queue.expire_topics()
+
+        removed = queue.purge_expired()
+
+        assert sorted(t["id"] for t in removed) == ["004-en-tech-old", "006-en-tech-naive"]
+        reopened = TopicQueue(queue_path)
+        assert reopened.get_topic("004-en-tech-old") is None
+        assert reopened.get_topic("005-en-tech-new") is not None
+        assert reopened.get_topic("007-en-tech-busy") is not None
+
+    def test_sqlite_migration_adds_expiry_column(self, tmp_path):
+        """Test that a database from before expires_at gets the column backfilled."""
+        path = tmp_path / "queue.db"
+        open_storage(path).put(trend_topic("004-en-tech-old", "Old Trend", "2026-01-01T00:00:00+00:00"))
+        with sqlite3.connect(str(path)) as conn:
+            conn.execute("DROP INDEX idx_topics_expiry")
+            conn.execute("ALTER TABLE topics DROP COLUMN expires_at")
+
+        assert TopicQueue(str(path)).expire_topics() == ["004-en-tech-old"]
+
+
+class TestArchive:
+    """Test moving finished topics out of the live queue."""
+
+    def test_archives_old_completed_and_expired(self, queue_path):
+        """Test that old completed and expired topics move out, recent completions stay."""
+        queue = TopicQueue(queue_path)
+        queue.storage.put(trend_topic("004-en-tech-old", "Old Trend", "2026-01-01T00:00:00+00:00"))
+        queue.expire_topics()
+        queue.storage.put(valid_topic("005-en-tech-recent", "Recent Topic", "completed"))
+        queue.mark_completed("005-en-tech-recent")
+
+        assert queue.archive_topics() == 2
+
+        assert [t["id"] for t in queue.storage.select()] == [
+            "001-en-tech-test-pending", "002-ko-business-test-inprogress", "005-en-tech-recent"
+        ]
+        stats = TopicQueue(queue_path).get_stats()
+        assert stats["archived"] == 2
+        assert stats["completed"] == 1
+
+    def test_archived_topic_still_blocks_duplicates(self, queue_path):
+        """Test that reserve and the curator's key set still see archived completed keywords."""
+        queue = TopicQueue(queue_path)
+        queue.archive_topics()
+        queue.storage.put(valid_topic("004-ja-tech-again", "テスト完了", lang="ja"))
+
+        assert queue.storage.find_completed({"keyword": "テスト完了", "lang": "ja"}) == "003-ja-lifestyle-test-completed"
+        assert ("テスト完了", "ja") in queue.storage.archived_keys()
+        assert queue.reserve_topics(count=5) == []
+
+    def test_archived_numbers_not_reused(self, queue_path):
+        """Test that new topic IDs continue after the highest archived number."""
+        queue = TopicQueue(queue_path)
+        queue.storage.put(valid_topic("009-en-tech-done", "Done Topic", "completed"))
+        queue.archive_topics()
+
+        assert queue.add_topic("Fresh Topic", "tech", "en").startswith("010-")
+
+    def test_json_partitions_by_month(self, tmp_path, sample_queue):
+        """Test that archived topics land in monthly files and the removal is journaled."""
+        path = tmp_path / "queue.json"
+        queue = TopicQueue(str(path))
+        queue._save_queue(sample_queue)
+        queue.archive_topics()
+
+        archive_dir = tmp_path / "queue.archive"
+        with open(archive_dir / "topics-2026-01.jsonl", encoding="utf-8") as f:
+            archived = [json.loads(line) for line in f]
+        assert [t["id"] for t in archived] == ["003-ja-lifestyle-test-completed"]
+        assert "archived_at" in archived[0]
+        assert [e["event"] for e in TopicQueue(str(path)).get_history()] == ["archived"]
+        assert TopicQueue(str(path)).storage.count() == 2
+
+
+class TestQueueBatch:
+    """Test grouping transitions into one write."""
+
+    def test_batch_writes_once(self, queue_path, monkeypatch):
+        """Test that many transitions cost one transaction."""
+        queue = TopicQueue(queue_path)
+        with queue.storage.transaction():
+            for i in range(5):
+                queue.storage.put(valid_topic(f"{100 + i}-en-tech-k{i}", f"keyword {i}"))
+        reserved = queue.reserve_topics(count=5)
+
+        transactions = []
+        transaction = queue.storage.transaction
+        depth = [0]
+
+        @contextmanager
+        def counting_transaction():
+            if not depth[0]:
+                transactions.append(1)
+            depth[0] += 1
+            try:
+                with transaction():
+                    yield
+            finally:
+                depth[0] -= 1
+
+        monkeypatch.setattr(queue.storage, "transaction", counting_transaction)
+
+        with queue.batch() as batch:
+            for topic in reserved[:4]:
+                batch.complete(topic["id"], lease_id=topic["lease_id"])
+            batch.fail(reserved[4]["id"], "boom", lease_id=reserved[4]["lease_id"])
+
+        assert len(transactions) == 1
+        final = TopicQueue(queue_path)
+        assert [final.get_topic(t["id"])["status"] for t in reserved] == ["completed"] * 4 + ["pending"]
+        assert final.get_topic(reserved[4]["id"])["retry_count"] == 1
+
+    def test_mark_calls_deferred_inside_batch(self, queue_path):
+        """Test that mark_completed/mark_failed are recorded until the batch closes."""
+        queue = TopicQueue(queue_path)
+
+        with queue.batch() as batch:
+            assert queue.mark_completed("002-ko-business-test-inprogress") is True
+            assert len(batch) == 1
+            assert queue.get_topic("002-ko-business-test-inprogress")["status"] == "in_progress"
+
+        assert queue.get_topic("002-ko-business-test-inprogress")["status"] == "completed"
+
+    def test_batch_applied_on_error(self, queue_path):
+        """Test that recorded transitions still land when the block raises."""
+        queue = TopicQueue(queue_path)
+
+        with pytest.raises(RuntimeError):
+            with queue.batch() as batch:
+                batch.fail("002-ko-business-test-inprogress", "boom")
+                raise RuntimeError("crash")
+
+        assert queue.get_topic("002-ko-business-test-inprogress")["last_error"] == "boom"
+
+    def test_stale_lease_skipped(self, queue_path):
+        """Test that lease checks run when the batch is applied."""
+        queue = TopicQueue(queue_path, retry_base_minutes=0)
+        queue.storage.put(valid_topic("004-en-tech-ai", "AI Coding"))
+        first = queue.reserve_topics(count=1)[0]
+        queue.mark_failed(first["id"], "timeout")
+        second = queue.reserve_topics(count=1)[0]
+
+        batch = queue.batch()
+        with batch as b:
+            b.complete(first["id"], lease_id=first["lease_id"])
+
+        assert queue.get_topic(second["id"])["lease_id"] == second["lease_id"]
+
+    def test_requeue(self, queue_path):
+        """Test that requeue returns completed topics to pending without a retry."""
+        queue = TopicQueue(queue_path)
+
+        with queue.batch() as batch:
+            batch.requeue("003-ja-lifestyle-test-completed")
+            batch.requeue("001-en-tech-test-pending")
+
+        topic = queue.get_topic("003-ja-lifestyle-test-completed")
+        assert topic["status"] == "pending"
+        assert "completed_at" not in topic
+        assert topic["retry_count"] == 0
+        assert queue.get_topic("001-en-tech-test-pending")["status"] == "pending"
+
+
+class TestJournal:
+    """Test the JSON backend's append-only journal."""
+
+    def test_transition_appends_instead_of_rewriting(self, tmp_path, sample_queue):
+        """Test that a state change leaves the snapshot alone and journals the event."""
+        path = tmp_path / "queue.json"
+        queue = TopicQueue(str(path))
+        queue._save_queue(sample_queue)
+        snapshot = path.read_bytes()
+
+        queue.mark_failed("002-ko-business-test-inprogress", "boom")
+
+        assert path.read_bytes() == snapshot
+        assert [e["event"] for e in queue.get_history()] == ["failed"]
+        assert TopicQueue(str(path)).get_stats()["in_progress"] == 0
+
+    def test_history_records_retries(self, tmp_path):
+        """Test that every reservation and failure of a topic is kept in order."""
+        queue = TopicQueue(str(tmp_path / "queue.json"), retry_base_minutes=0)
+        queue.storage.put(valid_topic("004-en-tech-ai", "AI Coding"))
+        for error in ["timeout", "overloaded"]:
+            queue.reserve_topics(count=1)
+            queue.mark_failed("004-en-tech-ai", error)
+
+        history = queue.get_history("004-en-tech-ai")
+
+        assert [e["event"] for e in history] == ["added", "reserved", "failed", "reserved", "failed"]
+        assert history[-1]["topic"]["retry_count"] == 2
+
+    def test_history_survives_compaction(self, tmp_path):
+        """Test that compacted events stay in the archive's monthly history files."""
+        path = tmp_path / "queue.json"
+        queue = TopicQueue(str(path), retry_base_minutes=0)
+        queue.storage.put(valid_topic("004-en-tech-ai", "AI Coding"))
+        queue.storage.put(valid_topic("005-en-tech-other", "Other Topic"))
+        queue.reserve_topics(count=1)
+        queue.mark_failed("004-en-tech-ai", "timeout")
+        queue.compact()
+        queue.reserve_topics(count=1)
+
+        history = TopicQueue(str(path)).get_history("004-en-tech-ai")
+
+        assert [e["event"] for e in history] == ["added", "reserved", "failed", "reserved"]
+        assert history[2]["topic"]["last_error"] == "timeout"
+        assert len(list((tmp_path / "queue.archive").glob("history-*.jsonl"))) == 1
+
+    def test_compacts_periodically(self, tmp_path, sample_queue):
+        """Test that the snapshot is rewritten once compact_every events accumulate."""
+        path = tmp_path / "queue.json"
+        open_storage(path).replace(sample_queue)
+        storage = JSONQueueStorage(path, compact_every=3)
+
+        for i in range(3):
+            storage.put(valid_topic(f"{100 + i}-en-tech-k{i}", f"keyword {i}"))
+
+        assert storage.journal_path.read_bytes().count(b"\n") == 1
+        assert [e["event"] for e in storage.events()] == ["added"] * 3
+        with open(path, encoding="utf-8") as f:
+            assert len(json.load(f)["topics"]) == 6
+
+    def test_compact_folds_journal(self, tmp_path, sample_queue):
+        """Test that compact() writes the journaled state into the snapshot."""
+        path = tmp_path / "queue.json"
+        queue = TopicQueue(str(path))
+        queue._save_queue(sample_queue)
+        queue.mark_completed("001-en-tech-test-pending")
+
+        assert queue.compact() == 1
+        with open(path, encoding="utf-8") as f:
+            assert json.load(f)["topics"][0]["status"] == "completed"
+        assert queue.compact() == 0
+
+    def test_torn_tail_ignored(self, tmp_path, sample_queue):
+        """Test that a partially written last line (crashed writer) is dropped."""
+        path = tmp_path / "queue.json"
+        queue = TopicQueue(str(path))
+        queue._save_queue(sample_queue)
+        queue.mark_completed("001-en-tech-test-pending")
+        with open(queue.storage.journal_path, "ab") as f:
+            f.write(b'{"event": "failed", "topic": {"id": "002')
+
+        reopened = TopicQueue(str(path))
+        assert reopened.get_topic("001-en-tech-test-pending")["status"] == "completed"
+        reopened.mark_failed("002-ko-business-test-inprogress", "boom")
+
+        assert [e["event"] for e in TopicQueue(str(path)).get_history()] == ["completed", "failed"]
+
+    def test_delete_replayed(self, tmp_path, sample_queue):
+        """Test that deletions are journaled and survive reopening and compaction."""
+        path = tmp_path / "queue.json"
+        queue = TopicQueue(str(path))
+        queue._save_queue(sample_queue)
+        queue.storage.delete(["001-en-tech-test-pending", "003-ja-lifestyle-test-completed"])
+
+        reopened = TopicQueue(str(path))
+        assert [t["id"] for t in reopened.storage.select()] == ["002-ko-business-test-inprogress"]
+        assert [e["event"] for e in reopened.get_history()] == ["deleted", "deleted"]
+        reopened.compact()
+        assert TopicQueue(str(path)).storage.count() == 1
+
+    def test_external_snapshot_change_drops_journal(self, tmp_path, sample_queue):
+        """Test that a snapshot rewritten outside the queue is not overridden by an old journal."""
+        path = tmp_path / "queue.json"
+        queue = TopicQueue(str(path))
+        queue._save_queue(sample_queue)
+        queue.mark_completed("001-en-tech-test-pending")
+
+        edited = dict(sample_queue, topics=sample_queue["topics"][1:])
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(edited, f)
+
+        reopened = TopicQueue(str(path))
+        assert reopened.get_topic("001-en-tech-test-pending") is None
+        assert reopened.get_history() == []
+
+    def test_sees_other_writers(self, tmp_path, sample_queue):
+        """Test that a cached queue picks up events appended by another instance."""
+        path = tmp_path / "queue.json"
+        first = TopicQueue(str(path))
+        first._save_queue(sample_queue)
+        second = TopicQueue(str(path))
+        assert second.get_stats()["completed"] == 1
+
+        first.mark_completed("001-en-tech-test-pending")
+
+        assert second.get_stats()["completed"] == 2
+
+
+class TestImportExport:
+    """Test converting between backends."""
+
+    def test_json_to_sqlite_and_back(self, tmp_path, sample_queue):
+        """Test that a JSON queue survives a round trip through SQLite."""
+        db_queue = TopicQueue(str(tmp_path / "queue.db"))
+        db_queue._save_queue(sample_queue)
+        db_queue.mark_completed("001-en-tech-test-pending")
+
+        exported = db_queue._load_queue()
+        json_queue = TopicQueue(str(tmp_path / "queue.json"))
+        json_queue._save_queue(exported)
+
+        with open(tmp_path / "queue.json", encoding="utf-8") as f:
+            data = json.load(f)
+        assert [t["id"] for t in data["topics"]] == [t["id"] for t in sample_queue["topics"]]
+        assert data["topics"][0]["status"] == "completed"
+
+
+@pytest.mark.slow
+class TestReservationBenchmark:
+    """Benchmark reservation on a large synthetic queue."""
+
+    @pytest.mark.parametrize("suffix", [".json", ".db"])
+    def test_reserve_from_100k_topics(self, tmp_path, suffix):
+        """Test that reserving a few topics from 100k stays fast once the queue is loaded."""
+        topics = [
+            valid_topic(f"{i}-en-tech-k{i}", f"keyword {i}", priority=i % 10 + 1)
+            for i in range(100_000)
+        ]
+        # Completed duplicates of the highest-priority keywords force skips at the head
+        topics += [valid_topic(f"done-{i}", f"keyword {i}", status="completed") for i in range(9, 2000, 10)]
+        path = tmp_path / f"queue{suffix}"
+        open_storage(path).replace({"topics": topics})
+
+        queue = TopicQueue(str(path))
+        started = time.perf_counter()
+        queue.reserve_topics(count=1)
+        first = time.perf_counter() - started
+
+        started = time.perf_counter()
+        reserved = [t for _ in range(50) for t in queue.reserve_topics(count=3)]
+        per_call = (time.perf_counter() - started) / 50
+
+        print(f"\n{suffix}: first reserve {first * 1000:.0f} ms (includes load), "
+              f"then {per_call * 1000:.2f} ms per reserve_topics(3)")
+        assert len(reserved) == 150
+        assert all(t["priority"] == 10 for t in reserved)
+        assert per_call < 0.05
@@ -0,0 +1,287 @@
+"""
+Tests for scripts/utils/rate_limit.py
+"""
+import asyncio
+import random
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+from utils.rate_limit import (
+    TokenBucket, RateLimiter, get_limiter, is_retryable, retry_after_of, estimate_input_tokens
+)
+from utils.llm_usage import UsageLedger, MeteredClient, AsyncMeteredClient
+
+
+class FakeClock:
+    """Monotonic clock advanced only by sleep()"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class HTTPError(Exception):
+    """Mimics requests/httpx/Anthropic status errors"""
+
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.response = SimpleNamespace(status_code=status, headers=headers or {})
+
+
+def make_limiter(clock, **kwargs):
+    return RateLimiter("test", clock=clock, sleep=clock.sleep, rng=random.Random(0), **kwargs)
+
+
+def flaky(errors, result="ok"):
+    """Callable raising each error in turn, then returning result"""
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    fn.calls = calls
+    return fn
+
+
+class TestTokenBucket:
+    """Test token bucket pacing."""
+
+    def test_burst_up_to_capacity(self):
+        """Test that a full bucket serves its capacity without waiting."""
+        clock = FakeClock()
+        bucket = TokenBucket(3, 60, clock=clock)
+
+        assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+
+    def test_waits_for_refill(self):
+        """Test that reservations beyond capacity queue up at the refill rate."""
+        clock = FakeClock()
+        bucket = TokenBucket(2, 60, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+
+        assert bucket.reserve() == pytest.approx(30)
+        assert bucket.reserve() == pytest.approx(60)
+
+    def test_refill_over_time(self):
+        """Test that elapsed time restores tokens up to capacity."""
+        clock = FakeClock()
+        bucket = TokenBucket(2, 60, clock=clock)
+        bucket.reserve(2)
+        clock.now += 600
+
+        assert bucket.reserve(2) == 0
+
+    def test_refund(self):
+        """Test that refunded tokens are available again."""
+        clock = FakeClock()
+        bucket = TokenBucket(1000, 60, clock=clock)
+        bucket.reserve(1000)
+        bucket.refund(400)
+
+        assert bucket.reserve(400) == 0
+
+
+class TestRetryClassification:
+    """Test which errors are retried."""
+
+    @pytest.mark.parametrize("status", [429, 500, 503, 529])
+    def test_retryable_status(self, status):
+        """Test that rate limit, overload and server errors are retried."""
+        assert is_retryable(HTTPError(status))
+
+    @pytest.mark.parametrize("status", [400, 401, 403, 404])
+    def test_client_errors_not_retried(self, status):
+        """Test that client errors fail immediately."""
+        assert not is_retryable(HTTPError(status))
+
+    def test_connection_errors_retried(self):
+        """Test that transport errors are matched by class name."""
+        APIConnectionError = type("APIConnectionError", (Exception,), {})
+
+        assert is_retryable(APIConnectionError())
+        assert not is_retryable(ValueError("bad"))
+
+    def test_retry_after_headers(self):
+        """Test seconds, milliseconds and missing retry-after headers."""
+        assert retry_after_of(HTTPError(429, {"retry-after": "12"})) == 12
+        assert retry_after_of(HTTPError(429, {"retry-after-ms": "1500"})) == 1.5
+        assert retry_after_of(HTTPError(429)) is None
+
+
+class TestRateLimiter:
+    """Test pacing and retry scheduling."""
+
+    def test_paces_requests(self):
+        """Test that calls beyond the request budget wait for the bucket."""
+        clock = FakeClock()
+        limiter = make_limiter(clock, requests=(1, 1))
+
+        for _ in range(3):
+            limiter.call(lambda: None)
+
+        assert clock.sleeps == [pytest.approx(1), pytest.approx(1)]
+
+    def test_retries_then_succeeds(self):
+        """Test that retryable errors are retried and counted."""
+        clock = FakeClock()
+        limiter = make_limiter(clock)
+        fn = flaky([HTTPError(529), HTTPError(503)])
+
+        assert limiter.call_with_retries(fn) == ("ok", 2)
+        assert len(fn.calls) == 3
+
+    def test_honors_retry_after(self):
+        """Test that retry-after sets the delay and pauses other callers."""
+        clock = FakeClock()
+        limiter = make_limiter(clock, base_delay=0.5)
+        fn = flaky([HTTPError(429, {"retry-after": "20"})])
+
+        limiter.call(fn)
+
+        assert 20 <= clock.sleeps[0] <= 20.5
+
+    def test_pause_blocks_new_callers(self):
+        """Test that a pause delays the next acquire."""
+        clock = FakeClock()
+        limiter = make_limiter(clock)
+        limiter.pause(5)
+        limiter.acquire()
+
+        assert clock.sleeps == [5]
+
+    def test_non_retryable_raises_immediately(self):
+        """Test that client errors are not retried."""
+        clock = FakeClock()
+        limiter = make_limiter(clock)
+        fn = flaky([HTTPError(400)])
+
+        with pytest.raises(HTTPError):
+            limiter.call(fn)
+        assert len(fn.calls) == 1
+
+    def test_gives_up_after_max_retries(self):
+        """Test that the last error is raised once retries are exhausted."""
+        clock = FakeClock()
+        limiter = make_limiter(clock, max_retries=2)
+        fn = flaky([HTTPError(429)] * 5)
+
+        with pytest.raises(HTTPError):
+            limiter.call(fn)
+        assert len(fn.calls) == 3
+
+    def test_retry_refunds_failed_attempt_tokens(self):
+        """Test that a retryable failure returns its tokens instead of waiting on them again."""
+        clock = FakeClock()
+        limiter = make_limiter(clock, tokens=(1000, 60), base_delay=0.5)
+        fn = flaky([HTTPError(529)])
+
+        assert limiter.call_with_retries(fn, tokens=800) == ("ok", 1)
+        assert len(clock.sleeps) == 1 and clock.sleeps[0] <= 0.5
+        assert limiter.token_bucket._tokens == pytest.approx(200, abs=10)
+
+    def test_non_retryable_keeps_tokens(self):
+        """Test that an attempt failing with a client error still counts its tokens."""
+        clock = FakeClock()
+        limiter = make_limiter(clock, tokens=(1000, 60))
+
+        with pytest.raises(HTTPError):
+            limiter.call(flaky([HTTPError(400)]), tokens=800)
+        assert limiter.token_bucket._tokens == pytest.approx(200)
+
+    def test_backoff_is_jittered_and_capped(self):
+        """Test that backoff grows exponentially within max_delay."""
+        limiter = RateLimiter("test", base_delay=1, max_delay=10, rng=random.Random(0))
+
+        for attempt in range(1, 8):
+            assert 0 <= limiter.backoff_delay(attempt) <= min(10, 2 ** (attempt - 1))
+
+    def test_async_retries(self):
+        """Test that the coroutine path retries like the sync one."""
+        limiter = RateLimiter("test", base_delay=0.001, rng=random.Random(0))
+        errors = [HTTPError(529)]
+
+        async def fn():
+            if errors:
+                raise errors.pop()
+            return "ok"
+
+        assert asyncio.run(limiter.call_with_retries_async(fn)) == ("ok", 1)
+
+    def test_get_limiter_is_shared(self, monkeypatch):
+        """Test that one provider maps to one limiter with env overrides applied."""
+        monkeypatch.setenv("BRAVE_REQUESTS_PER_SECOND", "5")
+        monkeypatch.setattr("utils.rate_limit._limiters", {})
+
+        limiter = get_limiter('brave')
+
+        assert get_limiter('brave') is limiter
+        assert limiter.request_bucket.capacity == 5
+
+
+class TestMeteredClientLimiter:
+    """Test Claude calls routed through a limiter."""
+
+    def test_retries_recorded_in_ledger(self, tmp_path):
+        """Test that limiter retries replace SDK retries in the usage record."""
+        clock = FakeClock()
+        limiter = make_limiter(clock, tokens=(30000, 60))
+        usage = SimpleNamespace(input_tokens=50, output_tokens=5)
+        create = flaky([HTTPError(529)], SimpleNamespace(content=[], usage=usage))
+        messages = SimpleNamespace(create=lambda **params: create())
+        ledger = UsageLedger("test", path=str(tmp_path / "usage.jsonl"))
+
+        response = MeteredClient(SimpleNamespace(messages=messages), ledger, limiter=limiter).create(
+            "draft", model="m", max_tokens=10, messages=[{"role": "user", "content": "hi"}]
+        )
+
+        assert response.usage is usage
+        assert ledger.records[0]["retries"] == 1
+
+    def test_disables_sdk_retries(self, tmp_path):
+        """Test that the SDK client is copied with max_retries=0."""
+        copies = []
+        client = SimpleNamespace(with_options=lambda **options: copies.append(options) or client)
+
+        MeteredClient(client, UsageLedger("test", path=str(tmp_path / "u.jsonl")), limiter=RateLimiter("test"))
+
+        assert copies == [{"max_retries": 0}]
+
+    def test_async_client_uses_limiter(self, tmp_path):
+        """Test that the async client goes through the limiter."""
+        limiter = RateLimiter("test", base_delay=0.001)
+        errors = [HTTPError(503)]
+
+        async def create(**params):
+            if errors:
+                raise errors.pop()
+            return SimpleNamespace(content=[], usage=None)
+
+        ledger = UsageLedger("test", path=str(tmp_path / "usage.jsonl"))
+        client = AsyncMeteredClient(SimpleNamespace(messages=SimpleNamespace(create=create)), ledger, limiter=limiter)
+
+        response = asyncio.run(client.create("draft", model="m", messages=[]))
+
+        assert response.content == []
+        assert ledger.records[0]["retries"] == 1
+
+
+def test_estimate_counts_cjk_per_character():
+    """Test that Korean text is estimated near one token per character."""
+    latin = estimate_input_tokens({"messages": [{"content": "a" * 400}]})
+    korean = estimate_input_tokens({"messages": [{"content": "가" * 400}]})
+
+    assert korean > 3 * latin
@@ -0,0 +1,159 @@
+"""
+Tests for scripts/utils/response_cache.py
+"""
+import os
+import time
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+from utils.response_cache import EVICT_INTERVAL, ResponseCache, CacheMissError, cache_key
+from utils.llm_usage import UsageLedger, MeteredClient
+
+PARAMS = {"model": "claude-sonnet-4-20250514", "max_tokens": 100,
+          "messages": [{"role": "user", "content": "Write about 손흥민"}]}
+
+
+def make_response(text="draft text"):
+    usage = SimpleNamespace(input_tokens=10, output_tokens=20)
+    return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)], usage=usage)
+
+
+class TestCacheKey:
+    """Test content-addressed keys."""
+
+    def test_key_ignores_dict_order(self):
+        """Test that parameter order does not change the key."""
+        reordered = {"messages": PARAMS["messages"], "max_tokens": 100, "model": PARAMS["model"]}
+
+        assert cache_key(PARAMS) == cache_key(reordered)
+
+    def test_key_changes_with_prompt(self):
+        """Test that a different prompt produces a different key."""
+        other = dict(PARAMS, messages=[{"role": "user", "content": "Write about BTS"}])
+
+        assert cache_key(PARAMS) != cache_key(other)
+
+
+class TestResponseCache:
+    """Test storing, expiry, eviction and replay."""
+
+    def test_put_and_get_roundtrip(self, tmp_path):
+        """Test that a stored response is served with attribute access."""
+        cache = ResponseCache(str(tmp_path))
+        assert cache.get(PARAMS) is None
+
+        cache.put(PARAMS, make_response())
+        cached = cache.get(PARAMS)
+
+        assert cached.content[0].text == "draft text"
+        assert cached.usage.output_tokens == 20
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_expired_entry_is_removed(self, tmp_path):
+        """Test that entries older than the TTL are treated as misses."""
+        cache = ResponseCache(str(tmp_path), ttl_hours=1)
+        cache.put(PARAMS, make_response())
+        path = next(tmp_path.glob("*/*.json"))
+        old = time.time() - 2 * 3600
+        os.utime(path, (old, old))
+
+        assert cache.get(PARAMS) is None
+        assert not path.exists()
+
+    def test_size_eviction_removes_oldest(self, tmp_path):
+        """Test that the oldest entries go first when over the size limit."""
+        cache = ResponseCache(str(tmp_path), max_size_mb=0.004)  # ~4 KB
+        params = [dict(PARAMS, max_tokens=i) for i in range(4)]
+        now = time.time()
+        for i, p in enumerate(params):
+            cache.put(p, make_response("x" * 1500))
+            path = tmp_path / cache_key(p)[:2] / f"{cache_key(p)}.json"
+            os.utime(path, (now - 100 + i, now - 100 + i))
+            cache.evict()
+
+        assert cache.get(params[0]) is None
+        assert cache.get(params[-1]) is not None
+
+    def test_put_scans_only_when_needed(self, tmp_path, monkeypatch):
+        """Test that puts under the limit skip the directory scan until EVICT_INTERVAL."""
+        cache = ResponseCache(str(tmp_path))
+        scans = []
+        evict = cache.evict
+        monkeypatch.setattr(cache, "evict", lambda: (scans.append(1), evict()))
+
+        for i in range(EVICT_INTERVAL + 1):
+            cache.put(dict(PARAMS, max_tokens=i), make_response())
+
+        assert len(scans) == 2  # First put (size unknown), then the periodic scan
+
+    def test_put_evicts_once_tracked_size_exceeds_limit(self, tmp_path):
+        """Test that the tracked size triggers eviction without an explicit evict()."""
+        cache = ResponseCache(str(tmp_path), max_size_mb=0.004)  # ~4 KB
+        for i in range(6):
+            cache.put(dict(PARAMS, max_tokens=i), make_response("x" * 1500))
+
+        on_disk = sum(path.stat().st_size for path in tmp_path.glob("*/*.json"))
+        assert on_disk <= cache.max_size_bytes
+        assert cache.get(dict(PARAMS, max_tokens=5)) is not None
+
+    def test_replay_miss_raises(self, tmp_path):
+        """Test that replay mode never falls through on a miss."""
+        cache = ResponseCache(str(tmp_path), replay=True)
+
+        with pytest.raises(CacheMissError):
+            cache.get(PARAMS)
+
+    def test_roundtrip_sdk_message(self, tmp_path):
+        """Test caching a real SDK Message object."""
+        types = pytest.importorskip("anthropic.types")
+        message = types.Message(
+            id="msg_1", type="message", role="assistant", model=PARAMS["model"],
+            content=[{"type": "text", "text": "hello"}], stop_reason="end_turn",
+            stop_sequence=None, usage={"input_tokens": 5, "output_tokens": 1}
+        )
+        cache = ResponseCache(str(tmp_path))
+
+        cache.put(PARAMS, message)
+
+        assert cache.get(PARAMS).content[0].text == "hello"
+
+
+class TestMeteredClientCache:
+    """Test the cache in front of MeteredClient."""
+
+    def test_second_call_served_from_cache(self, tmp_path):
+        """Test that an identical request hits the cache and is recorded as such."""
+        calls = []
+
+        def create(**params):
+            calls.append(params)
+            return make_response()
+
+        ledger = UsageLedger("test", path=str(tmp_path / "usage.jsonl"))
+        client = MeteredClient(SimpleNamespace(messages=SimpleNamespace(create=create)), ledger,
+                               ResponseCache(str(tmp_path / "cache")))
+
+        first = client.create("draft", **PARAMS)
+        second = client.create("draft", **PARAMS)
+
+        assert len(calls) == 1
+        assert second.content[0].text == first.content[0].text
+        assert [r["cached"] for r in ledger.records] == [False, True]
+        assert ledger.records[1]["input_tokens"] == 0
+
+    def test_replay_miss_is_recorded(self, tmp_path):
+        """Test that a replay miss is recorded and raised without calling the API."""
+        def create(**params):
+            raise AssertionError("API must not be called in replay mode")
+
+        ledger = UsageLedger("test", path=str(tmp_path / "usage.jsonl"))
+        client = MeteredClient(SimpleNamespace(messages=SimpleNamespace(create=create)), ledger,
+                               ResponseCache(str(tmp_path / "cache"), replay=True))
+
+        with pytest.raises(CacheMissError):
+            client.create("draft", **PARAMS)
+
+        assert ledger.records[0]["error"] == "CacheMissError"
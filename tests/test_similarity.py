@@ -0,0 +1,105 @@
+"""
+Tests for scripts/utils/similarity.py
+"""
+import random
+import time
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+from utils import similarity
+from utils.similarity import edit_distance, title_similarity, similarities
+
+
+def matrix_distance(a, b):
+    """Reference Levenshtein distance (the gate's old full-matrix version)"""
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def random_strings(rng, count, max_len=150):
+    alphabet = "abcde 가나다テスト"
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, max_len))) for _ in range(count)]
+
+
+class TestEditDistance:
+    """Test the bit-parallel distance against the matrix version."""
+
+    def test_matches_matrix(self):
+        """Test random pairs, including ones longer than 64 characters and CJK text."""
+        rng = random.Random(0)
+        strings = random_strings(rng, 400)
+        for a, b in zip(strings, reversed(strings)):
+            assert edit_distance(a, b) == matrix_distance(a, b)
+
+    def test_known_values(self):
+        """Test classic examples and empty strings."""
+        assert edit_distance("kitten", "sitting") == 3
+        assert edit_distance("", "abc") == 3
+        assert edit_distance("same", "same") == 0
+
+    def test_early_exit(self):
+        """Test that exceeding max_distance reports max_distance + 1."""
+        rng = random.Random(1)
+        strings = random_strings(rng, 200)
+        for a, b in zip(strings, reversed(strings)):
+            limit = rng.randint(0, 30)
+            distance = matrix_distance(a, b)
+            assert edit_distance(a, b, limit) == (distance if distance <= limit else limit + 1)
+
+
+class TestTitleSimilarity:
+    """Test similarity scores and threshold pruning."""
+
+    def test_case_insensitive(self):
+        """Test that case and surrounding whitespace are ignored."""
+        assert title_similarity("  AI Coding Tools", "ai coding tools ") == 1.0
+
+    def test_same_as_matrix_formula(self):
+        """Test that the score is 1 - distance / longer length."""
+        assert title_similarity("AI Coding Tools", "AI Coding Tool") == pytest.approx(1 - 1 / 15)
+
+    def test_below_threshold_pruned(self):
+        """Test that pairs that cannot reach min_similarity score 0.0."""
+        assert title_similarity("AI", "AI Coding Tools Guide", min_similarity=0.7) == 0.0
+        assert title_similarity("AI Coding Tools", "AI Coding Tool", min_similarity=0.7) > 0.9
+
+    @pytest.mark.parametrize("use_numpy", [True, False])
+    @pytest.mark.parametrize("min_similarity", [0.0, 0.7])
+    def test_batch_matches_pairwise(self, monkeypatch, use_numpy, min_similarity):
+        """Test that the batch API gives the pairwise results with and without NumPy."""
+        if use_numpy:
+            pytest.importorskip("numpy")
+        else:
+            monkeypatch.setattr(similarity, "np", None)
+        rng = random.Random(2)
+        title = random_strings(rng, 1, max_len=100)[0]
+        candidates = random_strings(rng, 60) + [title.upper(), ""]
+
+        expected = [title_similarity(title, candidate, min_similarity) for candidate in candidates]
+
+        assert similarities(title, candidates, min_similarity) == pytest.approx(expected)
+
+
+@pytest.mark.slow
+def test_batch_against_5000_titles():
+    """Test that one title is compared against thousands of recent titles in milliseconds."""
+    pytest.importorskip("numpy")
+    rng = random.Random(3)
+    words = "ai coding tools guide best review 2026 how to use apple samsung market stock trend news".split()
+    titles = [" ".join(rng.choice(words) for _ in range(rng.randint(5, 12))).title() for _ in range(5000)]
+    similarities("warm up", titles[:10])
+
+    start = time.perf_counter()
+    scores = similarities("Best AI Coding Tools Guide For 2026 Review", titles, min_similarity=0.7)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n5000 titles: {elapsed * 1000:.1f} ms")
+    assert len(scores) == 5000
+    assert elapsed < 0.2
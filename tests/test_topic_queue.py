@@ -9,7 +9,7 @@ from datetime import datetime, timezone, timedelta
 # Import functions to test
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
-from topic_queue import TopicQueue, add_topic, get_stats
+from topic_queue import TopicQueue, add_topic, get_stats, fair_share
 
 class TestTopicQueue:
     """Test TopicQueue class"""
@@ -169,6 +169,39 @@ class TestMarkFailed:
         assert topic["retry_count"] >= 1
         assert "last_error" in topic
 
+class TestUpdateTopic:
+    """Test in-place topic updates."""
+
+    def test_update_topic_sets_and_removes_fields(self, temp_queue_file):
+        """Test setting a field and removing one with None."""
+        queue = TopicQueue(temp_queue_file)
+        topic_id = "002-ko-business-test-inprogress"
+
+        assert queue.update_topic(topic_id, {"batch_ids": {"draft": "msgbatch_1"}})
+        topic = next(t for t in queue.get_topics("in_progress") if t["id"] == topic_id)
+        assert topic["batch_ids"] == {"draft": "msgbatch_1"}
+
+        queue.update_topic(topic_id, {"batch_ids": None})
+        topic = next(t for t in queue.get_topics("in_progress") if t["id"] == topic_id)
+        assert "batch_ids" not in topic
+
+    def test_update_topic_nonexistent(self, temp_queue_file):
+        """Test updating a missing topic returns False."""
+        queue = TopicQueue(temp_queue_file)
+
+        assert queue.update_topic("999-nonexistent", {"priority": 1}) is False
+
+    def test_mark_failed_clears_batch_ids(self, temp_queue_file):
+        """Test that a failed topic does not keep stale batch IDs."""
+        queue = TopicQueue(temp_queue_file)
+        topic_id = "002-ko-business-test-inprogress"
+        queue.update_topic(topic_id, {"batch_ids": {"draft": "msgbatch_1"}})
+
+        queue.mark_failed(topic_id, "Batch request errored")
+
+        topic = next(t for t in queue.get_topics() if t["id"] == topic_id)
+        assert "batch_ids" not in topic
+
 class TestAddTopic:
     """Test adding topics to queue."""
 
@@ -201,3 +234,50 @@ class TestGetStats:
         expected_keys = ["total", "pending", "in_progress", "completed"]
         for key in expected_keys:
             assert key in stats or "by_" in str(stats.keys())
+
+
+def _topic(topic_id, lang, category="tech", priority=5):
+    return {"id": topic_id, "keyword": f"keyword {topic_id}", "category": category, "lang": lang,
+            "status": "pending", "priority": priority, "created_at": "2026-01-21T00:00:00+00:00"}
+
+
+class TestFairShare:
+    """Test the fair-share reservation policy."""
+
+    def test_languages_share_evenly(self):
+        """Test that a burst of high-priority topics in one language does not starve the others."""
+        topics = [_topic(f"en-{i}", "en", "entertainment", priority=10) for i in range(6)]
+        topics += [_topic("ko-0", "ko", priority=3), _topic("ja-0", "ja", priority=2)]
+
+        picked = [t["lang"] for t in fair_share(topics)]
+
+        assert picked[:3] == ["en", "ko", "ja"]
+        assert len(picked) == len(topics)
+
+    def test_categories_rotate_within_language(self):
+        """Test that categories take turns within a language, each in priority order."""
+        topics = [_topic("en-ent-1", "en", "entertainment", 9), _topic("en-ent-2", "en", "entertainment", 8),
+                  _topic("en-tech-1", "en", "tech", 7)]
+
+        assert [t["id"] for t in fair_share(topics)] == ["en-ent-1", "en-tech-1", "en-ent-2"]
+
+    def test_language_weights(self):
+        """Test that a language with twice the weight gets twice the reservations."""
+        topics = [_topic(f"en-{i}", "en") for i in range(6)] + [_topic(f"ko-{i}", "ko") for i in range(6)]
+
+        picked = [t["lang"] for t in fair_share(topics, {"en": 2, "ko": 1})][:6]
+
+        assert picked.count("en") == 4
+        assert picked.count("ko") == 2
+
+    def test_reserve_with_fair_policy(self, tmp_path):
+        """Test that reserve_topics applies the policy after skipping invalid topics."""
+        queue = TopicQueue(str(tmp_path / "queue.json"))
+        queue._save_queue({"topics": [_topic(f"00{i}-en", "en", priority=9) for i in range(4)]
+                           + [_topic("010-ko", "ko", priority=1), _topic("011-ja", "ja", priority=1)]})
+
+        reserved = queue.reserve_topics(count=3, policy="fair")
+
+        assert sorted(t["lang"] for t in reserved) == ["en", "ja", "ko"]
+        with pytest.raises(ValueError):
+            queue.reserve_topics(count=1, policy="random")
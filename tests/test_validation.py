@@ -0,0 +1,76 @@
+"""
+Tests for scripts/utils/validation.py
+"""
+import pytest
+from pathlib import Path
+
+# Import functions to test
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+from utils.validation import (
+    validate_title,
+    validate_description,
+    MAX_TITLE_LENGTH,
+    MAX_DESCRIPTION_LENGTH
+)
+
+CONTENT = "About 75% of teams now use AI coding assistants, and licenses cost $20 per seat."
+
+
+class TestValidateTitle:
+    """Test local title-content alignment checks."""
+
+    def test_aligned_title_passes(self):
+        """Test that a title backed by the content passes."""
+        assert validate_title("How 75% of Teams Use AI Coding Assistants in 2026", CONTENT) == []
+
+    def test_empty_title(self):
+        """Test that an empty title is rejected."""
+        assert validate_title("  ", CONTENT) == ["Title is empty"]
+
+    def test_title_too_long(self):
+        """Test that an overly long title is rejected."""
+        errors = validate_title("A" * (MAX_TITLE_LENGTH + 1), CONTENT)
+
+        assert any("at most" in e for e in errors)
+
+    def test_figure_not_in_content(self):
+        """Test that figures missing from the content are flagged."""
+        errors = validate_title("AI Coding Assistants Save $800 a Month", CONTENT)
+
+        assert errors == ["Title figure '$800' not found in content"]
+
+    def test_year_is_ignored(self):
+        """Test that year mentions are not treated as promised figures."""
+        assert validate_title("AI Coding Assistants in 2026", CONTENT) == []
+
+    @pytest.mark.parametrize("title", [
+        "Confirmed: AI Coding Assistants Take Over",
+        "AI 코딩 도구 확정",
+        "AIコーディング速報",
+    ])
+    def test_unsupported_claims(self, title):
+        """Test that hype words the content doesn't back are flagged."""
+        assert len(validate_title(title, CONTENT)) == 1
+
+    def test_claim_backed_by_content(self):
+        """Test that a claim word also used in the content is accepted."""
+        content = CONTENT + " Pricing was confirmed by the vendor."
+
+        assert validate_title("Vendor Confirmed AI Coding Pricing", content) == []
+
+
+class TestValidateDescription:
+    """Test meta description checks."""
+
+    def test_valid_description(self):
+        """Test that a normal description passes."""
+        assert validate_description("A practical look at AI coding assistants.") is None
+
+    def test_empty_description(self):
+        """Test that an empty description is rejected."""
+        assert validate_description("") == "Description is empty"
+
+    def test_description_too_long(self):
+        """Test that an overly long description is rejected."""
+        assert validate_description("x" * (MAX_DESCRIPTION_LENGTH + 1)) is not None